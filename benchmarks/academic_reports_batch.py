@@ -0,0 +1,128 @@
+"""Measure the latency of saving a batch of academic reports.
+
+Usage:
+    python benchmarks/academic_reports_batch.py [--config .configs/test.toml] [--sizes 1,30,1000]
+
+The database is seeded like in `loading_profiles.py` (its tables are
+DROPPED). "legacy" validates and upserts report by report like the
+service used to, "batch" goes through `StudentService`: one validation
+query and one multi-row upsert, or COPY and a merge from
+`COPY_THRESHOLD` reports on. Both save the same reports, so after the
+first round the upserts update existing rows.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any
+from unittest.mock import AsyncMock
+
+from loading_profiles import CLASSES_PER_WEEK, TEACHERS, WEEKS, seed
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from journal_backend.config import load_config
+from journal_backend.database.sa_utils import create_engine
+from journal_backend.entity.classes.repository import ClassRepository
+from journal_backend.entity.models import *  # noqa
+from journal_backend.entity.students.dto import AcademicReportCreate
+from journal_backend.entity.students.enums import Graduation
+from journal_backend.entity.students.models import AcademicReport
+from journal_backend.entity.students.repository import (
+    COPY_THRESHOLD,
+    StudentRepository,
+)
+from journal_backend.entity.students.service import StudentService
+from journal_backend.entity.users.dto import Principal
+from journal_backend.entity.users.enums import Role
+
+TEACHER = Principal(id=1, role=Role.TEACHER, is_verified=True)
+
+
+def make_batch(size: int, groups: int, students: int) -> list[AcademicReportCreate]:
+    classes = WEEKS * CLASSES_PER_WEEK
+    pairs = [
+        (TEACHERS + g * students + s + 1, g * classes + c + 1)
+        for g in range(groups)
+        for c in range(classes)
+        for s in range(students)
+    ]
+    if size > len(pairs):
+        raise SystemExit(f"the seeded data has {len(pairs)} distinct reports only")
+    return [
+        AcademicReportCreate(student_id, class_id, True, Graduation(i % 6))
+        for i, (student_id, class_id) in enumerate(pairs[:size])
+    ]
+
+
+async def save_legacy(session: AsyncSession, reports: list[AcademicReportCreate]) -> None:
+    repo = StudentRepository(session)
+    class_repo = ClassRepository(session)
+    for report in reports:
+        group_id = await repo.get_group_id(report.student_id)
+        assert group_id is not None
+        assert await class_repo.student_class_exists(group_id, report.class_id)
+
+    for report in reports:
+        await session.execute(
+            insert(AcademicReport).
+            values(**report.__dict__).
+            on_conflict_do_update(
+                index_elements=[AcademicReport.student_id, AcademicReport.class_id],
+                set_={"grade": report.grade, "is_attended": report.is_attended},
+            )
+        )
+    await session.commit()
+
+
+async def save_batch(session: AsyncSession, reports: list[AcademicReportCreate]) -> None:
+    service = StudentService(
+        StudentRepository(session),
+        AsyncMock(), AsyncMock(), AsyncMock(), AsyncMock(), AsyncMock(),
+    )
+    await service.create_academic_reports(reports, TEACHER)
+
+
+async def latency(engine: AsyncEngine, save: Any, reports: list[Any], rounds: int) -> list[float]:
+    timings = []
+    for _ in range(rounds):
+        async with AsyncSession(engine) as session:
+            started = time.perf_counter()
+            await save(session, reports)
+            timings.append(time.perf_counter() - started)
+    return timings
+
+
+async def run(config_path: str, sizes: list[int], groups: int, students: int) -> None:
+    engine = create_engine(load_config(config_path).db)
+    await seed(engine, groups, students)
+
+    print(f"COPY from {COPY_THRESHOLD} reports on")
+    print(f"{'size':>6}{'legacy p50':>14}{'batch p50':>14}{'batch p95':>14}")
+    for size in sizes:
+        reports = make_batch(size, groups, students)
+        rounds = max(3, min(50, 3000 // size))
+        await latency(engine, save_batch, reports, 1)
+        legacy = await latency(engine, save_legacy, reports, max(1, rounds // 5))
+        batch = await latency(engine, save_batch, reports, rounds)
+        p95 = statistics.quantiles(batch, n=20)[-1] if len(batch) > 1 else batch[0]
+        print(
+            f"{size:>6}{statistics.median(legacy) * 1e3:>11.2f} ms"
+            f"{statistics.median(batch) * 1e3:>11.2f} ms{p95 * 1e3:>11.2f} ms"
+        )
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", default=".configs/test.toml")
+    parser.add_argument("--sizes", default="1,30,1000")
+    parser.add_argument("--groups", type=int, default=10)
+    parser.add_argument("--students", type=int, default=25)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+    asyncio.run(run(args.config, sizes, args.groups, args.students))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Compare the memory and the time of exporting every academic report.
+
+Usage:
+    python benchmarks/academic_reports_export.py [--config .configs/test.toml] [--groups 40]
+
+The database is seeded like in `loading_profiles.py` (its tables are
+DROPPED). "buffered" executes the export statement and encodes the whole
+result, like a paged endpoint serving it at once would; "streamed" goes
+through `stream_academic_reports`. The peak is measured with tracemalloc,
+so it only counts the Python allocations.
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable
+
+from loading_profiles import seed
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from journal_backend.config import load_config
+from journal_backend.database.sa_utils import (
+    create_engine,
+    create_session_maker,
+)
+from journal_backend.entity.models import *  # noqa
+from journal_backend.entity.students.enums import ExportFormat
+from journal_backend.entity.students.export import (
+    EXPORT_COLUMNS,
+    academic_reports_export,
+    encode_csv,
+    stream_academic_reports,
+)
+
+
+async def buffered(session_factory: async_sessionmaker[AsyncSession]) -> int:
+    async with session_factory() as session:
+        rows = (await session.execute(academic_reports_export())).all()
+    return len(encode_csv([EXPORT_COLUMNS, *rows]))
+
+
+async def streamed(session_factory: async_sessionmaker[AsyncSession]) -> int:
+    size = 0
+    stream = stream_academic_reports(session_factory, academic_reports_export(), ExportFormat.CSV)
+    async for chunk in stream:
+        size += len(chunk)
+    return size
+
+
+async def measure(
+        export: Callable[[Any], Awaitable[int]],
+        session_factory: async_sessionmaker[AsyncSession],
+) -> tuple[int, float, int]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = await export(session_factory)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, elapsed, peak
+
+
+async def run(config_path: str, groups: int, students: int) -> None:
+    engine = create_engine(load_config(config_path).db)
+    await seed(engine, groups, students)
+    session_factory = create_session_maker(engine)
+
+    print(f"{'mode':<10}{'bytes':>12}{'time':>12}{'peak':>12}")
+    for name, export in (("buffered", buffered), ("streamed", streamed)):
+        await export(session_factory)
+        size, elapsed, peak = await measure(export, session_factory)
+        print(f"{name:<10}{size:>12}{elapsed * 1e3:>9.0f} ms{peak / 2**20:>9.1f} MB")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", default=".configs/test.toml")
+    parser.add_argument("--groups", type=int, default=40)
+    parser.add_argument("--students", type=int, default=25)
+    args = parser.parse_args()
+    asyncio.run(run(args.config, args.groups, args.students))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""Measure the per-request cost of resolving the dependency graph.
+
+Usage:
+    python benchmarks/dependency_resolution.py [--requests 2000]
+
+Both modes serve `GET /students/{id}` against an in-memory session, so the
+numbers only contain routing, dependency resolution and serialization.
+"legacy" reproduces the wiring used before the container: generator
+providers, `lambda` overrides and collaborators rebuilt on every request.
+"""
+import argparse
+import asyncio
+import time
+from functools import partial
+from typing import Any, AsyncGenerator, Generator
+
+from fastapi import Depends, FastAPI
+from httpx import AsyncClient
+from passlib.context import CryptContext
+from redis.asyncio import ConnectionPool, Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from journal_backend.config import (
+    AppConfig,
+    Config,
+    Database,
+    HttpServerConfig,
+    RedisConfig,
+    SMTPConfig,
+)
+from journal_backend.container import AppScope, wire_dependencies
+from journal_backend.depends_stub import Stub
+from journal_backend.entity.classes.repository import ClassRepository
+from journal_backend.entity.common.email_sender import EmailSender
+from journal_backend.entity.students.models import Group, Student
+from journal_backend.entity.students.repository import StudentRepository
+from journal_backend.entity.students.router import router as students_router
+from journal_backend.entity.students.service import StudentService
+from journal_backend.entity.users.dependencies import current_user
+from journal_backend.entity.users.enums import Role
+from journal_backend.entity.users.models import UserIdentity
+from journal_backend.entity.users.repository import UserRepository
+
+IDENTITY = UserIdentity(
+    id=1,
+    name="name",
+    surname="surname",
+    email="student@gmail.com",
+    hashed_password="hash",
+    role=Role.STUDENT,
+    is_active=True,
+    is_verified=True,
+)
+STUDENT = Student(
+    id=1,
+    group_id=1,
+    identity=IDENTITY,
+    group=Group(id=1, name="group", admission_year=2024),
+)
+
+
+class InMemorySession:
+    async def scalar(self, *args: Any, **kwargs: Any) -> Student:
+        return STUDENT
+
+    async def close(self) -> None:
+        pass
+
+
+def make_config() -> Config:
+    return Config(
+        app=AppConfig(jwt_secret="secret"),
+        http_server=HttpServerConfig(),
+        db=Database(user="u", password="p", name="n", host="localhost", port=5432),
+        smtp=SMTPConfig(host="localhost", email="e@mail.com", password="p"),
+        redis=RedisConfig(),
+    )
+
+
+async def get_current_user() -> UserIdentity:
+    return IDENTITY
+
+
+async def get_session() -> AsyncGenerator[InMemorySession, None]:
+    session = InMemorySession()
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+def wire_legacy(app: FastAPI, config: Config, redis_pool: ConnectionPool) -> None:
+    def get_email_sender() -> Generator[EmailSender, None, None]:
+        yield EmailSender()
+
+    async def get_redis_conn(pool: ConnectionPool) -> AsyncGenerator[Redis, None]:
+        yield Redis.from_pool(pool)
+
+    async def get_user_repository(
+            session: AsyncSession = Depends(Stub(AsyncSession)),
+    ) -> AsyncGenerator[UserRepository, None]:
+        yield UserRepository(session, UserIdentity)
+
+    async def get_student_repository(
+            session: AsyncSession = Depends(Stub(AsyncSession)),
+    ) -> AsyncGenerator[StudentRepository, None]:
+        yield StudentRepository(session)
+
+    async def get_class_repository(
+            session: AsyncSession = Depends(Stub(AsyncSession)),
+    ) -> AsyncGenerator[ClassRepository, None]:
+        yield ClassRepository(session)
+
+    async def get_student_service(
+            student_repository: StudentRepository = Depends(Stub(StudentRepository)),
+            user_repository: UserRepository = Depends(Stub(UserRepository)),
+            class_repository: ClassRepository = Depends(Stub(ClassRepository)),
+            email_sender: EmailSender = Depends(Stub(EmailSender)),
+            redis_conn: Redis = Depends(Stub(Redis)),
+    ) -> AsyncGenerator[StudentService, None]:
+        service = StudentService(
+            student_repository,
+            user_repository,
+            class_repository,
+            email_sender,
+            redis_conn,
+            None,  # type: ignore[arg-type]
+        )
+        service.context = CryptContext(schemes=["bcrypt"], deprecated="auto")  # type: ignore
+        yield service
+
+    app.dependency_overrides[Stub(AsyncSession)] = get_session
+    app.dependency_overrides[Stub(Config)] = lambda: config
+    app.dependency_overrides[Stub(AppConfig)] = lambda: config.app
+    app.dependency_overrides[Stub(EmailSender)] = get_email_sender
+    app.dependency_overrides[Stub(Redis)] = partial(get_redis_conn, redis_pool)
+    app.dependency_overrides[Stub(UserRepository)] = get_user_repository
+    app.dependency_overrides[Stub(StudentRepository)] = get_student_repository
+    app.dependency_overrides[Stub(ClassRepository)] = get_class_repository
+    app.dependency_overrides[Stub(StudentService)] = get_student_service
+    app.dependency_overrides[current_user] = get_current_user
+
+
+def wire_container(app: FastAPI, config: Config, redis_pool: ConnectionPool) -> None:
+    scope = AppScope.build(config, redis_pool)
+    wire_dependencies(app, scope)
+    app.dependency_overrides[Stub(AsyncSession)] = get_session
+    app.dependency_overrides[current_user] = get_current_user
+
+
+async def run(mode: str, requests: int) -> None:
+    config = make_config()
+    redis_pool = ConnectionPool.from_url(config.redis.uri)
+    app = FastAPI()
+    app.include_router(students_router)
+    if mode == "legacy":
+        wire_legacy(app, config, redis_pool)
+    else:
+        wire_container(app, config, redis_pool)
+
+    async with AsyncClient(app=app, base_url="http://bench") as client:
+        for _ in range(50):
+            await client.get("/students/1")
+        started = time.perf_counter()
+        for _ in range(requests):
+            resp = await client.get("/students/1")
+        elapsed = time.perf_counter() - started
+    assert resp.status_code == 200, resp.text
+
+    if mode == "container":
+        await app.state.container.aclose()
+    await redis_pool.aclose()
+    print(f"{mode:>9}: {elapsed / requests * 1e6:8.1f} us/request ({requests} requests)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    for mode in ("legacy", "container"):
+        asyncio.run(run(mode, args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Measure email delivery throughput against a local aiosmtpd server.
+
+Usage:
+    python benchmarks/email_delivery.py [--messages 500] [--connections 2]
+
+"per-message" opens, authenticates and closes a connection for every
+message like `EmailSender` used to, "pool" goes through the persistent
+connections of `EmailSender`.
+"""
+import argparse
+import asyncio
+import socket
+import time
+from email.message import EmailMessage
+from typing import Any
+
+import aiosmtplib
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult, Envelope
+
+from journal_backend.config import SMTPConfig
+from journal_backend.entity.common.email_sender import EmailSender
+
+
+class CountingHandler:
+    def __init__(self) -> None:
+        self.received = 0
+
+    async def handle_DATA(self, server: Any, session: Any, envelope: Envelope) -> str:
+        self.received += 1
+        return "250 OK"
+
+
+def make_message(i: int) -> EmailMessage:
+    em = EmailMessage()
+    em['From'] = "journal@gmail.com"
+    em['To'] = f"student{i}@gmail.com"
+    em['Subject'] = 'Mail confirmation'
+    em.set_content("Confirm your email")
+    return em
+
+
+async def send_per_message(cfg: SMTPConfig, em: EmailMessage) -> None:
+    async with aiosmtplib.SMTP(hostname=cfg.host, port=cfg.port, use_tls=False) as smtp:
+        await smtp.login(cfg.email, cfg.password)
+        await smtp.send_message(em)
+
+
+async def run(mode: str, cfg: SMTPConfig, messages: int) -> tuple[float, int]:
+    started = time.perf_counter()
+    if mode == "per-message":
+        results = await asyncio.gather(
+            *(send_per_message(cfg, make_message(i)) for i in range(messages)),
+            return_exceptions=True,
+        )
+        failed = sum(isinstance(result, Exception) for result in results)
+    else:
+        sender = EmailSender(cfg)
+        for i in range(messages):
+            await sender.send_email(make_message(i))
+        await sender.close()
+        failed = sender.failed
+    return time.perf_counter() - started, failed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--connections", type=int, default=2)
+    args = parser.parse_args()
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    handler = CountingHandler()
+    controller = Controller(
+        handler,
+        hostname="127.0.0.1",
+        port=port,
+        authenticator=lambda *_: AuthResult(success=True),
+        auth_require_tls=False,
+    )
+    controller.start()
+    cfg = SMTPConfig(
+        host="127.0.0.1",
+        port=port,
+        email="journal@gmail.com",
+        password="password",
+        use_tls=False,
+        connections=args.connections,
+    )
+    try:
+        for mode in ("per-message", "pool"):
+            received_before = handler.received
+            elapsed, failed = asyncio.run(run(mode, cfg, args.messages))
+            received = handler.received - received_before
+            print(
+                f"{mode:>11}: {received} messages in {elapsed:.2f}s "
+                f"({received / elapsed:.0f} msg/s), {failed} failed"
+            )
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
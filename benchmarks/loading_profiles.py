@@ -0,0 +1,210 @@
+"""Compare the rows fetched and the latency of the old eager graph and the loading profiles.
+
+Usage:
+    python benchmarks/loading_profiles.py [--config .configs/test.toml] [--iterations 200]
+
+The tables of the configured database are DROPPED and seeded with
+`--groups` groups of `--students` students having 20 classes a week for
+4 weeks, every student gets a report for every class of their group.
+"legacy" loads the graph the models used to join by default
+(`lazy="joined"` everywhere, including `Teacher.competencies`),
+"profile" uses the options of the repositories.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import Select, insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import joinedload
+
+from journal_backend.config import load_config
+from journal_backend.database.base import Base
+from journal_backend.database.sa_utils import create_engine
+from journal_backend.entity.classes.loading import SCHEDULE_VIEW
+from journal_backend.entity.classes.models import Class, Classroom
+from journal_backend.entity.models import *  # noqa
+from journal_backend.entity.students.loading import REPORT_VIEW
+from journal_backend.entity.students.models import (
+    AcademicReport,
+    Group,
+    Student,
+)
+from journal_backend.entity.teachers.models import Competence, Subject, Teacher
+from journal_backend.entity.users.enums import Role
+from journal_backend.entity.users.models import UserIdentity
+
+SUBJECTS = 5
+TEACHERS = 10
+WEEKS = 4
+CLASSES_PER_WEEK = 20
+MONDAY = datetime(2024, 9, 2, 9, tzinfo=timezone.utc)
+
+LEGACY_CLASS = (
+    joinedload(Class.group),
+    joinedload(Class.subject),
+    joinedload(Class.classroom),
+    joinedload(Class.teacher).options(
+        joinedload(Teacher.identity),
+        joinedload(Teacher.competencies),
+    ),
+)
+LEGACY_REPORT = (
+    joinedload(AcademicReport.student).options(
+        joinedload(Student.identity),
+        joinedload(Student.group),
+    ),
+    joinedload(AcademicReport.class_).options(*LEGACY_CLASS),
+)
+
+
+async def seed(engine: AsyncEngine, groups: int, students: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    identities = [
+        {
+            "id": i,
+            "name": f"name{i}",
+            "surname": f"surname{i}",
+            "email": f"user{i}@example.com",
+            "hashed_password": "x" * 60,
+            "role": Role.TEACHER if i <= TEACHERS else Role.STUDENT,
+            "is_verified": True,
+        }
+        for i in range(1, TEACHERS + groups * students + 1)
+    ]
+    student_rows = [
+        {"id": TEACHERS + g * students + s + 1, "group_id": g + 1}
+        for g in range(groups)
+        for s in range(students)
+    ]
+    class_rows = [
+        {
+            "id": g * WEEKS * CLASSES_PER_WEEK + c + 1,
+            "group_id": g + 1,
+            "teacher_id": (g + c) % TEACHERS + 1,
+            "subject_id": c % SUBJECTS + 1,
+            "classroom_id": c % SUBJECTS + 1,
+            "starts_at": MONDAY + timedelta(
+                weeks=c // CLASSES_PER_WEEK,
+                days=c % CLASSES_PER_WEEK // 4,
+                hours=c % 4 * 2,
+            ),
+        }
+        for g in range(groups)
+        for c in range(WEEKS * CLASSES_PER_WEEK)
+    ]
+    report_rows = [
+        {"student_id": s["id"], "class_id": c["id"], "is_attended": True}
+        for s in student_rows
+        for c in class_rows
+        if c["group_id"] == s["group_id"]
+    ]
+
+    async with engine.begin() as conn:
+        await conn.execute(insert(UserIdentity), identities)
+        await conn.execute(
+            insert(Subject), [{"id": i, "name": f"subject{i}"} for i in range(1, SUBJECTS + 1)]
+        )
+        await conn.execute(
+            insert(Classroom), [{"id": i, "name": f"room{i}"} for i in range(1, SUBJECTS + 1)]
+        )
+        await conn.execute(
+            insert(Group),
+            [
+                {"id": i, "name": f"group{i}", "admission_year": 2024}
+                for i in range(1, groups + 1)
+            ],
+        )
+        await conn.execute(insert(Teacher), [{"id": i} for i in range(1, TEACHERS + 1)])
+        await conn.execute(
+            insert(Competence),
+            [
+                {"teacher_id": t, "subject_id": s}
+                for t in range(1, TEACHERS + 1)
+                for s in range(1, SUBJECTS + 1)
+            ],
+        )
+        await conn.execute(insert(Student), student_rows)
+        await conn.execute(insert(Class), class_rows)
+        await conn.execute(insert(AcademicReport), report_rows)
+
+
+def queries(options: tuple[Any, ...], report_options: tuple[Any, ...]) -> dict[str, Select[Any]]:
+    week = (MONDAY, MONDAY + timedelta(days=6))
+    return {
+        "schedule_by_group": (
+            select(Class).
+            options(*options).
+            where(Class.group_id == 1).
+            where(Class.starts_at.between(*week))
+        ),
+        "academic_reports": (
+            select(AcademicReport).
+            join(Class, onclause=Class.id == AcademicReport.class_id).
+            options(*report_options).
+            where(AcademicReport.student_id == TEACHERS + 1).
+            where(Class.starts_at.between(*week))
+        ),
+    }
+
+
+async def fetched(engine: AsyncEngine, stmt: Select[Any]) -> tuple[int, int]:
+    # Executed on a connection an ORM statement returns the rows as sent by the server
+    async with engine.connect() as conn:
+        result = await conn.execute(stmt)
+        rows = result.all()
+    return len(rows), len(result.keys())
+
+
+async def latency(engine: AsyncEngine, stmt: Select[Any], iterations: int) -> list[float]:
+    timings = []
+    for _ in range(iterations):
+        async with AsyncSession(engine) as session:
+            started = time.perf_counter()
+            (await session.scalars(stmt)).unique().all()
+            timings.append(time.perf_counter() - started)
+    return timings
+
+
+async def run(config_path: str, groups: int, students: int, iterations: int) -> None:
+    engine = create_engine(load_config(config_path).db)
+    await seed(engine, groups, students)
+
+    modes = {
+        "legacy": queries(LEGACY_CLASS, LEGACY_REPORT),
+        "profile": queries(SCHEDULE_VIEW, REPORT_VIEW),
+    }
+    print(f"{'query':<20}{'mode':<10}{'rows':>8}{'columns':>9}{'p50':>12}{'p95':>12}")
+    for name in modes["legacy"]:
+        for mode, stmts in modes.items():
+            stmt = stmts[name]
+            rows, columns = await fetched(engine, stmt)
+            await latency(engine, stmt, 10)
+            timings = await latency(engine, stmt, iterations)
+            p50 = statistics.median(timings)
+            p95 = statistics.quantiles(timings, n=20)[-1]
+            print(
+                f"{name:<20}{mode:<10}{rows:>8}{columns:>9}"
+                f"{p50 * 1e3:>9.2f} ms{p95 * 1e3:>9.2f} ms"
+            )
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", default=".configs/test.toml")
+    parser.add_argument("--groups", type=int, default=10)
+    parser.add_argument("--students", type=int, default=25)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.config, args.groups, args.students, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
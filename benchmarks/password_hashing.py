@@ -0,0 +1,87 @@
+"""Measure GET latency while registrations hash passwords concurrently.
+
+Usage:
+    python benchmarks/password_hashing.py [--registrations 64] [--workers 2]
+
+The "inline" mode hashes on the event loop like the services used to do,
+the "pool" mode goes through `PasswordHasher`.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastapi import FastAPI
+from httpx import AsyncClient
+from passlib.context import CryptContext
+
+from journal_backend.app_setup import router
+from journal_backend.entity.common.password_hasher import PasswordHasher
+
+
+async def timed_get(client: AsyncClient, scheduled_at: float) -> float:
+    await client.get("/")
+    return time.perf_counter() - scheduled_at
+
+
+async def measure_get_latency(
+        client: AsyncClient, stop: asyncio.Event, interval: float = 0.01
+) -> list[float]:
+    # Open-loop probe: latency is counted from the moment a request was due,
+    # so time spent waiting for a blocked event loop is not hidden.
+    probes = []
+    scheduled_at = time.perf_counter()
+    while not stop.is_set():
+        probes.append(asyncio.create_task(timed_get(client, scheduled_at)))
+        scheduled_at += interval
+        await asyncio.sleep(max(0.0, scheduled_at - time.perf_counter()))
+    return list(await asyncio.gather(*probes))
+
+
+async def run(mode: str, registrations: int, workers: int) -> None:
+    app = FastAPI()
+    app.include_router(router)
+
+    context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    hasher = PasswordHasher(workers=workers, max_pending=registrations)
+    await hasher.hash("warm up the pool")
+
+    async def register(i: int) -> None:
+        if mode == "inline":
+            context.hash(f"password{i}")
+            await asyncio.sleep(0)
+        else:
+            await hasher.hash(f"password{i}")
+
+    stop = asyncio.Event()
+    async with AsyncClient(app=app, base_url="http://bench") as client:
+        probe = asyncio.create_task(measure_get_latency(client, stop))
+        await asyncio.sleep(0.1)
+        started = time.perf_counter()
+        await asyncio.gather(*(register(i) for i in range(registrations)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        latencies = sorted(await probe)
+    hasher.shutdown()
+
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(
+        f"{mode:>6}: {registrations} hashes in {elapsed:.2f}s, "
+        f"GET p50={p50:.2f}ms p99={p99:.2f}ms max={latencies[-1] * 1000:.2f}ms "
+        f"({len(latencies)} requests)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--registrations", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    for mode in ("inline", "pool"):
+        asyncio.run(run(mode, args.registrations, args.workers))
+
+
+if __name__ == "__main__":
+    main()
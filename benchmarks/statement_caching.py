@@ -0,0 +1,144 @@
+"""Measure the per-call Python overhead of the hot repository queries.
+
+Usage:
+    python benchmarks/statement_caching.py [--calls 5000]
+
+Every repository method runs against a session that compiles the statement
+through the asyncpg dialect and a compiled cache, the way `Connection`
+does before sending it, and returns no rows. The numbers only contain
+building the statement, computing its cache key and looking it up.
+"legacy" builds the `select(...)` constructs like the repositories used to,
+"lambda" calls the repositories as they are.
+"""
+import argparse
+import asyncio
+import time
+from datetime import date
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+from sqlalchemy.util import LRUCache
+
+from journal_backend.entity.classes.models import Class
+from journal_backend.entity.classes.repository import ClassRepository
+from journal_backend.entity.models import *  # noqa
+from journal_backend.entity.students.models import AcademicReport, Student
+from journal_backend.entity.students.repository import StudentRepository
+
+D_LEFT = date(2024, 9, 1)
+D_RIGHT = date(2024, 9, 7)
+
+
+class EmptyResult:
+    def unique(self) -> "EmptyResult":
+        return self
+
+    def all(self) -> list[Any]:
+        return []
+
+
+class CompilingSession:
+    def __init__(self) -> None:
+        self.dialect = asyncpg_dialect()
+        self.compiled_cache = LRUCache(500)
+
+    def compile(self, stmt: Any) -> None:
+        stmt._compile_w_cache(
+            self.dialect,
+            compiled_cache=self.compiled_cache,
+            column_keys=[],
+            for_executemany=False,
+            schema_translate_map=None,
+        )
+
+    async def scalar(self, stmt: Any) -> None:
+        self.compile(stmt)
+
+    async def scalars(self, stmt: Any) -> EmptyResult:
+        self.compile(stmt)
+        return EmptyResult()
+
+
+def legacy_methods(session: CompilingSession) -> dict[str, Callable[[int], Awaitable[Any]]]:
+    async def get_schedule_by_group_id(i: int) -> Any:
+        stmt = (
+            select(Class).
+            where(Class.group_id == i).
+            where(Class.starts_at.between(D_LEFT, D_RIGHT))
+        )
+        return (await session.scalars(stmt)).unique().all()
+
+    async def get_schedule_by_teacher_id(i: int) -> Any:
+        stmt = (
+            select(Class).
+            where(Class.teacher_id == i).
+            where(Class.starts_at.between(D_LEFT, D_RIGHT))
+        )
+        return (await session.scalars(stmt)).unique().all()
+
+    async def get_by_id(i: int) -> Any:
+        return await session.scalar(select(Student).where(Student.id == i))
+
+    async def get_academic_reports(i: int) -> Any:
+        stmt = (
+            select(AcademicReport).
+            join(Class, onclause=Class.id == AcademicReport.class_id).
+            where(AcademicReport.student_id == i).
+            where(Class.starts_at.between(D_LEFT, D_RIGHT))
+        )
+        return (await session.scalars(stmt)).unique().all()
+
+    return {
+        "get_schedule_by_group_id": get_schedule_by_group_id,
+        "get_schedule_by_teacher_id": get_schedule_by_teacher_id,
+        "get_by_id": get_by_id,
+        "get_academic_reports": get_academic_reports,
+    }
+
+
+def repository_methods(session: CompilingSession) -> dict[str, Callable[[int], Awaitable[Any]]]:
+    class_repo = ClassRepository(session)  # type:ignore[arg-type]
+    student_repo = StudentRepository(session)  # type:ignore[arg-type]
+    return {
+        "get_schedule_by_group_id": lambda i: class_repo.get_schedule_by_group_id(
+            i, D_LEFT, D_RIGHT
+        ),
+        "get_schedule_by_teacher_id": lambda i: class_repo.get_schedule_by_teacher_id(
+            i, D_LEFT, D_RIGHT
+        ),
+        "get_by_id": student_repo.get_by_id,
+        "get_academic_reports": lambda i: student_repo.get_academic_reports(
+            i, D_LEFT, D_RIGHT
+        ),
+    }
+
+
+async def measure(method: Callable[[int], Awaitable[Any]], calls: int) -> float:
+    for i in range(100):
+        await method(i)
+    started = time.perf_counter()
+    for i in range(calls):
+        await method(i)
+    return (time.perf_counter() - started) / calls
+
+
+async def run(calls: int) -> None:
+    legacy = legacy_methods(CompilingSession())
+    cached = repository_methods(CompilingSession())
+    print(f"{'method':<28}{'legacy':>12}{'lambda':>12}")
+    for name in legacy:
+        legacy_time = await measure(legacy[name], calls)
+        cached_time = await measure(cached[name], calls)
+        print(f"{name:<28}{legacy_time * 1e6:>9.1f} us{cached_time * 1e6:>9.1f} us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(run(args.calls))
+
+
+if __name__ == "__main__":
+    main()
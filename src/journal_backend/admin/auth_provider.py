@@ -1,22 +1,28 @@
 from typing import Any
 
-from fastapi_users.password import PasswordHelper
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from starlette.requests import Request
 from starlette.responses import Response
 from starlette_admin.auth import AuthProvider
 from starlette_admin.exceptions import FormValidationError, LoginFailed
 
+from journal_backend.entity.common.exceptions import PasswordHasherOverloaded
+from journal_backend.entity.common.password_hasher import PasswordHasher
 from journal_backend.entity.users.enums import Role
 from journal_backend.entity.users.models import UserIdentity
 from journal_backend.entity.users.repository import UserRepository
 
 
 class MyAuthProvider(AuthProvider):
-    def __init__(self, session_factory: async_sessionmaker[AsyncSession], **kwargs: Any) -> None:
+    def __init__(
+            self,
+            session_factory: async_sessionmaker[AsyncSession],
+            password_hasher: PasswordHasher,
+            **kwargs: Any,
+    ) -> None:
         super().__init__(**kwargs)
         self.session_factory = session_factory
-        self._password_helper = PasswordHelper()
+        self.password_hasher = password_hasher
 
     async def login(
             self,
@@ -35,16 +41,20 @@ class MyAuthProvider(AuthProvider):
         async with self.session_factory() as session:
             user_repo = UserRepository(session, UserIdentity)
 
-            user = await user_repo.get_by_email(username)
-            if not user or user.role != Role.ADMIN:
-                # Run the hasher to mitigate timing attack
-                # Inspired from Django: https://code.djangoproject.com/ticket/20760
-                self._password_helper.hash(password)
-                raise LoginFailed("Invalid username or password")
+            try:
+                user = await user_repo.get_by_email(username)
+                if not user or user.role != Role.ADMIN:
+                    # Run the hasher to mitigate timing attack
+                    # Inspired from Django: https://code.djangoproject.com/ticket/20760
+                    await self.password_hasher.hash(password)
+                    raise LoginFailed("Invalid username or password")
+
+                verified, updated_password_hash = await self.password_hasher.verify_and_update(
+                    password, user.hashed_password
+                )
+            except PasswordHasherOverloaded as e:
+                raise LoginFailed(str(e))
 
-            verified, updated_password_hash = self._password_helper.verify_and_update(
-                password, user.hashed_password
-            )
             if not verified:
                 raise LoginFailed("Invalid username or password")
 
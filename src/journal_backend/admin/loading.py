@@ -0,0 +1,95 @@
+"""Contain the loading profile of the admin panel.
+
+starlette_admin joins the relation fields of a view itself, the profile
+adds what the `__admin_repr__` of the related objects read on top of it.
+"""
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session, defaultload, joinedload
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from journal_backend.entity.classes.models import Class, ClassTemplate
+from journal_backend.entity.students.models import (
+    AcademicReport,
+    Group,
+    Student,
+)
+from journal_backend.entity.teachers.models import Competence, Teacher
+
+# `Session.info` key
+ADMIN_SESSION = "admin_session"
+
+ADMIN_VIEW: dict[type, tuple[Any, ...]] = {
+    Class: (
+        joinedload(Class.group),
+        joinedload(Class.subject),
+        defaultload(Class.teacher).joinedload(Teacher.identity),
+    ),
+    ClassTemplate: (
+        joinedload(ClassTemplate.group),
+        joinedload(ClassTemplate.subject),
+        defaultload(ClassTemplate.teacher).joinedload(Teacher.identity),
+    ),
+    Student: (
+        joinedload(Student.identity),
+        joinedload(Student.group),
+    ),
+    Teacher: (
+        joinedload(Teacher.identity),
+        joinedload(Teacher.competencies),
+    ),
+    Group: (
+        defaultload(Group.students).joinedload(Student.identity),
+    ),
+    AcademicReport: (
+        defaultload(AcademicReport.student).joinedload(Student.identity),
+        defaultload(AcademicReport.class_).joinedload(Class.group),
+        defaultload(AcademicReport.class_).joinedload(Class.subject),
+    ),
+    Competence: (
+        defaultload(Competence.teacher).joinedload(Teacher.identity),
+    ),
+}
+
+
+class AdminViewMiddleware:
+    """Represent a middleware marking the admin session for the admin profile.
+
+    Must run inside the `DBSessionMiddleware` of starlette_admin.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        session = scope.get("state", {}).get("session")
+        if session is not None:
+            session.info[ADMIN_SESSION] = True
+        await self.app(scope, receive, send)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _apply_admin_view(state: ORMExecuteState) -> None:
+    if (
+            not state.session.info.get(ADMIN_SESSION)
+            or not state.is_select
+            or state.is_relationship_load
+            or state.is_column_load
+    ):
+        return
+    mapper = state.bind_mapper
+    if mapper is None:
+        return
+    options = ADMIN_VIEW.get(mapper.class_)
+    if options and _selects_entity(state.statement, mapper.class_):
+        state.statement = state.statement.options(*options)
+
+
+def _selects_entity(stmt: Any, entity: type) -> bool:
+    # Loader options can't apply to the columns of an entity, e.g. the
+    # `count` of the list views or `select(Class.starts_at)`
+    return any(
+        description["expr"] is entity
+        for description in getattr(stmt, "column_descriptions", ())
+    )
@@ -1,8 +1,8 @@
 from datetime import time, timedelta
-from typing import Any
+from typing import Any, Optional, Sequence
 
-from passlib.context import CryptContext
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.requests import Request
 from starlette_admin import (
@@ -12,11 +12,29 @@ from starlette_admin import (
     RequestAction,
     TimeField,
 )
+from starlette_admin.actions import action
 from starlette_admin.contrib.sqla import ModelView
-from starlette_admin.exceptions import FormValidationError
+from starlette_admin.exceptions import ActionFailed, FormValidationError
 
+from journal_backend.entity.classes import exceptions as c_exceptions
+from journal_backend.entity.classes.conflicts import conflict_kind
+from journal_backend.entity.classes.enums import ConflictKind
 from journal_backend.entity.classes.models import Classroom
+from journal_backend.entity.classes.repository import ClassRepository
+from journal_backend.entity.classes.service import ClassService
+from journal_backend.entity.classes.templates import template_zone
+from journal_backend.entity.common.exceptions import PasswordHasherOverloaded
+from journal_backend.entity.common.password_hasher import PasswordHasher
 from journal_backend.entity.teachers.models import Subject, Teacher
+from journal_backend.entity.users.cache import IdentityCache
+from journal_backend.entity.users.models import UserIdentity
+
+# The form field and error of each kind of overlap with another class
+CONFLICT_ERRORS: dict[ConflictKind, tuple[str, str]] = {
+    ConflictKind.GROUP: ("group", "Group already has a class at this time"),
+    ConflictKind.TEACHER: ("teacher", "Teacher already has a class at this time"),
+    ConflictKind.CLASSROOM: ("classroom", "Classroom is already taken at this time"),
+}
 
 
 class ClassView(ModelView):
@@ -52,6 +70,13 @@ class ClassView(ModelView):
 
         return await super().validate(request, data)
 
+    def handle_exception(self, exc: Exception) -> None:
+        kind = conflict_kind(exc) if isinstance(exc, IntegrityError) else None
+        if kind is not None:
+            field, message = CONFLICT_ERRORS[kind]
+            raise FormValidationError({field: message})
+        super().handle_exception(exc)
+
     async def serialize_field_value(
             self, value: Any, field: BaseField, action: RequestAction, request: Request
     ) -> Any:
@@ -77,6 +102,73 @@ class ClassView(ModelView):
         return await field.serialize_value(request, value, action)
 
 
+class ClassTemplateView(ClassView):
+    fields = [
+        "id",  # type:ignore
+        "weekday",  # type:ignore
+        "every_weeks",  # type:ignore
+        "starts_on",  # type:ignore
+        "ends_on",  # type:ignore
+        "skipped_dates",  # type:ignore
+        "starts_at",  # type:ignore
+        "time_zone",  # type:ignore
+        TimeField("duration"),
+        "group",  # type:ignore
+        "teacher",  # type:ignore
+        "classroom",  # type:ignore
+        "subject",  # type:ignore
+    ]
+    searchable_fields = ["group", "subject"]
+    actions = ["generate", "delete"]
+
+    async def validate(self, request: Request, data: dict[str, Any]) -> None:
+        # The teacher and the subject of a template are optional
+        errors: dict[str | int, Any] = {}
+        try:
+            template_zone(data['time_zone'])
+        except c_exceptions.InvalidTimeZone as e:
+            errors['time_zone'] = f"{e}, use an IANA name such as Europe/Moscow"
+
+        teacher_id = data['teacher'].id if data['teacher'] else None
+        if teacher_id is not None and data['subject'] is not None:
+            session: AsyncSession = request.state.session
+            teacher = await session.get(Teacher, teacher_id)
+            competencies = [subject.name for subject in teacher.competencies] if teacher else []
+            if teacher and data['subject'].name not in competencies:
+                name = f'{teacher.identity.surname.title()} {teacher.identity.name.title()}'
+                errors['subject'] = f'Teacher {name} has no competence for this subject'
+        if errors:
+            raise FormValidationError(errors)
+
+        duration: time = data['duration']
+        data['duration'] = timedelta(hours=duration.hour, minutes=duration.minute)
+        await ModelView.validate(self, request, data)
+
+    @action(
+        name="generate",
+        text="Generate classes",
+        confirmation="Replace the future classes of the selected templates?",
+        submit_btn_text="Yes, generate",
+    )
+    async def generate(self, request: Request, pks: Sequence[Any]) -> str:
+        service = ClassService(ClassRepository(request.state.session))
+        # All the templates or none, a conflict leaves the timetable as it was
+        try:
+            generation = await service.generate_templates([int(pk) for pk in pks])
+        except c_exceptions.OccurrencesConflict as e:
+            starts = ", ".join(str(conflict.starts_at) for conflict in e.conflicts[:5])
+            raise ActionFailed(
+                f"Template {e.template_id}: {e} at {starts or 'the same time'}, "
+                f"no template was applied"
+            )
+        except (c_exceptions.TemplateNotFound, c_exceptions.InvalidTimeZone) as e:
+            raise ActionFailed(f"Template {e.template_id}: {e}, no template was applied")
+        return (
+            f"{generation.created} classes created, "
+            f"{generation.deleted} future classes replaced"
+        )
+
+
 class ClassroomView(ModelView):
     fields = ["id", "name"]  # type:ignore
     searchable_fields = ["name"]
@@ -131,9 +223,32 @@ class UserIdentityView(ModelView):
     ]
     searchable_fields = ["name", "surname"]
 
+    def __init__(
+            self,
+            model: type[UserIdentity],
+            password_hasher: PasswordHasher,
+            identity_cache: Optional[IdentityCache] = None,
+            **kwargs: Any,
+    ) -> None:
+        super().__init__(model, **kwargs)
+        self.password_hasher = password_hasher
+        self.identity_cache = identity_cache
+
+    async def after_edit(self, request: Request, obj: UserIdentity) -> None:
+        self._invalidate(obj.id)
+
+    async def after_delete(self, request: Request, obj: UserIdentity) -> None:
+        self._invalidate(obj.id)
+
+    def _invalidate(self, user_id: int) -> None:
+        if self.identity_cache is not None:
+            self.identity_cache.invalidate(user_id)
+
     async def validate(self, request: Request, data: dict[str, Any]) -> None:
-        context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-        data['hashed_password'] = context.hash(data['hashed_password'])
+        try:
+            data['hashed_password'] = await self.password_hasher.hash(data['hashed_password'])
+        except PasswordHasherOverloaded as e:
+            raise FormValidationError({'hashed_password': str(e)})
 
         return await super().validate(request, data)
 
@@ -1,19 +1,19 @@
 """Contain functions required for configuration of the project components."""
-from functools import partial
 from typing import TYPE_CHECKING, TypeAlias
 
 import uvicorn
 from fastapi import APIRouter, FastAPI
 from pydantic import BaseModel
-from redis.asyncio import Connection, ConnectionPool, Redis
-from sqlalchemy.ext.asyncio import AsyncSession
+from redis.asyncio import Connection, ConnectionPool
 from starlette.middleware import Middleware
 from starlette.middleware.sessions import SessionMiddleware
 from starlette_admin.contrib.sqla import Admin, ModelView
 
 from journal_backend.admin.auth_provider import MyAuthProvider
+from journal_backend.admin.loading import AdminViewMiddleware
 from journal_backend.admin.views import (
     ClassroomView,
+    ClassTemplateView,
     ClassView,
     GroupView,
     StudentView,
@@ -22,49 +22,26 @@ from journal_backend.admin.views import (
     UserIdentityView,
 )
 from journal_backend.config import AppConfig, Config, HttpServerConfig
-from journal_backend.database.dependencies import get_session
-from journal_backend.database.sa_utils import (
-    create_engine,
-    create_session_maker,
-)
-from journal_backend.depends_stub import Stub
-from journal_backend.entity.classes.dependencies import get_class_repository
-from journal_backend.entity.classes.models import Class, Classroom
-from journal_backend.entity.classes.repository import ClassRepository
-from journal_backend.entity.common.dependencies import (
-    get_email_sender,
-    get_redis_conn,
-)
-from journal_backend.entity.common.email_sender import EmailSender
-from journal_backend.entity.students.dependencies import (
-    get_student_repository,
-    get_student_service,
+from journal_backend.container import AppScope, wire_dependencies
+from journal_backend.database.router import router as metrics_router
+from journal_backend.entity.classes.models import (
+    Class,
+    Classroom,
+    ClassTemplate,
 )
+from journal_backend.entity.classes.router import router as classes_router
+from journal_backend.entity.imports.router import router as imports_router
 from journal_backend.entity.students.models import (
     AcademicReport,
     Group,
     Student,
 )
-from journal_backend.entity.students.repository import StudentRepository
 from journal_backend.entity.students.router import groups_router
 from journal_backend.entity.students.router import router as students_router
-from journal_backend.entity.students.service import StudentService
-from journal_backend.entity.teachers.dependencies import (
-    get_teacher_repository,
-    get_teacher_service,
-)
 from journal_backend.entity.teachers.models import Competence, Subject, Teacher
-from journal_backend.entity.teachers.repository import TeacherRepository
 from journal_backend.entity.teachers.router import router as teachers_router
-from journal_backend.entity.teachers.service import TeacherService
-from journal_backend.entity.users.dependencies import (
-    get_user_repository,
-    get_user_service,
-)
 from journal_backend.entity.users.models import UserIdentity
-from journal_backend.entity.users.repository import UserRepository
 from journal_backend.entity.users.router import router as users_router
-from journal_backend.entity.users.service import UserService
 
 router = APIRouter()
 
@@ -105,6 +82,9 @@ def initialise_routers(app: FastAPI) -> None:
     app.include_router(teachers_router)
     app.include_router(students_router)
     app.include_router(groups_router)
+    app.include_router(classes_router)
+    app.include_router(metrics_router)
+    app.include_router(imports_router)
 
 
 def initialise_dependencies(
@@ -119,18 +99,25 @@ def initialise_dependencies(
         config (Config): The config instance.
         redis_pool (ConnectionPoolT): The redis connection pool.
     """
-    engine = create_engine(config.db.uri)
-    session_factory = create_session_maker(engine)
+    scope = AppScope.build(config, redis_pool)
 
     admin = Admin(
-        engine,
+        scope.engine,
         title="Sirius Journal admin",
         auth_provider=MyAuthProvider(
-            session_factory,
+            scope.session_factory,
+            scope.password_hasher,
         ),
-        middlewares=[Middleware(SessionMiddleware, secret_key=config.app.jwt_secret)],
+        middlewares=[
+            Middleware(SessionMiddleware, secret_key=config.app.jwt_secret),
+            Middleware(AdminViewMiddleware),
+        ],
     )
-    admin.add_view(UserIdentityView(UserIdentity))
+    admin.add_view(UserIdentityView(
+        UserIdentity,
+        password_hasher=scope.password_hasher,
+        identity_cache=scope.identity_cache,
+    ))
     admin.add_view(StudentView(Student))
     admin.add_view(GroupView(Group))
     admin.add_view(TeacherView(Teacher))
@@ -138,22 +125,11 @@ def initialise_dependencies(
     admin.add_view(ClassroomView(Classroom))
     admin.add_view(ModelView(Competence))
     admin.add_view(ClassView(Class, label='Classes'))
+    admin.add_view(ClassTemplateView(ClassTemplate, label='Class templates'))
     admin.add_view(ModelView(AcademicReport))
     admin.mount_to(app)
 
-    app.dependency_overrides[Stub(AsyncSession)] = partial(get_session, session_factory)
-    app.dependency_overrides[Stub(Config)] = lambda: config
-    app.dependency_overrides[Stub(AppConfig)] = lambda: config.app
-
-    app.dependency_overrides[Stub(EmailSender)] = get_email_sender
-    app.dependency_overrides[Stub(Redis)] = partial(get_redis_conn, redis_pool)
-    app.dependency_overrides[Stub(UserRepository)] = get_user_repository
-    app.dependency_overrides[Stub(UserService)] = get_user_service
-    app.dependency_overrides[Stub(StudentRepository)] = get_student_repository
-    app.dependency_overrides[Stub(ClassRepository)] = get_class_repository
-    app.dependency_overrides[Stub(StudentService)] = get_student_service
-    app.dependency_overrides[Stub(TeacherRepository)] = get_teacher_repository
-    app.dependency_overrides[Stub(TeacherService)] = get_teacher_service
+    wire_dependencies(app, scope)
 
 
 def create_app(app_cfg: AppConfig) -> FastAPI:
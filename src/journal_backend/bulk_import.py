@@ -0,0 +1,126 @@
+"""Bulk import entry point.
+
+Run with `python -m journal_backend.bulk_import <import id> <kind> <file>`,
+the classes before the academic reports referencing them. Running it
+again with the same import id resumes an interrupted or failed import.
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from typing import AsyncIterator
+
+from redis.asyncio import Redis
+
+from journal_backend.config import Config, load_config
+from journal_backend.consts import CONFIG_PATH
+from journal_backend.database.sa_utils import (
+    create_engine,
+    create_session_maker,
+)
+from journal_backend.entity.classes.cache import ScheduleCache
+from journal_backend.entity.imports import exceptions
+from journal_backend.entity.imports.dto import ImportProgress
+from journal_backend.entity.imports.enums import ImportFormat, ImportKind
+from journal_backend.entity.imports.importer import BulkImporter, iter_lines
+from journal_backend.entity.imports.targets import TARGETS
+from journal_backend.entity.students.verification import (
+    verify_academic_aggregates,
+)
+
+logger = logging.getLogger(__name__)
+
+READ_SIZE = 1 << 20
+
+
+async def read_file(path: str) -> AsyncIterator[bytes]:
+    with open(path, "rb") as source:
+        while chunk := await asyncio.to_thread(source.read, READ_SIZE):
+            yield chunk
+
+
+async def invalidate_schedules(config: Config) -> None:
+    """Drop the cached schedules, the merged classes bypass their invalidation."""
+    redis = Redis.from_url(config.redis.uri)
+    try:
+        await ScheduleCache(redis, config.app.schedule_cache_ttl_seconds).invalidate_all()
+    finally:
+        await redis.aclose()  # type:ignore[attr-defined]
+
+
+async def main() -> int:
+    """Import the file, return the exit status."""
+    parser = argparse.ArgumentParser(description="Import historical records")
+    parser.add_argument("import_id")
+    parser.add_argument("kind", choices=[kind.value for kind in ImportKind])
+    parser.add_argument("path")
+    parser.add_argument(
+        "--format",
+        choices=[fmt.value for fmt in ImportFormat],
+        help="the file extension by default",
+    )
+    parser.add_argument(
+        "--skip-invalid",
+        action="store_true",
+        help="drop the rows referencing missing records instead of failing",
+    )
+    args = parser.parse_args()
+
+    config = load_config(CONFIG_PATH)
+    logging.basicConfig(level=config.http_server.log_level.upper())
+
+    started = time.perf_counter()
+
+    def log_progress(progress: ImportProgress) -> None:
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "%d rows staged, %d merged, %d invalid, %.0f rows/s",
+            progress.staged_rows,
+            progress.merged_rows,
+            progress.invalid_rows,
+            progress.staged_rows / elapsed if elapsed else 0,
+        )
+
+    fmt = ImportFormat(args.format or args.path.rsplit(".", 1)[-1].lower())
+    engine = create_engine(config.db)
+    try:
+        importer = BulkImporter(
+            engine,
+            TARGETS[ImportKind(args.kind)],
+            args.import_id,
+            skip_invalid=args.skip_invalid,
+            on_progress=log_progress,
+        )
+        progress = await importer.run(iter_lines(read_file(args.path)), fmt)
+        if args.kind == ImportKind.CLASSES:
+            await invalidate_schedules(config)
+        # The merged rows bypass the incremental update of the aggregates
+        await verify_academic_aggregates(create_session_maker(engine))
+    except (
+            exceptions.InvalidImportId,
+            exceptions.ImportFormatError,
+            exceptions.InvalidForeignKeys,
+            exceptions.ConflictingClasses,
+    ) as e:
+        logger.error("Import %s failed: %s", args.import_id, e)
+        return 1
+    finally:
+        await engine.dispose()
+
+    logger.info(
+        "Import %s finished in %.0f s: %d rows merged, %d invalid rows skipped",
+        args.import_id,
+        time.perf_counter() - started,
+        progress.merged_rows,
+        progress.invalid_rows,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+    sys.exit(asyncio.run(main()))
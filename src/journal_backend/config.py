@@ -1,6 +1,6 @@
 """Provide classes and functions for loading an application config."""
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 import toml
 
@@ -13,6 +13,15 @@ DEFAULT_APP_VERSION: str = "0.0.1"
 DEFAULT_SERVER_HOST: str = "0.0.0.0"
 DEFAULT_SERVER_PORT: int = 8000
 DEFAULT_SERVER_LOG_LEVEL: str = "info"
+DEFAULT_IDENTITY_CACHE_SIZE: int = 10_000
+DEFAULT_IDENTITY_CACHE_TTL_SECONDS: int = 60
+DEFAULT_SCHEDULE_CACHE_TTL_SECONDS: int = 60 * 60
+DEFAULT_TIMETABLE_WEEKS: int = 4
+DEFAULT_TIMETABLE_REFRESH_SECONDS: float = 5 * 60
+DEFAULT_PASSWORD_HASHING_WORKERS: int = 2
+DEFAULT_PASSWORD_HASHING_MAX_PENDING: int = 64
+DEFAULT_JOBS_STREAM: str = "journal:jobs"
+DEFAULT_JOBS_GROUP: str = "journal-workers"
 
 
 @dataclass(kw_only=True)
@@ -23,6 +32,15 @@ class AppConfig:
         title (str): The title of the application.
         description (str): The description of the application.
         jwt_secret (str): The JWT secret key for authentication.
+        jwt_claims (bool): Whether to sign the role, group and verification status
+            into access tokens, so authenticating a request needs no database lookup.
+        identity_cache_size (int): The maximum amount of cached user identities.
+        identity_cache_ttl_seconds (int): The lifetime of a cached user identity.
+        schedule_cache_ttl_seconds (int): The lifetime of the cached weekly schedules
+            of a group or a teacher, 0 disables the cache.
+        timetable_weeks (int): The amount of weeks of classes, from the current one,
+            indexed in memory for the availability search, 0 disables the index.
+        timetable_refresh_seconds (float): How often the timetable index is reloaded.
     """
 
     title: str = DEFAULT_APP_TITLE
@@ -30,6 +48,12 @@ class AppConfig:
     version: str = DEFAULT_APP_VERSION
     jwt_secret: str
     jwt_lifetime_seconds: int = 60 * 60
+    jwt_claims: bool = False
+    identity_cache_size: int = DEFAULT_IDENTITY_CACHE_SIZE
+    identity_cache_ttl_seconds: int = DEFAULT_IDENTITY_CACHE_TTL_SECONDS
+    schedule_cache_ttl_seconds: int = DEFAULT_SCHEDULE_CACHE_TTL_SECONDS
+    timetable_weeks: int = DEFAULT_TIMETABLE_WEEKS
+    timetable_refresh_seconds: float = DEFAULT_TIMETABLE_REFRESH_SECONDS
 
 
 @dataclass
@@ -57,6 +81,18 @@ class Database:
         name (str): The name of the database.
         host (str): The host IP address for the database.
         port (int): The port number for the database.
+        pool_size (int): The amount of connections kept open in the pool.
+        max_overflow (int): The amount of extra connections opened under load.
+        pool_timeout (float): How long a checkout waits for a free connection.
+        pool_recycle (int): The maximum age of a connection in seconds, -1 to disable.
+        pool_pre_ping (bool): Whether to test a connection on every checkout.
+        connect_timeout (float): The timeout of establishing a connection.
+        statement_cache_size (int): The size of the asyncpg prepared statement
+            cache of every connection, 0 to disable.
+        echo (bool): Whether to log every SQL statement.
+        replicas (list[str]): The `host:port` addresses of the read replicas
+            serving GET requests, sharing the credentials of the primary.
+        replica_check_interval (float): How often the replicas are health checked.
     """
 
     user: str
@@ -64,21 +100,57 @@ class Database:
     name: str
     host: str
     port: int
+    pool_size: int = 15
+    max_overflow: int = 15
+    pool_timeout: float = 30
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    connect_timeout: float = 5
+    statement_cache_size: int = 100
+    echo: bool = False
+    replicas: list[str] = field(default_factory=list)
+    replica_check_interval: float = 5
 
     def __post_init__(self) -> None:
-        """Initialise database URI."""
-        self.uri = (
-            f"postgresql+asyncpg://{self.user}:{self.password}@"  # noqa
-            f"{self.host}:{self.port}/{self.name}"  # noqa
-        )
+        """Initialise database URIs."""
+        self.uri = self.make_uri(f"{self.host}:{self.port}")
+        self.replica_uris = [self.make_uri(address) for address in self.replicas]
+
+    def make_uri(self, address: str) -> str:
+        return f"postgresql+asyncpg://{self.user}:{self.password}@{address}/{self.name}"  # noqa
 
 
 @dataclass
 class SMTPConfig:
+    """Represent the SMTP server and delivery pool configuration.
+
+    Attributes:
+        host (str): The host of the SMTP server.
+        email (str): The sender address, also used as the login.
+        password (str): The password of the sender.
+        port (int): The port of the SMTP server.
+        use_tls (bool): Whether to connect over implicit TLS.
+        connections (int): The amount of persistent connections delivering mail.
+        queue_size (int): The maximum amount of messages waiting for delivery.
+        max_retries (int): The amount of retries of a message before giving up.
+        backoff_seconds (float): The delay before the first retry, doubled on every retry.
+        backoff_max_seconds (float): The upper bound of the retry delay.
+        timeout_seconds (float): The timeout of a single SMTP operation.
+        drain_timeout (float): How long to wait for the queue to drain on shutdown.
+    """
+
     host: str
     email: str
     password: str
     port: int = 465
+    use_tls: bool = True
+    connections: int = 2
+    queue_size: int = 1000
+    max_retries: int = 5
+    backoff_seconds: float = 0.5
+    backoff_max_seconds: float = 30
+    timeout_seconds: float = 10
+    drain_timeout: float = 30
 
 @dataclass
 class RedisConfig:
@@ -90,6 +162,53 @@ class RedisConfig:
         return f"redis://{self.host}:{self.port}/0"
 
 
+@dataclass
+class PasswordHashingConfig:
+    """Represent the password hashing pool configuration.
+
+    Attributes:
+        workers (int): The amount of processes hashing and verifying passwords.
+        max_pending (int): The maximum amount of queued and running operations.
+    """
+
+    workers: int = DEFAULT_PASSWORD_HASHING_WORKERS
+    max_pending: int = DEFAULT_PASSWORD_HASHING_MAX_PENDING
+
+
+@dataclass
+class JobsConfig:
+    """Represent the background job queue configuration.
+
+    Attributes:
+        enabled (bool): Whether deferred work (e.g. emails) goes through the queue
+            to the workers instead of running inside the HTTP process.
+        stream (str): The redis stream holding the jobs.
+        group (str): The consumer group of the workers.
+        concurrency (int): The amount of consumers running in one worker process.
+        batch_size (int): The maximum amount of jobs read at once by a consumer.
+        block_ms (int): How long a consumer waits for new jobs.
+        claim_idle_ms (int): The idle time after which a job left unacknowledged
+            by a dead consumer is taken over.
+        max_attempts (int): The amount of attempts before a job is dead-lettered.
+        max_len (int): The approximate maximum length of the streams.
+        retry_backoff_ms (int): The delay before a failed job is run again or a
+            lost redis connection is retried, doubled on every further failure.
+        retry_backoff_max_ms (int): The upper bound of the retry delay.
+    """
+
+    enabled: bool = False
+    stream: str = DEFAULT_JOBS_STREAM
+    group: str = DEFAULT_JOBS_GROUP
+    concurrency: int = 4
+    batch_size: int = 10
+    block_ms: int = 5000
+    claim_idle_ms: int = 60_000
+    max_attempts: int = 5
+    max_len: int = 100_000
+    retry_backoff_ms: int = 1000
+    retry_backoff_max_ms: int = 300_000
+
+
 @dataclass
 class Config:
     """Represent the overall configuration of the project.
@@ -99,6 +218,9 @@ class Config:
         http_server (HttpServerConfig): The HTTP server configuration.
         db (Database): The database configuration.
         smtp (SMTPConfig): The SMTP server configuration.
+        redis (RedisConfig): The redis configuration.
+        password_hashing (PasswordHashingConfig): The password hashing pool configuration.
+        jobs (JobsConfig): The background job queue configuration.
     """
 
     app: AppConfig
@@ -106,6 +228,8 @@ class Config:
     db: Database
     smtp: SMTPConfig
     redis: RedisConfig
+    password_hashing: PasswordHashingConfig = field(default_factory=PasswordHashingConfig)
+    jobs: JobsConfig = field(default_factory=JobsConfig)
 
 
 def load_config(config_path: str) -> Config:
@@ -122,4 +246,6 @@ def load_config(config_path: str) -> Config:
         db=Database(**data["db"]),
         smtp=SMTPConfig(**data["smtp"]),
         redis=RedisConfig(**data["redis"]),
+        password_hashing=PasswordHashingConfig(**data.get("password_hashing", {})),
+        jobs=JobsConfig(**data.get("jobs", {})),
     )
@@ -0,0 +1,226 @@
+"""Contain the dependency container of the application.
+
+Dependencies live in one of two scopes:
+
+* app scope - stateless collaborators (config, engine, redis client, job
+  queue, email sender, password hasher, JWT strategy...) built once at
+  startup and handed out as-is to every request;
+* request scope - the database session and the repositories and services
+  bound to it. FastAPI resolves them lazily, only for the endpoints that
+  depend on them, and caches them for the rest of the request.
+"""
+from dataclasses import dataclass
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Optional,
+    TypeAlias,
+    TypeVar,
+)
+
+from fastapi import FastAPI
+from redis.asyncio import Connection, ConnectionPool, Redis
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+)
+
+from journal_backend.config import AppConfig, Config
+from journal_backend.database.dependencies import get_session
+from journal_backend.database.routing import ReplicaRouter
+from journal_backend.database.sa_utils import (
+    create_engine,
+    create_routing_session_maker,
+)
+from journal_backend.depends_stub import Stub
+from journal_backend.entity.classes.cache import ScheduleCache
+from journal_backend.entity.classes.dependencies import (
+    get_class_repository,
+    get_class_service,
+)
+from journal_backend.entity.classes.repository import ClassRepository
+from journal_backend.entity.classes.service import ClassService
+from journal_backend.entity.classes.timetable import TimetableIndex
+from journal_backend.entity.common.email_sender import (
+    EmailSender,
+    MailSender,
+    QueuedEmailSender,
+)
+from journal_backend.entity.common.job_queue import JobQueue
+from journal_backend.entity.common.password_hasher import PasswordHasher
+from journal_backend.entity.students.dependencies import (
+    get_student_repository,
+    get_student_service,
+)
+from journal_backend.entity.students.repository import StudentRepository
+from journal_backend.entity.students.service import StudentService
+from journal_backend.entity.teachers.dependencies import (
+    get_teacher_repository,
+    get_teacher_service,
+)
+from journal_backend.entity.teachers.repository import TeacherRepository
+from journal_backend.entity.teachers.service import TeacherService
+from journal_backend.entity.users.cache import IdentityCache
+from journal_backend.entity.users.dependencies import (
+    get_user_repository,
+    get_user_service,
+)
+from journal_backend.entity.users.repository import UserRepository
+from journal_backend.entity.users.service import UserService
+from journal_backend.entity.users.tokens import ClaimsJWTStrategy
+
+if TYPE_CHECKING:
+    ConnectionPoolT: TypeAlias = ConnectionPool[Connection]  # type:ignore
+    RedisT: TypeAlias = Redis[str]  # type:ignore
+else:
+    ConnectionPoolT = ConnectionPool
+    RedisT = Redis
+
+T = TypeVar("T")
+
+
+def provide(instance: T) -> Callable[[], Awaitable[T]]:
+    """Wrap an app scoped instance into a dependency provider.
+
+    The provider is a coroutine function on purpose: FastAPI runs plain
+    functions (e.g. `lambda: instance`) in the threadpool.
+    """
+    async def provider() -> T:
+        return instance
+
+    return provider
+
+
+@dataclass(kw_only=True)
+class AppScope:
+    """Represent the dependencies shared by every request of the app."""
+
+    config: Config
+    engine: AsyncEngine
+    db_router: ReplicaRouter
+    session_factory: async_sessionmaker[AsyncSession]
+    redis: RedisT
+    job_queue: JobQueue
+    email_sender: MailSender
+    password_hasher: PasswordHasher
+    identity_cache: IdentityCache
+    schedule_cache: ScheduleCache
+    timetable: TimetableIndex
+    jwt_strategy: ClaimsJWTStrategy
+
+    @classmethod
+    def build(cls, config: Config, redis_pool: ConnectionPoolT) -> "AppScope":
+        engine = create_engine(config.db)
+        db_router = ReplicaRouter(
+            engine,
+            [create_engine(config.db, uri) for uri in config.db.replica_uris],
+            check_interval=config.db.replica_check_interval,
+        )
+        session_factory = create_routing_session_maker(db_router)
+        redis = Redis(connection_pool=redis_pool)
+        job_queue = JobQueue(redis, config.jobs)
+        email_sender: MailSender
+        if config.jobs.enabled:
+            email_sender = QueuedEmailSender(job_queue)
+        else:
+            email_sender = EmailSender(config.smtp)
+        return cls(
+            config=config,
+            engine=engine,
+            db_router=db_router,
+            session_factory=session_factory,
+            redis=redis,
+            job_queue=job_queue,
+            email_sender=email_sender,
+            password_hasher=PasswordHasher(
+                workers=config.password_hashing.workers,
+                max_pending=config.password_hashing.max_pending,
+            ),
+            identity_cache=IdentityCache(
+                max_size=config.app.identity_cache_size,
+                ttl_seconds=config.app.identity_cache_ttl_seconds,
+            ),
+            schedule_cache=ScheduleCache(
+                redis,
+                ttl_seconds=config.app.schedule_cache_ttl_seconds,
+            ),
+            timetable=TimetableIndex(
+                session_factory,
+                weeks=config.app.timetable_weeks,
+                refresh_seconds=config.app.timetable_refresh_seconds,
+            ),
+            jwt_strategy=ClaimsJWTStrategy(
+                secret=config.app.jwt_secret,
+                lifetime_seconds=config.app.jwt_lifetime_seconds,
+                include_claims=config.app.jwt_claims,
+                group_id_loader=partial(_load_student_group_id, session_factory),
+            ),
+        )
+
+    async def start(self) -> None:
+        await self.db_router.start()
+        self.schedule_cache.listen()
+        self.timetable.listen()
+        await self.timetable.start()
+
+    async def aclose(self) -> None:
+        self.schedule_cache.remove()
+        self.timetable.remove()
+        await self.timetable.aclose()
+        await self.email_sender.close()
+        self.password_hasher.shutdown()
+        await self.db_router.aclose()
+
+
+async def _load_student_group_id(
+        session_factory: async_sessionmaker[AsyncSession], student_id: int
+) -> Optional[int]:
+    async with session_factory() as session:
+        group_id: Optional[int] = await StudentRepository(session).get_group_id(student_id)
+    return group_id
+
+
+def wire_dependencies(app: FastAPI, scope: AppScope) -> None:
+    """Register the app and request scoped providers in the app.
+
+    Args:
+        app (FastAPI): The FastAPI instance.
+        scope (AppScope): The app scoped dependencies.
+    """
+    app_scoped: dict[Any, Any] = {
+        Stub(Config): scope.config,
+        Stub(AsyncEngine): scope.engine,
+        Stub(async_sessionmaker): scope.session_factory,
+        Stub(AppConfig): scope.config.app,
+        Stub(Redis): scope.redis,
+        Stub(EmailSender): scope.email_sender,
+        Stub(JobQueue): scope.job_queue,
+        Stub(PasswordHasher): scope.password_hasher,
+        Stub(IdentityCache): scope.identity_cache,
+        Stub(ScheduleCache): scope.schedule_cache,
+        Stub(TimetableIndex): scope.timetable,
+        Stub(ClaimsJWTStrategy): scope.jwt_strategy,
+    }
+    for key, instance in app_scoped.items():
+        app.dependency_overrides[key] = provide(instance)
+
+    request_scoped: dict[Any, Callable[..., Any]] = {
+        Stub(AsyncSession): partial(get_session, scope.session_factory),
+        Stub(UserRepository): get_user_repository,
+        Stub(UserService): get_user_service,
+        Stub(StudentRepository): get_student_repository,
+        Stub(ClassRepository): get_class_repository,
+        Stub(ClassService): get_class_service,
+        Stub(StudentService): get_student_service,
+        Stub(TeacherRepository): get_teacher_repository,
+        Stub(TeacherService): get_teacher_service,
+    }
+    app.dependency_overrides.update(request_scoped)
+
+    app.state.container = scope
+    app.add_event_handler("startup", scope.start)
+    app.add_event_handler("shutdown", scope.aclose)
@@ -1,12 +1,46 @@
-from typing import AsyncGenerator
+from contextvars import ContextVar
+from typing import Any, AsyncGenerator, Callable, Optional, TypeVar
 
-from sqlalchemy.orm import Session, sessionmaker
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from journal_backend.database.routing import READ_ONLY
 from journal_backend.database.sa_utils import create_session
 
+READ_ONLY_METHODS = frozenset({"GET", "HEAD"})
+READ_WRITE_ATTR = "__read_write__"
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_request_session: ContextVar[Optional[AsyncSession]] = ContextVar(
+    "request_session", default=None
+)
+
+
+def read_write(endpoint: F) -> F:
+    """Mark a GET endpoint that writes, so its transaction is not read-only."""
+    setattr(endpoint, READ_WRITE_ATTR, True)
+    return endpoint
+
+
+def is_read_only(request: Request) -> bool:
+    endpoint = request.scope.get("endpoint")
+    return request.method in READ_ONLY_METHODS and not getattr(endpoint, READ_WRITE_ATTR, False)
+
 
 async def get_session(
-    session_factory: sessionmaker[Session],
-) -> AsyncGenerator[Session, None]:
+    session_factory: async_sessionmaker[AsyncSession],
+    request: Request,
+) -> AsyncGenerator[AsyncSession, None]:
+    # The session checks out a connection on its first query only
     async with create_session(session_factory) as session:
+        session.info[READ_ONLY] = is_read_only(request)
+        _request_session.set(session)
         yield session
+
+
+async def release_session() -> None:
+    """Close the session of the current request, returning its connection to the pool."""
+    session = _request_session.get()
+    if session is not None:
+        await session.close()
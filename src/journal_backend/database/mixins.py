@@ -1,13 +1,24 @@
 from datetime import datetime
+from typing import Any
 
-from sqlalchemy import func
+from sqlalchemy import DateTime, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 
 class TimestampColumnsMixin:
-    """Add `created_on` and `updated_on` columns to the model."""
+    """Add `created_on` and `updated_on` columns to the model.
 
-    created_on: Mapped[datetime] = mapped_column(server_default=func.now())
+    `updated_on` is set by the ORM and Core updates of the model, the
+    upserts (`ON CONFLICT DO UPDATE`) must set it themselves.
+    """
+
+    created_on: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
     updated_on: Mapped[datetime] = mapped_column(
-        server_default=func.now(), onupdate=datetime.now
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
+
+    # Fetch the timestamps with RETURNING instead of expiring them, an
+    # expired attribute can't be loaded implicitly by an async session
+    __mapper_args__: Any = {"eager_defaults": True}
@@ -0,0 +1,68 @@
+import bisect
+import time
+from typing import Any
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+# Upper bounds of the checkout wait histogram buckets, in seconds
+WAIT_BUCKETS: tuple[float, ...] = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, float("inf"),
+)
+
+
+class PoolMetrics:
+    """Represent the checkout statistics of a connection pool.
+
+    Attributes:
+        checkouts (int): The amount of successful checkouts.
+        timeouts (int): The amount of checkouts given up on after `pool_timeout`.
+        wait_buckets (list[int]): The amount of checkouts per wait time bucket.
+        wait_seconds_total (float): The total time spent waiting for connections.
+    """
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_buckets = [0] * len(WAIT_BUCKETS)
+        self.wait_seconds_total = 0.0
+
+    def observe(self, wait_seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_seconds_total += wait_seconds
+        self.wait_buckets[bisect.bisect_left(WAIT_BUCKETS, wait_seconds)] += 1
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Represent an asyncio queue pool recording how long checkouts wait."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started = time.perf_counter()
+        try:
+            entry = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        self.metrics.observe(time.perf_counter() - started)
+        return entry
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the gauges and counters of the pool."""
+        metrics = self.metrics
+        return {
+            "size": self.size(),
+            "in_use": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts": metrics.checkouts,
+            "timeouts": metrics.timeouts,
+            "wait_seconds_total": metrics.wait_seconds_total,
+            "wait_histogram": {
+                ("+Inf" if bound == float("inf") else str(bound)): count
+                for bound, count in zip(WAIT_BUCKETS, metrics.wait_buckets)
+            },
+        }
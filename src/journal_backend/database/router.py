@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette import status
+
+from journal_backend.depends_stub import Stub
+from journal_backend.entity.users.dependencies import current_user
+from journal_backend.entity.users.dto import Principal
+from journal_backend.entity.users.enums import Role
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+class PoolStats(BaseModel):
+    """Represent the state of the database connection pool.
+
+    Attributes:
+        size (int): The configured amount of persistent connections.
+        in_use (int): The amount of checked out connections.
+        idle (int): The amount of open connections waiting in the pool.
+        overflow (int): The amount of connections opened above `size`.
+        checkouts (int): The amount of checkouts since the start.
+        timeouts (int): The amount of checkouts that timed out.
+        wait_seconds_total (float): The total time spent waiting for a connection.
+        wait_histogram (dict[str, int]): The amount of checkouts per wait time
+            bucket, keyed by the bucket upper bound in seconds.
+    """
+
+    size: int
+    in_use: int
+    idle: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    wait_seconds_total: float
+    wait_histogram: dict[str, int]
+
+
+@router.get("/db-pool")
+async def get_db_pool_stats(
+        caller: Principal = Depends(current_user),
+        engine: AsyncEngine = Depends(Stub(AsyncEngine)),
+) -> PoolStats:
+    if caller.role != Role.ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+    return PoolStats(**engine.pool.snapshot())  # type:ignore[attr-defined]
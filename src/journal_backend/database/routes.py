@@ -0,0 +1,30 @@
+import asyncio
+import functools
+from typing import Any, Callable, Coroutine
+
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+from starlette.responses import Response
+
+from journal_backend.database.dependencies import release_session
+
+
+class SessionReleasingRoute(APIRoute):
+    """Represent a route closing the request session right after the endpoint.
+
+    Without it the connection is held until the dependencies are torn
+    down, i.e. while the response is serialized and sent.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        call = self.dependant.call
+        if call is not None and asyncio.iscoroutinefunction(call):
+            @functools.wraps(call)
+            async def endpoint(*args: Any, **kwargs: Any) -> Any:
+                try:
+                    return await call(*args, **kwargs)
+                finally:
+                    await release_session()
+
+            self.dependant.call = endpoint
+        return super().get_route_handler()
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import time
+from typing import Any, Optional, Sequence, Union
+
+from sqlalchemy import Connection, Engine, event, text
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import ClauseElement
+
+logger = logging.getLogger(__name__)
+
+# `Session.info` keys
+READ_ONLY = "read_only"
+PINNED_TO_PRIMARY = "pinned_to_primary"
+REPLICA = "replica"
+
+
+class ReplicaRouter:
+    """Represent the primary engine and its read replicas.
+
+    Replicas are handed out round-robin. A replica that lost its connection
+    or failed a health check is skipped until a later check succeeds, with
+    no healthy replica reads go to the primary.
+
+    Attributes:
+        primary (AsyncEngine): The engine of the primary database.
+        replicas (Sequence[AsyncEngine]): The engines of the read replicas.
+        check_interval (float): How often the replicas are health checked.
+    """
+
+    def __init__(
+            self,
+            primary: AsyncEngine,
+            replicas: Sequence[AsyncEngine] = (),
+            check_interval: float = 5,
+    ) -> None:
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.check_interval = check_interval
+        self._unhealthy: set[AsyncEngine] = set()
+        self._next = 0
+        self._health_task: Optional[asyncio.Task[None]] = None
+        for replica in self.replicas:
+            event.listen(replica.sync_engine, "handle_error", self._on_error(replica))
+
+    @property
+    def healthy_replicas(self) -> list[AsyncEngine]:
+        return [replica for replica in self.replicas if replica not in self._unhealthy]
+
+    def pick_replica(self) -> Optional[AsyncEngine]:
+        healthy = self.healthy_replicas
+        if not healthy:
+            return None
+        self._next = (self._next + 1) % len(healthy)
+        return healthy[self._next]
+
+    def mark_unhealthy(self, replica: AsyncEngine) -> None:
+        if replica not in self._unhealthy:
+            logger.warning("Replica %s is unhealthy, reading from the primary", replica.url)
+            self._unhealthy.add(replica)
+
+    def mark_healthy(self, replica: AsyncEngine) -> None:
+        if replica in self._unhealthy:
+            logger.info("Replica %s is healthy again", replica.url)
+            self._unhealthy.discard(replica)
+
+    async def check_replicas(self) -> None:
+        for replica in self.replicas:
+            try:
+                async with asyncio.timeout(self.check_interval):
+                    async with replica.connect() as conn:
+                        await conn.execute(text("SELECT 1"))
+            except Exception:
+                self.mark_unhealthy(replica)
+            else:
+                self.mark_healthy(replica)
+
+    async def start(self) -> None:
+        if self.replicas and self._health_task is None:
+            self._health_task = asyncio.create_task(self._run_health_checks())
+
+    async def aclose(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        for replica in self.replicas:
+            await replica.dispose()
+        await self.primary.dispose()
+
+    async def _run_health_checks(self) -> None:
+        while True:
+            started = time.monotonic()
+            await self.check_replicas()
+            await asyncio.sleep(max(0.0, self.check_interval - (time.monotonic() - started)))
+
+    def _on_error(self, replica: AsyncEngine) -> Any:
+        def handle_error(context: ExceptionContext) -> None:
+            if context.is_disconnect:
+                self.mark_unhealthy(replica)
+
+        return handle_error
+
+
+class RoutingSession(Session):
+    """Represent a session sending the reads of read-only requests to replicas.
+
+    A session flagged with `info["read_only"]` runs `READ ONLY` transactions
+    and reads from a replica until its first write; the write and every
+    statement after it go to the primary, so the request reads its own writes.
+    """
+
+    def __init__(self, *, router: ReplicaRouter, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.router = router
+
+    def get_bind(
+            self,
+            mapper: Any = None,
+            *,
+            clause: Optional[ClauseElement] = None,
+            **kwargs: Any,
+    ) -> Union[Engine, Connection]:
+        if self._use_replica(clause):
+            # Stick to one replica, a session holds a connection per engine
+            replica = self.info.get(REPLICA)
+            if replica is None or replica not in self.router.healthy_replicas:
+                replica = self.info[REPLICA] = self.router.pick_replica()
+            if replica is not None:
+                return replica.sync_engine
+        return self.router.primary.sync_engine
+
+    def _use_replica(self, clause: Optional[ClauseElement]) -> bool:
+        if not self.info.get(READ_ONLY) or self.info.get(PINNED_TO_PRIMARY):
+            return False
+        if self._flushing or (clause is not None and not getattr(clause, "is_select", False)):
+            self.info[PINNED_TO_PRIMARY] = True
+            return False
+        return True
+
+
+@event.listens_for(RoutingSession, "after_begin")
+def _set_transaction_read_only(
+        session: RoutingSession, transaction: Any, connection: Connection
+) -> None:
+    if session.info.get(READ_ONLY) and not session.info.get(PINNED_TO_PRIMARY):
+        connection.exec_driver_sql("SET TRANSACTION READ ONLY")
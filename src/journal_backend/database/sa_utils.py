@@ -1,6 +1,7 @@
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 
+from sqlalchemy import make_url
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -8,6 +9,10 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 
+from journal_backend.config import Database
+from journal_backend.database.pool import InstrumentedPool
+from journal_backend.database.routing import ReplicaRouter, RoutingSession
+
 
 @asynccontextmanager
 async def create_session(
@@ -17,17 +22,34 @@ async def create_session(
         yield session
 
 
-def create_engine(db_uri: str) -> AsyncEngine:
-    engine_options = {
-        "echo": True,
-        "connect_args": {
-            "timeout": 5,
-        },
-        "pool_size": 15,
-        "max_overflow": 15,
-    }
-    return create_async_engine(db_uri, **engine_options)
+def create_engine(db_cfg: Database, uri: Optional[str] = None) -> AsyncEngine:
+    # The asyncpg dialect prepares every statement and keeps the prepared
+    # statements in a per-connection LRU of this size
+    url = make_url(uri or db_cfg.uri).update_query_dict(
+        {"prepared_statement_cache_size": str(db_cfg.statement_cache_size)}
+    )
+    return create_async_engine(
+        url,
+        echo=db_cfg.echo,
+        poolclass=InstrumentedPool,
+        pool_size=db_cfg.pool_size,
+        max_overflow=db_cfg.max_overflow,
+        pool_timeout=db_cfg.pool_timeout,
+        pool_recycle=db_cfg.pool_recycle,
+        pool_pre_ping=db_cfg.pool_pre_ping,
+        connect_args={"timeout": db_cfg.connect_timeout},
+    )
 
 
 def create_session_maker(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
     return async_sessionmaker(engine, autoflush=True, expire_on_commit=False)
+
+
+def create_routing_session_maker(router: ReplicaRouter) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        router.primary,
+        sync_session_class=RoutingSession,
+        router=router,
+        autoflush=True,
+        expire_on_commit=False,
+    )
@@ -0,0 +1,184 @@
+"""Contain the Redis cache of the weekly schedules.
+
+A week of a group or teacher schedule is cached as the JSON of its days.
+The entries of an owner live in a hash named after its generation, which
+is bumped when a class of the owner is committed, so a schedule read from
+the database before the commit and cached after it is never served. The
+hashes of unchanged owners expire by themselves.
+"""
+import logging
+from datetime import date
+from itertools import chain
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    TypeAlias,
+)
+
+from pydantic import TypeAdapter
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.util import await_only
+
+from journal_backend.entity.classes.dto import DailySchedule
+from journal_backend.entity.classes.enums import ScheduleOwner
+from journal_backend.entity.classes.models import Class
+from journal_backend.entity.common.date_range import DateRange
+
+if TYPE_CHECKING:
+    RedisT: TypeAlias = Redis[bytes]  # type:ignore
+else:
+    RedisT = Redis
+
+logger = logging.getLogger(__name__)
+
+# `Session.info` key of the owners of the classes flushed in the transaction
+CHANGED_SCHEDULES = "changed_schedules"
+
+# Bumped when the cached JSON changes shape
+SCHEDULE_FORMAT = 2
+
+# Bumped to invalidate the schedules of every owner at once
+SCHEDULES_EPOCH_KEY = "schedule:epoch"
+
+SCHEDULE_DAYS = TypeAdapter(list[DailySchedule])
+
+ScheduleLoader = Callable[[], Awaitable[list[DailySchedule]]]
+
+
+def iso_week(day: date) -> str:
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+class ScheduleCache:
+    """Represent the weekly schedules of the groups and the teachers cached in Redis.
+
+    Attributes:
+        redis (RedisT): The redis client.
+        ttl_seconds (int): The lifetime of a cached owner, 0 disables the cache.
+    """
+
+    def __init__(self, redis: RedisT, ttl_seconds: int) -> None:
+        self.redis = redis
+        self.ttl_seconds = ttl_seconds
+
+    async def get_or_load(
+            self,
+            owner: ScheduleOwner,
+            owner_id: int,
+            period: DateRange,
+            load: ScheduleLoader,
+    ) -> bytes:
+        """Return the JSON of the days of the period, loading it on a miss.
+
+        Only whole weeks are cached, other periods are always loaded.
+        """
+        if self.ttl_seconds <= 0 or not period.is_week:
+            return SCHEDULE_DAYS.dump_json(await load())
+
+        week = iso_week(period.start)
+        owner_key = _generation_key(owner, owner_id)
+        try:
+            epoch, generation = await self.redis.mget(SCHEDULES_EPOCH_KEY, owner_key)
+            entries_key = (
+                f"{owner_key}:v{SCHEDULE_FORMAT}:{int(epoch or 0)}:{int(generation or 0)}"
+            )
+            cached: Optional[bytes] = await self.redis.hget(  # type:ignore[misc]
+                entries_key, week
+            )
+        except RedisError:
+            logger.warning("Schedule cache is unavailable", exc_info=True)
+            return SCHEDULE_DAYS.dump_json(await load())
+        if cached is not None:
+            return cached
+
+        days = SCHEDULE_DAYS.dump_json(await load())
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.hset(entries_key, week, days)  # type:ignore[arg-type]
+                pipe.expire(entries_key, self.ttl_seconds)
+                await pipe.execute()
+        except RedisError:
+            logger.warning("Schedule cache is unavailable", exc_info=True)
+        return days
+
+    async def invalidate(self, owners: Iterable[tuple[ScheduleOwner, int]]) -> None:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for owner, owner_id in owners:
+                pipe.incr(_generation_key(owner, owner_id))
+            await pipe.execute()
+
+    async def invalidate_all(self) -> None:
+        """Invalidate every schedule, after the classes were changed bypassing the ORM."""
+        await self.redis.incr(SCHEDULES_EPOCH_KEY)
+
+    def listen(self) -> None:
+        """Invalidate the schedules of the classes committed by any session."""
+        if self.ttl_seconds > 0:
+            event.listen(Session, "after_commit", self._after_commit)
+
+    def remove(self) -> None:
+        if event.contains(Session, "after_commit", self._after_commit):
+            event.remove(Session, "after_commit", self._after_commit)
+
+    def _after_commit(self, session: Session) -> None:
+        owners = session.info.pop(CHANGED_SCHEDULES, None)
+        if not owners:
+            return
+        # The async sessions commit in a greenlet, the invalidation is
+        # awaited there, before `commit()` returns
+        invalidation = self.invalidate(owners)
+        try:
+            await_only(invalidation)
+        except Exception:
+            invalidation.close()
+            logger.warning("Schedules of %s were not invalidated", owners, exc_info=True)
+
+
+def record_changed_schedules(
+        info: dict[str, Any], owners: Iterable[tuple[ScheduleOwner, int]]
+) -> None:
+    """Invalidate the schedules on commit, after changing classes bypassing the flush."""
+    info.setdefault(CHANGED_SCHEDULES, set()).update(owners)
+
+
+def _generation_key(owner: ScheduleOwner, owner_id: int) -> str:
+    return f"schedule:{owner}:{owner_id}"
+
+
+def _schedule_owners(class_: Class) -> Iterator[tuple[ScheduleOwner, int]]:
+    # The owners before and after the change, set by id or by relationship
+    state: Any = inspect(class_)
+    for owner, column, relationship in (
+            (ScheduleOwner.GROUP, "group_id", "group"),
+            (ScheduleOwner.TEACHER, "teacher_id", "teacher"),
+    ):
+        ids = state.attrs[column].history
+        related = state.attrs[relationship].history
+        for value in chain(ids.added, ids.unchanged, ids.deleted):
+            if value is not None:
+                yield owner, value
+        for obj in chain(related.added, related.unchanged, related.deleted):
+            if obj is not None and obj.id is not None:
+                yield owner, obj.id
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_schedules(session: Session, flush_context: Any) -> None:
+    changed = session.info.setdefault(CHANGED_SCHEDULES, set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Class):
+            changed.update(_schedule_owners(obj))
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_schedules(session: Session) -> None:
+    session.info.pop(CHANGED_SCHEDULES, None)
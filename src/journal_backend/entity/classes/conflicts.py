@@ -0,0 +1,74 @@
+"""Contain the detection of the timetable conflicts.
+
+A group, a teacher or a classroom can't take two classes at once. The
+exclusion constraints of `classes` reject the overlapping periods when
+they are saved, proposed classes are checked beforehand against the
+timetable by `ClassRepository.find_conflicts` and against each other here.
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Optional, Sequence
+
+from sqlalchemy.exc import IntegrityError
+
+from journal_backend.entity.classes.dto import ClassConflict, ProposedClass
+from journal_backend.entity.classes.enums import ConflictKind
+
+# SQLSTATE of `exclusion_violation`
+EXCLUSION_VIOLATION = "23P01"
+
+CONFLICT_CONSTRAINTS: dict[str, ConflictKind] = {
+    "ex_classes_group_period": ConflictKind.GROUP,
+    "ex_classes_teacher_period": ConflictKind.TEACHER,
+    "ex_classes_classroom_period": ConflictKind.CLASSROOM,
+}
+
+# The column of the class taken by each kind of conflict
+CONFLICT_COLUMNS: dict[ConflictKind, str] = {
+    ConflictKind.GROUP: "group_id",
+    ConflictKind.TEACHER: "teacher_id",
+    ConflictKind.CLASSROOM: "classroom_id",
+}
+
+
+def conflict_kind(exc: IntegrityError) -> Optional[ConflictKind]:
+    """Return what the saved class overlaps another class on, if that's the error."""
+    orig: Any = exc.orig
+    if getattr(orig, "sqlstate", None) != EXCLUSION_VIOLATION:
+        return None
+    # asyncpg names the constraint, the DBAPI adapter only keeps the message
+    constraint = getattr(getattr(orig, "__cause__", None), "constraint_name", None)
+    for name, kind in CONFLICT_CONSTRAINTS.items():
+        if name == constraint or name in str(orig):
+            return kind
+    return None
+
+
+def batch_conflicts(proposals: Sequence[ProposedClass]) -> list[ClassConflict]:
+    """Return the proposed classes overlapping an earlier one of the batch.
+
+    The classes of each group, teacher and classroom are swept by start, a
+    class conflicts with the one ending the latest before it if it starts
+    before that end.
+    """
+    conflicts: list[ClassConflict] = []
+    for kind, column in CONFLICT_COLUMNS.items():
+        by_owner: dict[int, list[tuple[datetime, datetime, int]]] = defaultdict(list)
+        for index, proposal in enumerate(proposals):
+            owner_id = getattr(proposal, column)
+            if owner_id is not None:
+                by_owner[owner_id].append(
+                    (proposal.starts_at, proposal.starts_at + proposal.duration, index)
+                )
+
+        for periods in by_owner.values():
+            periods.sort()
+            latest_end, latest_index = periods[0][1], periods[0][2]
+            for starts_at, ends_at, index in periods[1:]:
+                if starts_at < latest_end:
+                    conflicts.append(
+                        ClassConflict(index=index, kind=kind, other_index=latest_index)
+                    )
+                if ends_at > latest_end:
+                    latest_end, latest_index = ends_at, index
+    return conflicts
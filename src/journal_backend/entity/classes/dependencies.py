@@ -3,9 +3,16 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from journal_backend.depends_stub import Stub
 from journal_backend.entity.classes.repository import ClassRepository
+from journal_backend.entity.classes.service import ClassService
 
 
 async def get_class_repository(
         session: AsyncSession = Depends(Stub(AsyncSession))
 ) -> ClassRepository:
-    yield ClassRepository(session=session)
+    return ClassRepository(session=session)
+
+
+async def get_class_service(
+        repo: ClassRepository = Depends(Stub(ClassRepository)),
+) -> ClassService:
+    return ClassService(repo)
@@ -1,7 +1,9 @@
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import date, datetime, timedelta
+from typing import Optional, Sequence
 
-from journal_backend.entity.classes.models import Class
+from journal_backend.entity.classes.enums import ConflictKind
+from journal_backend.entity.classes.models import DEFAULT_CLASS_DURATION, Class
 
 
 @dataclass
@@ -18,9 +20,72 @@ class ClassRead:
 @dataclass
 class DailySchedule:
     day: int
+    date: date
     classes: list[ClassRead]
 
 
+@dataclass(kw_only=True)
+class ProposedClass:
+    starts_at: datetime
+    duration: timedelta = DEFAULT_CLASS_DURATION
+    group_id: int
+    teacher_id: Optional[int] = None
+    classroom_id: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        # An empty period overlaps nothing, so it would never conflict
+        if self.duration <= timedelta(0):
+            raise ValueError("Duration of a class must be positive")
+
+
+@dataclass(frozen=True, kw_only=True)
+class ClassConflict:
+    """Represent a proposed class overlapping an existing or another proposed class.
+
+    Attributes:
+        index (int): The position of the proposed class in the batch.
+        kind (ConflictKind): What the classes are both taking.
+        class_id (Optional[int]): The existing class.
+        other_index (Optional[int]): The other proposed class.
+    """
+    index: int
+    kind: ConflictKind
+    class_id: Optional[int] = None
+    other_index: Optional[int] = None
+
+
+@dataclass(frozen=True, kw_only=True)
+class OccurrenceConflict:
+    starts_at: datetime
+    kind: ConflictKind
+    class_id: Optional[int] = None
+
+
+@dataclass(frozen=True, kw_only=True)
+class TemplateGeneration:
+    """Represent the classes of a template replaced by a generation.
+
+    Attributes:
+        created (int): The amount of occurrences inserted.
+        deleted (int): The amount of future occurrences deleted, the ones
+            with academic reports are kept.
+    """
+    created: int
+    deleted: int
+
+
+@dataclass(frozen=True, kw_only=True)
+class ClassroomRead:
+    id: int
+    name: str
+
+
+@dataclass(frozen=True, kw_only=True)
+class FreeSlot:
+    starts_at: datetime
+    ends_at: datetime
+
+
 def to_read_dto(class_: Class) -> ClassRead:
     return ClassRead(
         id=class_.id,
@@ -33,13 +98,12 @@ def to_read_dto(class_: Class) -> ClassRead:
     )
 
 
-def build_schedule_response(schedule_by_days: dict[int, list[Class]]) -> list[DailySchedule]:
-    resp = []
-    for day, classes in schedule_by_days.items():
-        resp.append(DailySchedule(
-            day=day,
-            classes=[
-                to_read_dto(class_)
-                for class_ in classes
-            ]))
+def build_schedule_response(classes: Sequence[Class]) -> list[DailySchedule]:
+    """Group the classes into days, in one pass over the classes sorted by start."""
+    resp: list[DailySchedule] = []
+    for class_ in classes:
+        day = class_.starts_at.date()
+        if not resp or resp[-1].date != day:
+            resp.append(DailySchedule(day=day.weekday(), date=day, classes=[]))
+        resp[-1].classes.append(to_read_dto(class_))
     return resp
@@ -0,0 +1,12 @@
+from enum import StrEnum
+
+
+class ScheduleOwner(StrEnum):
+    GROUP = "group"
+    TEACHER = "teacher"
+
+
+class ConflictKind(StrEnum):
+    GROUP = "group"
+    TEACHER = "teacher"
+    CLASSROOM = "classroom"
@@ -1,3 +1,56 @@
+from datetime import datetime
+from typing import Optional, Sequence
+
+from journal_backend.entity.classes.dto import OccurrenceConflict
+
+
 class ClassNotFound(Exception):
     def __str__(self) -> str:
         return 'Class not found for the provided student'
+
+
+class TimetableUnavailable(Exception):
+    def __str__(self) -> str:
+        return "Timetable is not loaded yet, try again later"
+
+
+class OutsideTimetable(Exception):
+    def __init__(self, window_start: datetime, window_end: datetime) -> None:
+        self.window_start = window_start
+        self.window_end = window_end
+
+    def __str__(self) -> str:
+        return (
+            f"Period must end after it starts, "
+            f"between {self.window_start.isoformat()} and {self.window_end.isoformat()}"
+        )
+
+
+class TemplateNotFound(Exception):
+    def __init__(self, template_id: Optional[int] = None) -> None:
+        self.template_id = template_id
+
+    def __str__(self) -> str:
+        return "Class template not found"
+
+
+class InvalidTimeZone(Exception):
+    def __init__(self, time_zone: str, template_id: Optional[int] = None) -> None:
+        self.time_zone = time_zone
+        self.template_id = template_id
+
+    def __str__(self) -> str:
+        return f"Unknown time zone {self.time_zone!r} of the class template"
+
+
+class OccurrencesConflict(Exception):
+    def __init__(
+            self,
+            conflicts: Sequence[OccurrenceConflict],
+            template_id: Optional[int] = None,
+    ) -> None:
+        self.conflicts = conflicts
+        self.template_id = template_id
+
+    def __str__(self) -> str:
+        return "Occurrences of the template overlap other classes"
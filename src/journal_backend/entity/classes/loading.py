@@ -0,0 +1,29 @@
+"""Contain the loading profiles of classes.
+
+Relationships of the models load nothing by default (`raise_on_sql`),
+every repository method picks the profile matching what its caller reads.
+"""
+from sqlalchemy.orm import joinedload, load_only, raiseload
+
+from journal_backend.entity.classes.models import Class, Classroom
+from journal_backend.entity.students.models import Group
+from journal_backend.entity.teachers.models import Subject, Teacher
+from journal_backend.entity.users.models import UserIdentity
+
+# What `classes.dto.to_read_dto` reads: many-to-one joins only, one row per class
+CLASS_CARD = (
+    load_only(Class.id, Class.starts_at, Class.duration, raiseload=True),
+    joinedload(Class.group, innerjoin=True).load_only(Group.name, raiseload=True),
+    joinedload(Class.subject).load_only(Subject.name, raiseload=True),
+    joinedload(Class.classroom).load_only(Classroom.name, raiseload=True),
+    joinedload(Class.teacher).options(
+        load_only(Teacher.id, raiseload=True),
+        joinedload(Teacher.identity, innerjoin=True).load_only(
+            UserIdentity.name, UserIdentity.surname, raiseload=True
+        ),
+        raiseload("*"),
+    ),
+    raiseload("*"),
+)
+
+SCHEDULE_VIEW = CLASS_CARD
@@ -1,20 +1,54 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import DateTime, ForeignKey, ForeignKeyConstraint, Interval
+from sqlalchemy import (
+    DDL,
+    CheckConstraint,
+    Computed,
+    Date,
+    DateTime,
+    ForeignKey,
+    ForeignKeyConstraint,
+    Index,
+    Interval,
+    Time,
+    event,
+)
+from sqlalchemy.dialects.postgresql import (
+    ARRAY,
+    TSTZRANGE,
+    ExcludeConstraint,
+    Range,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from starlette.requests import Request
 
 from journal_backend.database.base import Base
+from journal_backend.database.mixins import TimestampColumnsMixin
 
 if TYPE_CHECKING:
     from journal_backend.entity.students.models import AcademicReport, Group
     from journal_backend.entity.teachers.models import Subject, Teacher
 
 DEFAULT_CLASS_DURATION = timedelta(minutes=60 * 1.5)
-
-
-class Class(Base):  # type: ignore[misc]
+DEFAULT_TIME_ZONE = "UTC"
+
+# `timestamptz + interval` is only stable, a generated column needs an
+# immutable expression. The duration is added as a number of seconds: a
+# day or a month would depend on the time zone of the session.
+CLASS_PERIOD_FUNCTION = DDL(  # type:ignore[no-untyped-call]
+    "CREATE OR REPLACE FUNCTION class_period(starts_at timestamptz, duration interval) "
+    "RETURNS tstzrange LANGUAGE sql IMMUTABLE PARALLEL SAFE "
+    "AS 'SELECT tstzrange(starts_at, "
+    "starts_at + make_interval(secs => extract(epoch FROM duration)))'"
+).execute_if(dialect="postgresql")
+# Lets GiST exclusion constraints compare the ids with `=`
+BTREE_GIST_EXTENSION = DDL(  # type:ignore[no-untyped-call]
+    "CREATE EXTENSION IF NOT EXISTS btree_gist"
+).execute_if(dialect="postgresql")
+
+
+class Class(TimestampColumnsMixin, Base):  # type: ignore[misc]
     __tablename__ = "classes"
 
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -33,12 +67,20 @@ class Class(Base):  # type: ignore[misc]
     classroom_id: Mapped[Optional[int]] = mapped_column(
         ForeignKey("classrooms.id", ondelete="SET NULL")
     )
+    # The template the class was generated from
+    template_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("class_templates.id", ondelete="SET NULL")
+    )
+    # When the class takes its group, teacher and classroom
+    period: Mapped[Range[datetime]] = mapped_column(
+        TSTZRANGE, Computed("class_period(starts_at, duration)", persisted=True)
+    )
 
     academic_reports: Mapped[list["AcademicReport"]] = relationship(back_populates="class_")
-    group: Mapped["Group"] = relationship(back_populates="classes", lazy='joined')
-    teacher: Mapped["Teacher"] = relationship(back_populates="classes", lazy='joined')
-    subject: Mapped["Subject"] = relationship(back_populates="classes", lazy='joined')
-    classroom: Mapped["Classroom"] = relationship(back_populates="classes", lazy='joined')
+    group: Mapped["Group"] = relationship(back_populates="classes", lazy="raise_on_sql")
+    teacher: Mapped["Teacher"] = relationship(back_populates="classes", lazy="raise_on_sql")
+    subject: Mapped["Subject"] = relationship(back_populates="classes", lazy="raise_on_sql")
+    classroom: Mapped["Classroom"] = relationship(back_populates="classes", lazy="raise_on_sql")
 
     __table_args__ = (
         ForeignKeyConstraint(
@@ -46,6 +88,34 @@ class Class(Base):  # type: ignore[misc]
             ["competencies.teacher_id", "competencies.subject_id"],
             ondelete="SET NULL"
         ),
+        # Weekly schedules, covering: the scan does not visit the heap
+        Index(
+            "ix_classes_group_id_starts_at",
+            group_id,
+            starts_at,
+            postgresql_include=["id", "duration", "teacher_id", "subject_id", "classroom_id"],
+        ),
+        Index(
+            "ix_classes_teacher_id_starts_at",
+            teacher_id,
+            starts_at,
+            postgresql_include=["id", "duration", "group_id", "subject_id", "classroom_id"],
+        ),
+        # The occurrences of a template, see `ClassRepository.delete_future_occurrences`
+        Index("ix_classes_template_id_starts_at", template_id, starts_at),
+        # Date ranges over all the classes, rows are inserted roughly in `starts_at` order
+        Index("ix_classes_starts_at_brin", starts_at, postgresql_using="brin"),
+        # Nobody takes two classes at once, see `classes/conflicts.py`
+        ExcludeConstraint(  # type:ignore[no-untyped-call]
+            (group_id, "="), (period, "&&"), name="ex_classes_group_period", using="gist"
+        ),
+        ExcludeConstraint(  # type:ignore[no-untyped-call]
+            (teacher_id, "="), (period, "&&"), name="ex_classes_teacher_period", using="gist"
+        ),
+        ExcludeConstraint(  # type:ignore[no-untyped-call]
+            (classroom_id, "="), (period, "&&"),
+            name="ex_classes_classroom_period", using="gist",
+        ),
     )
 
     async def __admin_repr__(self, _: Request) -> str:
@@ -59,7 +129,74 @@ Subject: {self.subject.name if self.subject else None};
 Starts at: {self.starts_at}</div>"""
 
 
-class Classroom(Base):  # type: ignore[misc]
+event.listen(Class.__table__, "before_create", BTREE_GIST_EXTENSION)
+event.listen(Class.__table__, "before_create", CLASS_PERIOD_FUNCTION)
+
+
+class ClassTemplate(TimestampColumnsMixin, Base):  # type: ignore[misc]
+    __tablename__ = "class_templates"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # A class every `every_weeks` weeks on `weekday` (0 is Monday), the first
+    # one on the first such weekday from `starts_on` on, the last one on
+    # `ends_on` at the latest
+    weekday: Mapped[int]
+    every_weeks: Mapped[int] = mapped_column(default=1)
+    starts_on: Mapped[date]
+    ends_on: Mapped[date]
+    # The days without the class, e.g. holidays
+    skipped_dates: Mapped[list[date]] = mapped_column(ARRAY(Date), default=list)
+    # The local time of the class, in the IANA time zone
+    starts_at: Mapped[time] = mapped_column(Time)
+    time_zone: Mapped[str] = mapped_column(default=DEFAULT_TIME_ZONE)
+    duration: Mapped[timedelta] = mapped_column(
+        Interval(native=True),
+        default=DEFAULT_CLASS_DURATION
+    )
+    group_id: Mapped[int] = mapped_column(ForeignKey("groups.id", ondelete='CASCADE'))
+    teacher_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("teachers.id", ondelete='SET NULL')
+    )
+    subject_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("subjects.id", ondelete='SET NULL')
+    )
+    classroom_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("classrooms.id", ondelete="SET NULL")
+    )
+
+    group: Mapped["Group"] = relationship(lazy="raise_on_sql")
+    teacher: Mapped["Teacher"] = relationship(lazy="raise_on_sql")
+    subject: Mapped["Subject"] = relationship(lazy="raise_on_sql")
+    classroom: Mapped["Classroom"] = relationship(lazy="raise_on_sql")
+
+    __table_args__ = (
+        ForeignKeyConstraint(
+            [teacher_id, subject_id],
+            ["competencies.teacher_id", "competencies.subject_id"],
+            ondelete="SET NULL"
+        ),
+        CheckConstraint("weekday BETWEEN 0 AND 6", name="ck_class_templates_weekday"),
+        CheckConstraint("every_weeks > 0", name="ck_class_templates_every_weeks"),
+        CheckConstraint("starts_on <= ends_on", name="ck_class_templates_dates"),
+        # The occurrences of a template never overlap each other
+        CheckConstraint(
+            "duration > interval '0' AND duration < interval '7 days'",
+            name="ck_class_templates_duration",
+        ),
+    )
+
+    async def __admin_repr__(self, _: Request) -> str:
+        return f"""Group: {self.group.name};
+Subject: {self.subject.name if self.subject else None};
+Weekday: {self.weekday}; Starts at: {self.starts_at}"""
+
+    async def __admin_select2_repr__(self, _: Request) -> str:
+        return f"""<div>Group: {self.group.name};
+Subject: {self.subject.name if self.subject else None};
+Weekday: {self.weekday}; Starts at: {self.starts_at}</div>"""
+
+
+class Classroom(TimestampColumnsMixin, Base):  # type: ignore[misc]
     __tablename__ = "classrooms"
 
     id: Mapped[int] = mapped_column(primary_key=True)
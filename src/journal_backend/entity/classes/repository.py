@@ -1,10 +1,35 @@
-from datetime import date
-from typing import Sequence
+from datetime import date, datetime
+from typing import Any, Optional, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import (
+    DateTime,
+    Integer,
+    Interval,
+    and_,
+    bindparam,
+    column,
+    delete,
+    exists,
+    func,
+    insert,
+    lambda_stmt,
+    literal,
+    select,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from journal_backend.entity.classes.models import Class
+from journal_backend.entity.classes.conflicts import CONFLICT_COLUMNS
+from journal_backend.entity.classes.dto import ClassConflict, ProposedClass
+from journal_backend.entity.classes.enums import ConflictKind
+from journal_backend.entity.classes.loading import SCHEDULE_VIEW
+from journal_backend.entity.classes.models import (
+    Class,
+    Classroom,
+    ClassTemplate,
+)
+from journal_backend.entity.students.models import AcademicReport
 
 
 class ClassRepository:
@@ -17,14 +42,18 @@ class ClassRepository:
             d_left: date,
             d_right: date
     ) -> Sequence[Class]:
-        stmt = (
-            select(Class).
+        """Return the classes starting from `d_left` until `d_right` excluded, by start."""
+        stmt = lambda_stmt(
+            lambda: select(Class).
+            options(*SCHEDULE_VIEW).
             where(Class.group_id == group_id).
-            where(Class.starts_at.between(d_left, d_right))
+            where(Class.starts_at >= d_left).
+            where(Class.starts_at < d_right).
+            order_by(Class.starts_at)
         )
 
         res = await self.session.scalars(stmt)
-        return res.unique().all()
+        return res.all()
 
     async def get_schedule_by_teacher_id(
             self,
@@ -32,20 +61,178 @@ class ClassRepository:
             d_left: date,
             d_right: date
     ) -> Sequence[Class]:
-        stmt = (
-            select(Class).
+        """Return the classes starting from `d_left` until `d_right` excluded, by start."""
+        stmt = lambda_stmt(
+            lambda: select(Class).
+            options(*SCHEDULE_VIEW).
             where(Class.teacher_id == teacher_id).
-            where(Class.starts_at.between(d_left, d_right))
+            where(Class.starts_at >= d_left).
+            where(Class.starts_at < d_right).
+            order_by(Class.starts_at)
         )
 
         res = await self.session.scalars(stmt)
-        return res.unique().all()
+        return res.all()
 
     async def student_class_exists(self, student_group_id: int, class_id: int) -> bool:
+        stmt = lambda_stmt(
+            lambda: select(
+                exists().where(Class.id == class_id, Class.group_id == student_group_id)
+            )
+        )
+        return bool(await self.session.scalar(stmt))
+
+    async def get_timetable(self, starts_at: datetime, ends_at: datetime) -> Sequence[Any]:
+        """Return what the timetable index keeps of the classes starting in the period."""
+        stmt = (
+            select(
+                Class.id,
+                Class.starts_at,
+                Class.duration,
+                Class.group_id,
+                Class.teacher_id,
+                Class.classroom_id,
+            ).
+            where(Class.starts_at >= starts_at).
+            where(Class.starts_at < ends_at)
+        )
+        res = await self.session.execute(stmt)
+        return res.all()
+
+    async def get_classrooms(self) -> Sequence[Any]:
+        res = await self.session.execute(select(Classroom.id, Classroom.name))
+        return res.all()
+
+    async def find_conflicts(self, proposals: Sequence[ProposedClass]) -> list[ClassConflict]:
+        """Return the proposed classes overlapping existing classes, by position.
+
+        The batch is checked in one statement, each kind of conflict is looked
+        up in its exclusion constraint's GiST index.
+        """
+        if not proposals:
+            return []
+        res = await self.session.execute(find_conflicts_stmt(proposals))
+        return [
+            ClassConflict(index=index, kind=ConflictKind(kind), class_id=class_id)
+            for index, kind, class_id in res.all()
+        ]
+
+    async def get_template(self, template_id: int) -> Optional[ClassTemplate]:
+        template: Optional[ClassTemplate] = await self.session.get(ClassTemplate, template_id)
+        return template
+
+    async def delete_future_occurrences(
+            self,
+            template_id: int,
+            after: datetime,
+    ) -> Sequence[Any]:
+        """Delete the classes of the template starting from `after` on, with no reports yet.
+
+        Return the ids and owners of the deleted classes.
+        """
         stmt = (
-            select(Class).
-            where(Class.group_id == student_group_id).
-            where(Class.id == class_id)
+            delete(Class).
+            where(Class.template_id == template_id).
+            where(Class.starts_at >= after).
+            where(~exists().where(AcademicReport.class_id == Class.id)).
+            returning(Class.id, Class.group_id, Class.teacher_id).
+            execution_options(synchronize_session=False)
         )
         res = await self.session.execute(stmt)
-        return bool(res.unique().scalar_one_or_none())
+        return res.all()
+
+    async def get_future_occurrences(self, template_id: int, after: datetime) -> list[datetime]:
+        res = await self.session.scalars(
+            select(Class.starts_at).
+            where(Class.template_id == template_id).
+            where(Class.starts_at >= after)
+        )
+        return list(res.all())
+
+    async def insert_occurrences(
+            self,
+            template_id: int,
+            starts: Sequence[datetime],
+    ) -> Sequence[Any]:
+        """Insert the classes of the template starting at `starts`, in one statement.
+
+        Return the inserted classes' columns kept by the timetable index.
+        """
+        occurrences = func.unnest(  # type:ignore[no-untyped-call]
+            bindparam("starts_at", list(starts), type_=ARRAY(DateTime(timezone=True))),
+        ).table_valued(
+            column("starts_at", DateTime(timezone=True)),
+        ).render_derived(name="occurrences")
+        stmt = (
+            insert(Class).
+            from_select(
+                [
+                    Class.starts_at,
+                    Class.duration,
+                    Class.group_id,
+                    Class.teacher_id,
+                    Class.subject_id,
+                    Class.classroom_id,
+                    Class.template_id,
+                ],
+                select(
+                    occurrences.c.starts_at,
+                    ClassTemplate.duration,
+                    ClassTemplate.group_id,
+                    ClassTemplate.teacher_id,
+                    ClassTemplate.subject_id,
+                    ClassTemplate.classroom_id,
+                    ClassTemplate.id,
+                ).
+                where(ClassTemplate.id == template_id)
+            ).
+            returning(
+                Class.id,
+                Class.starts_at,
+                Class.duration,
+                Class.group_id,
+                Class.teacher_id,
+                Class.classroom_id,
+            )
+        )
+        res = await self.session.execute(stmt)
+        return res.all()
+
+
+def find_conflicts_stmt(proposals: Sequence[ProposedClass]) -> Any:
+    batch = _proposed_batch(proposals)
+    # The same expression as the generated `period` of the classes
+    period = func.class_period(batch.c.starts_at, batch.c.duration)
+    overlapping = [
+        select((batch.c.ordinality - 1).label("index"), literal(str(kind)), Class.id).
+        select_from(batch).
+        join(
+            Class,
+            and_(
+                getattr(Class, name) == batch.c[name],
+                Class.period.op("&&")(period),
+            ),
+        )
+        for kind, name in CONFLICT_COLUMNS.items()
+    ]
+    return union_all(*overlapping).order_by("index")
+
+
+def _proposed_batch(proposals: Sequence[ProposedClass]) -> Any:
+    # The batch is passed as arrays, so the statement is the same whatever its size
+    return func.unnest(  # type:ignore[no-untyped-call]
+        bindparam(
+            "starts_at", [p.starts_at for p in proposals], type_=ARRAY(DateTime(timezone=True))
+        ),
+        bindparam("durations", [p.duration for p in proposals], type_=ARRAY(Interval)),
+        bindparam("group_ids", [p.group_id for p in proposals], type_=ARRAY(Integer)),
+        bindparam("teacher_ids", [p.teacher_id for p in proposals], type_=ARRAY(Integer)),
+        bindparam("classroom_ids", [p.classroom_id for p in proposals], type_=ARRAY(Integer)),
+    ).table_valued(
+        column("starts_at", DateTime(timezone=True)),
+        column("duration", Interval),
+        column("group_id", Integer),
+        column("teacher_id", Integer),
+        column("classroom_id", Integer),
+        with_ordinality="ordinality",
+    ).render_derived(name="proposed")
@@ -0,0 +1,158 @@
+from datetime import timedelta
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from pydantic import AwareDatetime
+from starlette import status
+
+from journal_backend.database.routes import SessionReleasingRoute
+from journal_backend.depends_stub import Stub
+from journal_backend.entity.classes import exceptions
+from journal_backend.entity.classes.conflicts import batch_conflicts
+from journal_backend.entity.classes.dto import (
+    ClassConflict,
+    ClassroomRead,
+    FreeSlot,
+    ProposedClass,
+    TemplateGeneration,
+)
+from journal_backend.entity.classes.enums import ConflictKind
+from journal_backend.entity.classes.models import DEFAULT_CLASS_DURATION
+from journal_backend.entity.classes.repository import ClassRepository
+from journal_backend.entity.classes.service import ClassService
+from journal_backend.entity.classes.timetable import Owner, TimetableIndex
+from journal_backend.entity.users.dependencies import current_user
+from journal_backend.entity.users.dto import Principal
+from journal_backend.entity.users.enums import Role
+
+# Bounds the arrays bound to the conflicts query
+MAX_PROPOSED_CLASSES = 10_000
+
+router = APIRouter(prefix="/classes", tags=["classes"], route_class=SessionReleasingRoute)
+
+
+@router.post("/conflicts")
+async def check_conflicts(
+        proposals: list[ProposedClass] = Body(max_length=MAX_PROPOSED_CLASSES),
+        caller: Principal = Depends(current_user),
+        repo: ClassRepository = Depends(Stub(ClassRepository)),
+) -> list[ClassConflict]:
+    """Return the proposed classes overlapping the timetable or each other.
+
+    Nothing is saved, an empty list means the classes can all be added.
+    """
+    if caller.role != Role.ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+
+    conflicts: list[ClassConflict] = await repo.find_conflicts(proposals)
+    conflicts.extend(batch_conflicts(proposals))
+    conflicts.sort(key=lambda conflict: conflict.index)
+    return conflicts
+
+
+@router.get("/free-classrooms")
+async def get_free_classrooms(
+        starts_at: AwareDatetime,
+        ends_at: AwareDatetime,
+        caller: Principal = Depends(current_user),
+        timetable: TimetableIndex = Depends(Stub(TimetableIndex)),
+) -> list[ClassroomRead]:
+    """Return the classrooms free during the whole period, from the timetable index."""
+    if caller.role == Role.STUDENT:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+
+    try:
+        classrooms: list[ClassroomRead] = timetable.free_classrooms(starts_at, ends_at)
+    except exceptions.OutsideTimetable as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except exceptions.TimetableUnavailable as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    return classrooms
+
+
+@router.get("/free-slots")
+async def get_free_slots(
+        starts_at: AwareDatetime,
+        ends_at: AwareDatetime,
+        group_id: list[int] = Query([]),
+        teacher_id: list[int] = Query([]),
+        classroom_id: list[int] = Query([]),
+        duration_minutes: int = Query(
+            int(DEFAULT_CLASS_DURATION.total_seconds()) // 60, gt=0
+        ),
+        caller: Principal = Depends(current_user),
+        timetable: TimetableIndex = Depends(Stub(TimetableIndex)),
+) -> list[FreeSlot]:
+    """Return when the groups, teachers and classrooms are all free, from the timetable index.
+
+    Only the gaps fitting a class of `duration_minutes` are returned.
+    """
+    if caller.role == Role.STUDENT:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+
+    owners: list[Owner] = [
+        *((ConflictKind.GROUP, owner_id) for owner_id in group_id),
+        *((ConflictKind.TEACHER, owner_id) for owner_id in teacher_id),
+        *((ConflictKind.CLASSROOM, owner_id) for owner_id in classroom_id),
+    ]
+    if not owners:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one group, teacher or classroom is required"
+        )
+
+    try:
+        slots: list[FreeSlot] = timetable.free_slots(
+            owners, starts_at, ends_at, timedelta(minutes=duration_minutes)
+        )
+    except exceptions.OutsideTimetable as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except exceptions.TimetableUnavailable as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    return slots
+
+
+@router.post("/templates/{template_id}/generate")
+async def generate_template_classes(
+        template_id: int,
+        caller: Principal = Depends(current_user),
+        service: ClassService = Depends(Stub(ClassService)),
+) -> TemplateGeneration:
+    """Replace the future classes of the template by its occurrences, in one transaction.
+
+    Nothing is saved when an occurrence overlaps another class, the
+    conflicts are listed in the 409 response.
+    """
+    if caller.role != Role.ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+
+    try:
+        generation: TemplateGeneration = await service.generate_template(template_id)
+    except exceptions.TemplateNotFound as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except exceptions.InvalidTimeZone as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except exceptions.OccurrencesConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"msg": str(e), "conflicts": jsonable_encoder(e.conflicts)}
+        )
+    return generation
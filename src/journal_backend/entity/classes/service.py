@@ -0,0 +1,123 @@
+from datetime import datetime, timezone
+from typing import Any, Optional, Sequence
+
+from sqlalchemy.exc import IntegrityError
+
+from journal_backend.entity.classes import exceptions
+from journal_backend.entity.classes.cache import record_changed_schedules
+from journal_backend.entity.classes.conflicts import conflict_kind
+from journal_backend.entity.classes.dto import (
+    ClassConflict,
+    OccurrenceConflict,
+    ProposedClass,
+    TemplateGeneration,
+)
+from journal_backend.entity.classes.enums import ScheduleOwner
+from journal_backend.entity.classes.models import ClassTemplate
+from journal_backend.entity.classes.repository import ClassRepository
+from journal_backend.entity.classes.templates import expand_template
+from journal_backend.entity.classes.timetable import (
+    indexed_class,
+    record_changed_classes,
+)
+
+
+class ClassService:
+    def __init__(self, repo: ClassRepository) -> None:
+        self.repo = repo
+
+    async def generate_template(
+            self,
+            template_id: int,
+            now: Optional[datetime] = None,
+    ) -> TemplateGeneration:
+        """Replace the future occurrences of the template, in one transaction.
+
+        The past occurrences and the ones already having academic reports
+        are kept, nothing is changed when an occurrence overlaps another class.
+        """
+        return await self.generate_templates([template_id], now)
+
+    async def generate_templates(
+            self,
+            template_ids: Sequence[int],
+            now: Optional[datetime] = None,
+    ) -> TemplateGeneration:
+        """Replace the future occurrences of all the templates, in one transaction.
+
+        Nothing is changed when an occurrence of any of them overlaps
+        another class, the error names the template.
+        """
+        now = now or datetime.now(timezone.utc)
+        created = deleted = 0
+        for template_id in template_ids:
+            generation = await self._generate(template_id, now)
+            created += generation.created
+            deleted += generation.deleted
+        await self.repo.session.commit()
+        return TemplateGeneration(created=created, deleted=deleted)
+
+    async def _generate(self, template_id: int, now: datetime) -> TemplateGeneration:
+        template: Optional[ClassTemplate] = await self.repo.get_template(template_id)
+        if template is None:
+            await self.repo.session.rollback()
+            raise exceptions.TemplateNotFound(template_id)
+
+        try:
+            occurrences = expand_template(template, after=now)
+        except exceptions.InvalidTimeZone as e:
+            await self.repo.session.rollback()
+            raise exceptions.InvalidTimeZone(e.time_zone, template_id)
+
+        deleted = await self.repo.delete_future_occurrences(template_id, now)
+        kept = set(await self.repo.get_future_occurrences(template_id, now))
+        starts = [starts_at for starts_at in occurrences if starts_at not in kept]
+
+        proposals = [
+            ProposedClass(
+                starts_at=starts_at,
+                duration=template.duration,
+                group_id=template.group_id,
+                teacher_id=template.teacher_id,
+                classroom_id=template.classroom_id,
+            )
+            for starts_at in starts
+        ]
+        conflicts: list[ClassConflict] = await self.repo.find_conflicts(proposals)
+        if conflicts:
+            await self.repo.session.rollback()
+            raise exceptions.OccurrencesConflict([
+                OccurrenceConflict(
+                    starts_at=starts[conflict.index],
+                    kind=conflict.kind,
+                    class_id=conflict.class_id,
+                )
+                for conflict in conflicts
+            ], template_id)
+
+        try:
+            inserted = await self.repo.insert_occurrences(template_id, starts) if starts else []
+        except IntegrityError as e:
+            # A class was saved since the check
+            if conflict_kind(e) is None:
+                raise
+            await self.repo.session.rollback()
+            raise exceptions.OccurrencesConflict([], template_id) from e
+
+        # The classes bypassed the flush, they are recorded like it would
+        info = self.repo.session.info
+        record_changed_schedules(info, _schedule_owners([*deleted, *inserted]))
+        record_changed_classes(info, [
+            *((row.id, None) for row in deleted),
+            *((row.id, indexed_class(row)) for row in inserted),
+        ])
+        return TemplateGeneration(created=len(inserted), deleted=len(deleted))
+
+
+def _schedule_owners(rows: Sequence[Any]) -> set[tuple[ScheduleOwner, int]]:
+    owners: set[tuple[ScheduleOwner, int]] = set()
+    for row in rows:
+        owners.add((ScheduleOwner.GROUP, row.group_id))
+        if row.teacher_id is not None:
+            owners.add((ScheduleOwner.TEACHER, row.teacher_id))
+    return owners
@@ -0,0 +1,44 @@
+"""Contain the expansion of the class templates into classes.
+
+The occurrences are computed in the local time of the template, so a
+class keeps its time of day across daylight saving time changes.
+"""
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from journal_backend.entity.classes import exceptions
+from journal_backend.entity.classes.models import ClassTemplate
+
+
+def template_zone(time_zone: str) -> ZoneInfo:
+    """Return the IANA time zone of a template.
+
+    Raises:
+        InvalidTimeZone: There is no such time zone.
+    """
+    try:
+        return ZoneInfo(time_zone)
+    except (ZoneInfoNotFoundError, ValueError):
+        # ValueError: not even a valid key, e.g. empty or absolute
+        raise exceptions.InvalidTimeZone(time_zone)
+
+
+def expand_template(template: ClassTemplate, after: datetime) -> list[datetime]:
+    """Return the starts of the occurrences of the template from `after` on.
+
+    Raises:
+        InvalidTimeZone: The time zone of the template doesn't exist.
+    """
+    zone = template_zone(template.time_zone)
+    skipped = set(template.skipped_dates)
+    step = timedelta(weeks=template.every_weeks)
+
+    starts: list[datetime] = []
+    first_day = (template.weekday - template.starts_on.weekday()) % 7
+    day = template.starts_on + timedelta(days=first_day)
+    while day <= template.ends_on:
+        starts_at = datetime.combine(day, template.starts_at, zone)
+        if day not in skipped and starts_at >= after:
+            starts.append(starts_at)
+        day += step
+    return starts
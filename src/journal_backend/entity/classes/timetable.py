@@ -0,0 +1,340 @@
+"""Contain the in-memory index of the timetable.
+
+The classes of the current week and of the next few ones are kept per
+group, teacher and classroom as sorted arrays of their bounds, in epoch
+seconds. The classes of an owner never overlap (see the exclusion
+constraints of `classes`), so the ends are sorted as well and one
+bisection tells whether a period is free.
+
+The index is reloaded periodically, which moves its window along and
+picks up the changes committed by the other processes or bypassing the
+ORM. The classes committed by this process are applied right away.
+"""
+import asyncio
+import heapq
+import logging
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta, timezone
+from itertools import chain
+from typing import Any, Iterable, Iterator, Optional, Sequence, TypeAlias
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import instance_state
+
+from journal_backend.database.routing import READ_ONLY
+from journal_backend.entity.classes import exceptions
+from journal_backend.entity.classes.conflicts import CONFLICT_COLUMNS
+from journal_backend.entity.classes.dto import ClassroomRead, FreeSlot
+from journal_backend.entity.classes.enums import ConflictKind
+from journal_backend.entity.classes.models import Class
+from journal_backend.entity.classes.repository import ClassRepository
+from journal_backend.entity.common.date_range import DateRange
+
+logger = logging.getLogger(__name__)
+
+# `Session.info` keys of the classes flushed in the transaction, by id, and
+# of whether some of them could not be read, so the index must be reloaded
+CHANGED_CLASSES = "changed_classes"
+TIMETABLE_STALE = "timetable_stale"
+
+# A group, a teacher or a classroom
+Owner: TypeAlias = tuple[ConflictKind, int]
+
+
+@dataclass(frozen=True)
+class IndexedClass:
+    starts_at: int
+    ends_at: int
+    owners: tuple[Owner, ...]
+
+
+# A class id and what it is after the commit, None when it was deleted
+ClassChange: TypeAlias = tuple[int, Optional[IndexedClass]]
+
+
+def to_seconds(moment: datetime) -> int:
+    return math.floor(moment.timestamp())
+
+
+def from_seconds(seconds: int) -> datetime:
+    return datetime.fromtimestamp(seconds, timezone.utc)
+
+
+class OwnerTimetable:
+    """Represent the classes of one owner, sorted by start."""
+
+    __slots__ = ("starts", "ends", "class_ids")
+
+    def __init__(self) -> None:
+        self.starts = array("q")
+        self.ends = array("q")
+        self.class_ids = array("q")
+
+    def add(self, class_id: int, starts_at: int, ends_at: int) -> None:
+        i = bisect_left(self.starts, starts_at)
+        self.starts.insert(i, starts_at)
+        self.ends.insert(i, ends_at)
+        self.class_ids.insert(i, class_id)
+
+    def remove(self, class_id: int, starts_at: int) -> None:
+        i = bisect_left(self.starts, starts_at)
+        while i < len(self.starts) and self.starts[i] == starts_at:
+            if self.class_ids[i] == class_id:
+                del self.starts[i], self.ends[i], self.class_ids[i]
+                return
+            i += 1
+
+    def is_free(self, starts_at: int, ends_at: int) -> bool:
+        # The first class ending after the start must start after the end
+        i = bisect_right(self.ends, starts_at)
+        return i == len(self.starts) or self.starts[i] >= ends_at
+
+    def busy(self, starts_at: int, ends_at: int) -> Iterator[tuple[int, int]]:
+        i = bisect_right(self.ends, starts_at)
+        while i < len(self.starts) and self.starts[i] < ends_at:
+            yield self.starts[i], self.ends[i]
+            i += 1
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+
+class TimetableIndex:
+    """Represent the classes of the next weeks indexed by their group, teacher and classroom.
+
+    Attributes:
+        session_factory (async_sessionmaker[AsyncSession]): Opens the sessions loading
+            the timetable.
+        weeks (int): The amount of weeks indexed from the current one, 0 disables the index.
+        refresh_seconds (float): How often the index is reloaded.
+    """
+
+    def __init__(
+            self,
+            session_factory: async_sessionmaker[AsyncSession],
+            weeks: int,
+            refresh_seconds: float,
+    ) -> None:
+        self.session_factory = session_factory
+        self.weeks = weeks
+        self.refresh_seconds = refresh_seconds
+        self.window: Optional[tuple[int, int]] = None
+        self._owners: dict[Owner, OwnerTimetable] = {}
+        self._classes: dict[int, IndexedClass] = {}
+        self._classrooms: dict[int, str] = {}
+        # The changes committed while the index is reloaded, replayed on the new one
+        self._pending: Optional[list[ClassChange]] = None
+        self._reload = asyncio.Event()
+        self._refresh_task: Optional[asyncio.Task[None]] = None
+
+    async def load(self) -> None:
+        """Load the classes of the window starting this week."""
+        window_start = datetime.combine(DateRange.week().start, time.min, timezone.utc)
+        window_end = window_start + timedelta(weeks=self.weeks)
+        self._pending = []
+        try:
+            async with self.session_factory() as session:
+                session.info[READ_ONLY] = True
+                repo = ClassRepository(session)
+                rows = await repo.get_timetable(window_start, window_end)
+                classrooms = await repo.get_classrooms()
+            owners, classes = _build(rows)
+            self._owners, self._classes = owners, classes
+            self._classrooms = {classroom.id: classroom.name for classroom in classrooms}
+            self.window = to_seconds(window_start), to_seconds(window_end)
+            self._apply(self._pending)
+        finally:
+            self._pending = None
+        logger.info("Timetable index loaded %d classes", len(self._classes))
+
+    def apply(self, changes: Iterable[ClassChange]) -> None:
+        """Apply the committed changes of classes."""
+        changes = list(changes)
+        if self._pending is not None:
+            self._pending.extend(changes)
+        self._apply(changes)
+
+    def reload_soon(self) -> None:
+        """Reload the index, after the classes were changed bypassing the ORM."""
+        self._reload.set()
+
+    def free_classrooms(self, starts_at: datetime, ends_at: datetime) -> list[ClassroomRead]:
+        """Return the classrooms having no class during the period, by name."""
+        start, end = self._check_period(starts_at, ends_at)
+        free = [
+            ClassroomRead(id=classroom_id, name=name)
+            for classroom_id, name in self._classrooms.items()
+            if self._is_free((ConflictKind.CLASSROOM, classroom_id), start, end)
+        ]
+        free.sort(key=lambda classroom: classroom.name)
+        return free
+
+    def free_slots(
+            self,
+            owners: Sequence[Owner],
+            starts_at: datetime,
+            ends_at: datetime,
+            min_duration: timedelta,
+    ) -> list[FreeSlot]:
+        """Return the gaps of the period lasting `min_duration` when all the owners are free."""
+        start, end = self._check_period(starts_at, ends_at)
+        busy = heapq.merge(*(
+            self._owners[owner].busy(start, end) for owner in owners if owner in self._owners
+        ))
+        min_seconds = min_duration.total_seconds()
+        slots: list[FreeSlot] = []
+        free_from = start
+        for busy_from, busy_to in chain(busy, [(end, end)]):
+            if busy_from - free_from >= min_seconds:
+                slots.append(FreeSlot(
+                    starts_at=from_seconds(free_from), ends_at=from_seconds(busy_from)
+                ))
+            free_from = max(free_from, busy_to)
+        return slots
+
+    def listen(self) -> None:
+        """Apply the classes committed by any session."""
+        if self.weeks > 0:
+            event.listen(Session, "after_commit", self._after_commit)
+
+    def remove(self) -> None:
+        if event.contains(Session, "after_commit", self._after_commit):
+            event.remove(Session, "after_commit", self._after_commit)
+
+    async def start(self) -> None:
+        if self.weeks > 0 and self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._run_refresh())
+
+    async def aclose(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+            self._refresh_task = None
+
+    def _check_period(self, starts_at: datetime, ends_at: datetime) -> tuple[int, int]:
+        if self.window is None:
+            raise exceptions.TimetableUnavailable
+        start, end = to_seconds(starts_at), math.ceil(ends_at.timestamp())
+        window_start, window_end = self.window
+        if not window_start <= start < end <= window_end:
+            raise exceptions.OutsideTimetable(
+                from_seconds(window_start), from_seconds(window_end)
+            )
+        return start, end
+
+    def _is_free(self, owner: Owner, starts_at: int, ends_at: int) -> bool:
+        timetable = self._owners.get(owner)
+        return timetable is None or timetable.is_free(starts_at, ends_at)
+
+    def _apply(self, changes: Iterable[ClassChange]) -> None:
+        for class_id, indexed in changes:
+            previous = self._classes.pop(class_id, None)
+            if previous is not None:
+                for owner in previous.owners:
+                    self._owners[owner].remove(class_id, previous.starts_at)
+            if indexed is None or self.window is None:
+                continue
+            window_start, window_end = self.window
+            if window_start <= indexed.starts_at < window_end:
+                self._classes[class_id] = indexed
+                for owner in indexed.owners:
+                    self._owners.setdefault(owner, OwnerTimetable()).add(
+                        class_id, indexed.starts_at, indexed.ends_at
+                    )
+
+    async def _run_refresh(self) -> None:
+        while True:
+            started = asyncio.get_running_loop().time()
+            self._reload.clear()
+            try:
+                await self.load()
+            except Exception:
+                logger.warning("Timetable index was not reloaded", exc_info=True)
+            elapsed = asyncio.get_running_loop().time() - started
+            delay = max(0.0, self.refresh_seconds - elapsed)
+            try:
+                await asyncio.wait_for(self._reload.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _after_commit(self, session: Session) -> None:
+        changes = session.info.pop(CHANGED_CLASSES, None)
+        if session.info.pop(TIMETABLE_STALE, False):
+            self.reload_soon()
+        if changes:
+            self.apply(changes.items())
+
+
+def record_changed_classes(info: dict[str, Any], changes: Iterable[ClassChange]) -> None:
+    """Apply the changes on commit, after changing classes bypassing the flush."""
+    info.setdefault(CHANGED_CLASSES, {}).update(changes)
+
+
+def indexed_class(values: Any) -> IndexedClass:
+    """Return the indexed bounds and owners of a class or of a row of its columns."""
+    return IndexedClass(
+        starts_at=to_seconds(values.starts_at),
+        ends_at=math.ceil((values.starts_at + values.duration).timestamp()),
+        owners=_owners_of(values),
+    )
+
+
+def _owners_of(values: Any) -> tuple[Owner, ...]:
+    return tuple(
+        (kind, getattr(values, column))
+        for kind, column in CONFLICT_COLUMNS.items()
+        if getattr(values, column) is not None
+    )
+
+
+def _build(rows: Iterable[Any]) -> tuple[dict[Owner, OwnerTimetable], dict[int, IndexedClass]]:
+    classes: dict[int, IndexedClass] = {}
+    by_owner: dict[Owner, list[tuple[int, int, int]]] = {}
+    for row in rows:
+        starts_at = to_seconds(row.starts_at)
+        indexed = IndexedClass(
+            starts_at=starts_at,
+            ends_at=math.ceil((row.starts_at + row.duration).timestamp()),
+            owners=_owners_of(row),
+        )
+        classes[row.id] = indexed
+        for owner in indexed.owners:
+            by_owner.setdefault(owner, []).append((indexed.starts_at, indexed.ends_at, row.id))
+
+    owners: dict[Owner, OwnerTimetable] = {}
+    for owner, periods in by_owner.items():
+        periods.sort()
+        timetable = owners[owner] = OwnerTimetable()
+        timetable.starts.extend(starts_at for starts_at, _, _ in periods)
+        timetable.ends.extend(ends_at for _, ends_at, _ in periods)
+        timetable.class_ids.extend(class_id for _, _, class_id in periods)
+    return owners, classes
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_classes(session: Session, flush_context: Any) -> None:
+    changed = session.info.setdefault(CHANGED_CLASSES, {})
+    columns = ("starts_at", "duration", *CONFLICT_COLUMNS.values())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if not isinstance(obj, Class):
+            continue
+        # The flushed values, without loading the ones that were not loaded
+        values = instance_state(obj).dict
+        if obj in session.deleted:
+            changed[obj.id] = None
+        elif all(column in values for column in columns):
+            changed[obj.id] = indexed_class(obj)
+        else:
+            changed[obj.id] = None
+            session.info[TIMETABLE_STALE] = True
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_classes(session: Session) -> None:
+    session.info.pop(CHANGED_CLASSES, None)
+    session.info.pop(TIMETABLE_STALE, None)
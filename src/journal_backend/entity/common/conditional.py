@@ -0,0 +1,89 @@
+"""Contain the validators of the conditional GETs.
+
+A read endpoint looks up the version of what it would return, e.g. the
+latest `updated_on` and the count of its rows, and answers `304 Not
+Modified` when the client already has it, before loading anything else.
+"""
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import HTTPException, Request
+from starlette import status
+
+
+@dataclass(frozen=True)
+class ResourceVersion:
+    """Represent the validators of a response.
+
+    Attributes:
+        etag (str): The entity tag of the response.
+        last_modified (Optional[datetime]): When the response last changed.
+    """
+
+    etag: str
+    last_modified: Optional[datetime] = None
+
+    @classmethod
+    def of_rows(cls, last_modified: Optional[datetime], count: int = 1) -> "ResourceVersion":
+        """Return the version of a response built from the rows.
+
+        The count tells a deleted row apart, it doesn't change the latest
+        `updated_on`. The tag is weak: it changes with the rows, not with
+        the bytes of the response.
+        """
+        micros = int(last_modified.timestamp() * 1_000_000) if last_modified else 0
+        return cls(etag=f'W/"{count:x}-{micros:x}"', last_modified=last_modified)
+
+    @classmethod
+    def of_content(cls, content: bytes) -> "ResourceVersion":
+        return cls(etag=f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"')
+
+    @property
+    def headers(self) -> dict[str, str]:
+        # no-cache: the clients may keep the response, but revalidate it
+        headers = {"ETag": self.etag, "Cache-Control": "private, no-cache"}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(
+                self.last_modified.astimezone(timezone.utc), usegmt=True
+            )
+        return headers
+
+    def matches(self, request: Request) -> bool:
+        """Return whether the client's copy of the response is this version."""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = {_opaque_tag(tag) for tag in if_none_match.split(",")}
+            return "*" in tags or _opaque_tag(self.etag) in tags
+
+        # Only looked at without If-None-Match, a second is too coarse alone
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since is None or self.last_modified is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return self.last_modified.replace(microsecond=0) <= since
+
+
+def _opaque_tag(tag: str) -> str:
+    # If-None-Match compares the tags weakly
+    return tag.strip().removeprefix("W/")
+
+
+def check_not_modified(request: Request, version: ResourceVersion) -> None:
+    """Answer 304 when the client has the version of the response.
+
+    Raises:
+        HTTPException: The 304 response, without a body.
+    """
+    if version.matches(request):
+        raise HTTPException(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers=version.headers,
+        )
@@ -0,0 +1,97 @@
+"""Contain the ranges of days the schedules and the reports are read for.
+
+An endpoint takes either a week `offset` from the current week, or a
+`from` / `to` pair of days, both included.
+"""
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import Query
+
+from journal_backend.entity.common.exceptions import InvalidDateRange
+
+WEEK = timedelta(days=7)
+
+# Bounds the ranges of the schedules and the reports, six weeks cover a month view
+MAX_PERIOD_DAYS = 42
+
+
+@dataclass(frozen=True)
+class DateRange:
+    """Represent the days from `start` to `end`, both included."""
+
+    start: date
+    end: date
+
+    @classmethod
+    def week(cls, offset: int = 0) -> "DateRange":
+        """Return the week `offset` weeks from the current one, from monday to sunday."""
+        now_with_offset = date.today() + offset * WEEK
+        monday = now_with_offset - timedelta(days=now_with_offset.weekday())
+        return cls(monday, monday + timedelta(days=6))
+
+    @property
+    def stop(self) -> date:
+        """Return the day after the range, the exclusive bound of the queries."""
+        return self.end + timedelta(days=1)
+
+    @property
+    def days(self) -> int:
+        return (self.end - self.start).days + 1
+
+    @property
+    def is_week(self) -> bool:
+        return self.start.weekday() == 0 and self.days == 7
+
+    def shift(self, ranges: int) -> "DateRange":
+        """Return the range of the same length, `ranges` of them later."""
+        delta = timedelta(days=self.days * ranges)
+        return DateRange(self.start + delta, self.end + delta)
+
+    def check(self, max_days: int) -> None:
+        """Raise `InvalidDateRange` unless the range has from 1 to `max_days` days."""
+        if not 0 < self.days <= max_days:
+            raise InvalidDateRange(max_days)
+
+
+@dataclass(frozen=True)
+class PeriodQuery:
+    """Represent the range of days an endpoint is asked for.
+
+    Attributes:
+        period (DateRange): The days.
+        offset (Optional[int]): The week offset, when given as one.
+    """
+
+    period: DateRange
+    offset: Optional[int] = None
+
+    def page_urls(self, uri_prefix: str) -> tuple[str, str]:
+        """Return the URLs of the next and the previous ranges."""
+        if self.offset is not None:
+            return (
+                f"{uri_prefix}?offset={self.offset + 1}",
+                f"{uri_prefix}?offset={self.offset - 1}",
+            )
+        following, preceding = self.period.shift(1), self.period.shift(-1)
+        return (
+            f"{uri_prefix}?from={following.start}&to={following.end}",
+            f"{uri_prefix}?from={preceding.start}&to={preceding.end}",
+        )
+
+
+async def period_query(
+        offset: int = 0,
+        from_: Optional[date] = Query(default=None, alias="from"),
+        to: Optional[date] = None,
+) -> PeriodQuery:
+    """Read the range of days from the query, the `offset` week unless `from` is given.
+
+    `to` defaults to the sunday of the week of `from`.
+    """
+    if from_ is None:
+        return PeriodQuery(DateRange.week(offset), offset)
+    if to is None:
+        to = from_ + timedelta(days=6 - from_.weekday())
+    return PeriodQuery(DateRange(from_, to))
@@ -1,20 +1,196 @@
+import asyncio
+import email
+import logging
+from email import policy
 from email.message import EmailMessage
+from typing import Any, Optional, Protocol
 
 import aiosmtplib
 
 from journal_backend.config import SMTPConfig
+from journal_backend.entity.common.exceptions import EmailDeliveryFailed
+from journal_backend.entity.common.job_queue import JobQueue
+
+logger = logging.getLogger(__name__)
+
+SEND_EMAIL_JOB = "send_email"
+
+_Delivery = tuple[EmailMessage, Optional["asyncio.Future[None]"]]
+
+
+class MailSender(Protocol):
+    async def send_email(self, em: EmailMessage) -> None:
+        ...
+
+    async def close(self) -> None:
+        ...
 
 
 class EmailSender:
-    async def send_email(self, email_to: str, smtp_cfg: SMTPConfig, em: EmailMessage) -> None:
-        async with aiosmtplib.SMTP(
-                hostname=smtp_cfg.host,
-                port=smtp_cfg.port,
-                use_tls=True
-        ) as smtp:
-            await smtp.login(smtp_cfg.email, smtp_cfg.password)
-            await smtp.sendmail(
-                smtp_cfg.email,
-                email_to,
-                em.as_string()
+    """Represent an in-process email delivery subsystem.
+
+    Messages are put into a bounded queue and delivered by a small pool of
+    workers, each holding one long-lived authenticated SMTP connection.
+    A broken connection is reopened with an exponential backoff and the
+    message is retried, permanent (5xx) rejections are dropped.
+
+    Attributes:
+        smtp_cfg (SMTPConfig): The SMTP server configuration.
+        sent (int): The amount of delivered messages.
+        failed (int): The amount of messages given up on.
+    """
+
+    def __init__(self, smtp_cfg: SMTPConfig) -> None:
+        self.smtp_cfg = smtp_cfg
+        self.sent = 0
+        self.failed = 0
+        self._queue: Optional[asyncio.Queue[_Delivery]] = None
+        self._workers: list[asyncio.Task[None]] = []
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def start(self) -> None:
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.smtp_cfg.queue_size)
+        self._workers = [
+            asyncio.create_task(self._work(self._queue), name=f"smtp-worker-{i}")
+            for i in range(self.smtp_cfg.connections)
+        ]
+
+    async def send_email(self, em: EmailMessage) -> None:
+        """Enqueue the message for delivery, wait while the queue is full."""
+        await self.start()
+        assert self._queue is not None
+        await self._queue.put((em, None))
+
+    async def deliver(self, em: EmailMessage) -> None:
+        """Send the message through the pool and wait until it is delivered.
+
+        Raises:
+            EmailDeliveryFailed: The message was rejected or retries ran out.
+        """
+        await self.start()
+        assert self._queue is not None
+        delivered = asyncio.get_running_loop().create_future()
+        await self._queue.put((em, delivered))
+        await delivered
+
+    async def close(self, timeout: Optional[float] = None) -> None:
+        """Drain the queue and close the connections."""
+        if self._queue is None:
+            return
+
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout or self.smtp_cfg.drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Email queue was not drained, %s messages lost", self.queued)
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    async def _work(self, queue: asyncio.Queue[_Delivery]) -> None:
+        smtp: Optional[aiosmtplib.SMTP] = None
+        try:
+            while True:
+                em, delivered = await queue.get()
+                try:
+                    smtp, ok = await self._deliver(smtp, em)
+                except Exception:
+                    # A malformed message, e.g. without sender or recipients,
+                    # must not take the worker down with it
+                    logger.exception("Email to %s can't be sent", em["To"])
+                    self.failed += 1
+                    if delivered is not None and not delivered.done():
+                        delivered.set_exception(EmailDeliveryFailed())
+                else:
+                    if delivered is not None and not delivered.done():
+                        if ok:
+                            delivered.set_result(None)
+                        else:
+                            delivered.set_exception(EmailDeliveryFailed())
+                finally:
+                    queue.task_done()
+        finally:
+            if smtp is not None and smtp.is_connected:
+                try:
+                    await smtp.quit()
+                except aiosmtplib.SMTPException:
+                    smtp.close()
+
+    async def _deliver(
+            self, smtp: Optional[aiosmtplib.SMTP], em: EmailMessage
+    ) -> tuple[Optional[aiosmtplib.SMTP], bool]:
+        attempt = 0
+        while True:
+            try:
+                if smtp is None or not smtp.is_connected:
+                    smtp = await self._connect()
+                await smtp.send_message(em)
+                self.sent += 1
+                return smtp, True
+            except aiosmtplib.SMTPResponseException as e:
+                if e.code >= 500:
+                    logger.error("Email to %s was rejected: %s", em["To"], e)
+                    self.failed += 1
+                    return smtp, False
+                error: Exception = e
+            except (aiosmtplib.SMTPException, OSError) as e:
+                error = e
+
+            if smtp is not None:
+                smtp.close()
+                smtp = None
+
+            attempt += 1
+            if attempt > self.smtp_cfg.max_retries:
+                logger.error("Email to %s was not delivered: %s", em["To"], error)
+                self.failed += 1
+                return None, False
+
+            backoff = min(
+                self.smtp_cfg.backoff_max_seconds,
+                self.smtp_cfg.backoff_seconds * 2 ** (attempt - 1),
             )
+            logger.warning("SMTP delivery failed (%s), retrying in %.1fs", error, backoff)
+            await asyncio.sleep(backoff)
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.smtp_cfg.host,
+            port=self.smtp_cfg.port,
+            use_tls=self.smtp_cfg.use_tls,
+            timeout=self.smtp_cfg.timeout_seconds,
+        )
+        await smtp.connect()
+        await smtp.login(self.smtp_cfg.email, self.smtp_cfg.password)
+        return smtp
+
+
+class QueuedEmailSender:
+    """Represent an email sender handing messages over to the job workers.
+
+    Attributes:
+        job_queue (JobQueue): The queue the `send_email` jobs are put into.
+    """
+
+    def __init__(self, job_queue: JobQueue) -> None:
+        self.job_queue = job_queue
+
+    async def send_email(self, em: EmailMessage) -> None:
+        await self.job_queue.enqueue(SEND_EMAIL_JOB, {"message": em.as_string()})
+
+    async def close(self) -> None:
+        pass
+
+
+async def handle_send_email(email_sender: EmailSender, payload: dict[str, Any]) -> None:
+    """Deliver the message of a `send_email` job."""
+    em = email.message_from_string(payload["message"], policy=policy.default)
+    assert isinstance(em, EmailMessage)
+    await email_sender.deliver(em)
@@ -0,0 +1,21 @@
+class PasswordHasherOverloaded(Exception):
+    def __str__(self) -> str:
+        return "Too many password operations in progress, try again later"
+
+
+class EmailDeliveryFailed(Exception):
+    def __str__(self) -> str:
+        return "Email was not delivered"
+
+
+class InvalidCursor(Exception):
+    def __str__(self) -> str:
+        return "Pagination cursor is invalid"
+
+
+class InvalidDateRange(Exception):
+    def __init__(self, max_days: int) -> None:
+        self.max_days = max_days
+
+    def __str__(self) -> str:
+        return f"Date range must end after it starts and span at most {self.max_days} days"
@@ -0,0 +1,234 @@
+import asyncio
+import json
+import logging
+import time
+from contextlib import suppress
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Mapping, TypeAlias
+
+from redis.asyncio import Redis
+from redis.exceptions import ConnectionError, ResponseError, TimeoutError
+
+from journal_backend.config import JobsConfig
+
+if TYPE_CHECKING:
+    RedisT: TypeAlias = Redis[bytes]  # type:ignore
+else:
+    RedisT = Redis
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[dict[str, Any]], Awaitable[None]]
+
+# Move the delayed jobs that are due back to the stream, atomically so that
+# a job is neither lost nor released twice by concurrent consumers
+RELEASE_DUE_JOBS = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, entry in ipairs(due) do
+    redis.call('ZREM', KEYS[1], entry)
+    local job = cjson.decode(entry)
+    redis.call(
+        'XADD', KEYS[2], 'MAXLEN', '~', ARGV[3], '*',
+        'name', job.name, 'payload', job.payload, 'attempts', job.attempts
+    )
+end
+return #due
+"""
+
+
+@dataclass(frozen=True)
+class Job:
+    id: str
+    name: str
+    payload: dict[str, Any]
+    attempts: int = 0
+
+
+class JobQueue:
+    """Represent a durable job queue on top of a Redis stream.
+
+    Producers append jobs to the stream, workers read them through a
+    consumer group and acknowledge a job only once its handler succeeded.
+    A failed job is parked in the `<stream>:delayed` sorted set and
+    re-appended with an increased attempt counter once its exponential
+    backoff is over, a job left pending by a crashed worker is claimed by
+    another one after `claim_idle_ms`. Jobs out of attempts go to the
+    `<stream>:dead` stream.
+
+    Attributes:
+        redis (RedisT): The redis client.
+        cfg (JobsConfig): The job queue configuration.
+    """
+
+    def __init__(self, redis: RedisT, cfg: JobsConfig) -> None:
+        self.redis = redis
+        self.cfg = cfg
+
+    @property
+    def dead_letter_stream(self) -> str:
+        return f"{self.cfg.stream}:dead"
+
+    @property
+    def delayed_set(self) -> str:
+        return f"{self.cfg.stream}:delayed"
+
+    async def enqueue(self, name: str, payload: dict[str, Any], attempts: int = 0) -> str:
+        job_id = await self.redis.xadd(
+            self.cfg.stream,
+            {"name": name, "payload": json.dumps(payload), "attempts": attempts},
+            maxlen=self.cfg.max_len,
+            approximate=True,
+        )
+        return _decode(job_id)
+
+    async def ensure_group(self) -> None:
+        try:
+            await self.redis.xgroup_create(self.cfg.stream, self.cfg.group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def run(
+            self,
+            consumer: str,
+            handlers: Mapping[str, JobHandler],
+            stop: asyncio.Event,
+    ) -> None:
+        """Process jobs as the `consumer` member of the group until `stop` is set.
+
+        A lost redis connection is retried with a backoff, jobs it left
+        unacknowledged are claimed again later.
+        """
+        group_ready = False
+        failures = 0
+        while not stop.is_set():
+            try:
+                if not group_ready:
+                    await self.ensure_group()
+                    group_ready = True
+                await self._release_due()
+                jobs = await self._claim_stale(consumer) + await self._read(consumer)
+                for job in jobs:
+                    await self.process(job, handlers)
+                failures = 0
+            except (ConnectionError, TimeoutError) as e:
+                # The stream may be gone with a restarted redis instance
+                group_ready = False
+                failures += 1
+                delay = self._backoff(failures)
+                logger.warning(
+                    "Consumer %s lost redis (%s), retrying in %.1fs", consumer, e, delay
+                )
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(stop.wait(), delay)
+
+    async def process(self, job: Job, handlers: Mapping[str, JobHandler]) -> None:
+        handler = handlers.get(job.name)
+        if handler is None:
+            await self._bury(job, f"no handler for job {job.name!r}")
+        elif job.attempts >= self.cfg.max_attempts:
+            await self._bury(job, "out of attempts")
+        else:
+            try:
+                await handler(job.payload)
+            except Exception as e:
+                logger.exception("Job %s (%s) failed", job.id, job.name)
+                if job.attempts + 1 >= self.cfg.max_attempts:
+                    await self._bury(job, repr(e))
+                else:
+                    await self._retry_later(job)
+
+        await self.redis.xack(self.cfg.stream, self.cfg.group, job.id)
+
+    async def _retry_later(self, job: Job) -> None:
+        attempts = job.attempts + 1
+        due_ms = time.time() * 1000 + self._backoff(attempts) * 1000
+        entry = {
+            "id": job.id,
+            "name": job.name,
+            "payload": json.dumps(job.payload),
+            "attempts": attempts,
+        }
+        await self.redis.zadd(self.delayed_set, {json.dumps(entry): due_ms})
+
+    async def _release_due(self) -> None:
+        await self.redis.eval(  # type:ignore[misc]
+            RELEASE_DUE_JOBS,
+            2,
+            self.delayed_set,
+            self.cfg.stream,
+            str(int(time.time() * 1000)),
+            str(self.cfg.batch_size),
+            str(self.cfg.max_len),
+        )
+
+    def _backoff(self, failures: int) -> float:
+        """Return the delay in seconds after `failures` failures in a row."""
+        delay_ms: int = min(
+            self.cfg.retry_backoff_max_ms,
+            self.cfg.retry_backoff_ms * 2 ** (failures - 1),
+        )
+        return delay_ms / 1000
+
+    async def _read(self, consumer: str) -> list[Job]:
+        response = await self.redis.xreadgroup(
+            self.cfg.group,
+            consumer,
+            {self.cfg.stream: ">"},
+            count=self.cfg.batch_size,
+            block=self.cfg.block_ms,
+        )
+        return [
+            _parse_job(entry_id, fields)
+            for _, entries in response or []
+            for entry_id, fields in entries
+        ]
+
+    async def _claim_stale(self, consumer: str) -> list[Job]:
+        response = await self.redis.xautoclaim(
+            self.cfg.stream,
+            self.cfg.group,
+            consumer,
+            min_idle_time=self.cfg.claim_idle_ms,
+            count=self.cfg.batch_size,
+        )
+        jobs = []
+        for entry_id, fields in response[1]:
+            if not fields:
+                continue
+            job = _parse_job(entry_id, fields)
+            # Every extra delivery means a worker died while running the job
+            pending = await self.redis.xpending_range(
+                self.cfg.stream, self.cfg.group, min=job.id, max=job.id, count=1
+            )
+            deliveries = pending[0]["times_delivered"] if pending else 1
+            jobs.append(replace(job, attempts=job.attempts + deliveries - 1))
+        return jobs
+
+    async def _bury(self, job: Job, reason: str) -> None:
+        logger.error("Job %s (%s) moved to the dead letter stream: %s", job.id, job.name, reason)
+        await self.redis.xadd(
+            self.dead_letter_stream,
+            {
+                "name": job.name,
+                "payload": json.dumps(job.payload),
+                "attempts": job.attempts,
+                "reason": reason,
+            },
+            maxlen=self.cfg.max_len,
+            approximate=True,
+        )
+
+
+def _decode(value: bytes | str) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _parse_job(entry_id: bytes | str, fields: dict[Any, Any]) -> Job:
+    fields = {_decode(key): _decode(value) for key, value in fields.items()}
+    return Job(
+        id=_decode(entry_id),
+        name=fields["name"],
+        payload=json.loads(fields["payload"]),
+        attempts=int(fields.get("attempts", 0)),
+    )
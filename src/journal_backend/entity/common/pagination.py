@@ -1,8 +1,19 @@
+import base64
+import binascii
+import json
 from dataclasses import dataclass
-from typing import Generic, TypeVar
+from typing import Any, Callable, Generic, Optional, Sequence, TypeVar
+
+from fastapi import Response
+from sqlalchemy import ColumnElement, Select, tuple_
+from sqlalchemy.orm import QueryableAttribute
+
+from journal_backend.entity.common.exceptions import InvalidCursor
 
 T = TypeVar("T")
 
+MAX_PAGE_SIZE = 100
+
 
 @dataclass(frozen=True)
 class PaginationResponse(Generic[T]):
@@ -11,23 +22,136 @@ class PaginationResponse(Generic[T]):
     data: list[T]
 
 
-def generate_pagination_response(
+def pagination_json_response(next_url: str, prev_url: str, data: bytes) -> Response:
+    """Return a `PaginationResponse` around the already serialized JSON of its data."""
+    links = json.dumps({"next_url": next_url, "prev_url": prev_url}, separators=(",", ":"))
+    response: Response = Response(
+        content=links[:-1].encode() + b',"data":' + data + b"}",
+        media_type="application/json",
+    )
+    return response
+
+
+@dataclass(frozen=True)
+class CursorPaginationResponse(Generic[T]):
+    next_url: str
+    prev_url: str
+    data: list[T]
+    total: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Represent a position between two rows of a keyset-paginated listing.
+
+    Attributes:
+        key (tuple): The sort key of the row the page starts after.
+        backward (bool): Whether the page goes before the row instead.
+    """
+    key: tuple[Any, ...]
+    backward: bool = False
+
+
+@dataclass(frozen=True)
+class Page(Generic[T]):
+    items: list[T]
+    next_cursor: Optional[Cursor]
+    prev_cursor: Optional[Cursor]
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    raw = json.dumps([list(cursor.key), cursor.backward], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, key_types: Sequence[type]) -> Cursor:
+    """Return the cursor of the token if its key is made of `key_types`.
+
+    Raises:
+        InvalidCursor: The token is malformed or its key has other types.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        key, backward = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise InvalidCursor
+    if not isinstance(key, list) or len(key) != len(key_types) or not isinstance(backward, bool):
+        raise InvalidCursor
+    # `type` rather than `isinstance`, a bool isn't taken for an int
+    if any(type(item) is not key_type for item, key_type in zip(key, key_types)):
+        raise InvalidCursor
+    return Cursor(key=tuple(key), backward=backward)
+
+
+def seek(
+        stmt: Select[Any],
+        columns: Sequence[ColumnElement[Any] | QueryableAttribute[Any]],
+        cursor: Optional[Cursor],
+        limit: int,
+) -> Select[Any]:
+    """Restrict the statement to the page after (or before) the cursor.
+
+    One row more than `limit` is selected to tell whether the listing goes on,
+    `paginate` drops it. The columns must be unique together and indexed in
+    this order for the page to cost the same wherever it is.
+    """
+    key = tuple_(*columns) if len(columns) > 1 else columns[0]
+    if cursor is not None:
+        if len(cursor.key) != len(columns):
+            raise InvalidCursor
+        bound = tuple_(*cursor.key) if len(columns) > 1 else cursor.key[0]
+        stmt = stmt.where(key < bound if cursor.backward else key > bound)
+
+    backward = cursor is not None and cursor.backward
+    return stmt.order_by(
+        *(column.desc() if backward else column.asc() for column in columns)
+    ).limit(limit + 1)
+
+
+def paginate(
+        rows: Sequence[T],
+        key: Callable[[T], tuple[Any, ...]],
+        cursor: Optional[Cursor],
+        limit: int,
+) -> Page[T]:
+    """Build the page out of the rows selected by `seek`."""
+    backward = cursor is not None and cursor.backward
+    has_more = len(rows) > limit
+    items = list(rows[:limit])
+    if backward:
+        items.reverse()
+
+    if not items:
+        return Page(items=items, next_cursor=None, prev_cursor=None)
+
+    has_next = has_more if not backward else True
+    has_prev = has_more if backward else cursor is not None
+    return Page(
+        items=items,
+        next_cursor=Cursor(key=key(items[-1])) if has_next else None,
+        prev_cursor=Cursor(key=key(items[0]), backward=True) if has_prev else None,
+    )
+
+
+def generate_cursor_pagination_response(
         uri_prefix: str,
-        offset: int,
+        page: Page[Any],
         limit: int,
-        max_offset: int,
-        data: list[T]
-) -> PaginationResponse[T]:
-    prev_url = f"{uri_prefix}?offset={offset - limit}&{limit=}"
-    if offset - limit < 0:
-        prev_url = ""
-
-    next_url = f"{uri_prefix}?offset={offset + limit}&{limit=}"
-    if offset + limit >= max_offset:
-        next_url = ""
-
-    return PaginationResponse(
+        data: list[T],
+        total: Optional[int] = None,
+) -> CursorPaginationResponse[T]:
+    next_url = ""
+    if page.next_cursor is not None:
+        next_url = f"{uri_prefix}?cursor={encode_cursor(page.next_cursor)}&{limit=}"
+
+    prev_url = ""
+    if page.prev_cursor is not None:
+        prev_url = f"{uri_prefix}?cursor={encode_cursor(page.prev_cursor)}&{limit=}"
+
+    return CursorPaginationResponse(
         next_url=next_url,
         prev_url=prev_url,
         data=data,
+        total=total,
     )
+
@@ -0,0 +1,80 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from fastapi_users.password import PasswordHelper
+
+from journal_backend.entity.common.exceptions import PasswordHasherOverloaded
+
+T = TypeVar("T")
+
+# Every worker process builds its own helper on import
+_password_helper = PasswordHelper()
+
+
+def _hash(password: str) -> str:
+    return _password_helper.hash(password)
+
+
+def _verify_and_update(password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    return _password_helper.verify_and_update(password, hashed_password)
+
+
+class PasswordHasher:
+    """Represent a bcrypt hasher that keeps the CPU-bound work off the event loop.
+
+    Calls are sent to a process pool. At most `max_pending` calls may wait
+    for or run in the pool at once, extra calls fail fast with
+    `PasswordHasherOverloaded` instead of piling up behind the pool.
+
+    Attributes:
+        workers (int): The amount of worker processes.
+        max_pending (int): The maximum amount of queued and running calls.
+    """
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pending = 0
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(_hash, password)
+
+    async def verify_and_update(
+            self, password: str, hashed_password: str
+    ) -> tuple[bool, Optional[str]]:
+        return await self._submit(_verify_and_update, password, hashed_password)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    async def _submit(self, func: Callable[..., T], *args: Any) -> T:
+        if self._pending >= self.max_pending:
+            raise PasswordHasherOverloaded
+
+        loop = asyncio.get_running_loop()
+        future = self._executor.submit(func, *args)
+        self._pending += 1
+        # A cancelled caller doesn't stop a running job, the slot is only
+        # released once the pool is done with it
+        future.add_done_callback(lambda _: self._release_soon(loop))
+        return await asyncio.wrap_future(future, loop=loop)
+
+    def _release_soon(self, loop: asyncio.AbstractEventLoop) -> None:
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            # The loop is already closed
+            self._release()
+
+    def _release(self) -> None:
+        self._pending -= 1
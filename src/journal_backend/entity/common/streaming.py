@@ -0,0 +1,30 @@
+from typing import Any, AsyncGenerator, Mapping, Optional
+
+import anyio
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+
+class ClosingStreamingResponse(StreamingResponse):
+    """Represent a streaming response closing its generator however it ends.
+
+    When the client disconnects Starlette cancels the response, leaving the
+    generator suspended with whatever it holds (e.g. a connection and its
+    server-side cursor) until it is garbage collected.
+    """
+
+    def __init__(
+            self,
+            content: AsyncGenerator[Any, None],
+            media_type: Optional[str] = None,
+            headers: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        super().__init__(content, media_type=media_type, headers=headers)
+        self.generator = content
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            with anyio.CancelScope(shield=True):
+                await self.generator.aclose()
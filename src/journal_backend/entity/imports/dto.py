@@ -0,0 +1,37 @@
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class ImportProgress:
+    """Represent the progress of a bulk import of one kind of records.
+
+    Attributes:
+        import_id (str): The id the import is resumed by.
+        kind (str): The kind of the imported records.
+        staged_rows (int): The number of the last source row copied to the staging table.
+        merged_rows (int): The number of the last staged row merged into the real table.
+        invalid_rows (int): The amount of skipped rows referencing missing records.
+        is_staged (bool): Whether the whole source was copied.
+        is_finished (bool): Whether the import is complete.
+    """
+    import_id: str
+    kind: str
+    staged_rows: int = 0
+    merged_rows: int = 0
+    invalid_rows: int = 0
+    is_staged: bool = False
+    is_finished: bool = False
+
+
+def checkpoint_to_progress(checkpoint: Any) -> ImportProgress:
+    """Build the progress out of an `ImportCheckpoint` or a row of its table."""
+    return ImportProgress(
+        import_id=checkpoint.import_id,
+        kind=checkpoint.kind,
+        staged_rows=checkpoint.staged_rows,
+        merged_rows=checkpoint.merged_rows,
+        invalid_rows=checkpoint.invalid_rows,
+        is_staged=checkpoint.is_staged,
+        is_finished=checkpoint.is_finished,
+    )
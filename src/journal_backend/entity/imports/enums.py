@@ -0,0 +1,11 @@
+from enum import StrEnum
+
+
+class ImportKind(StrEnum):
+    CLASSES = "classes"
+    ACADEMIC_REPORTS = "academic_reports"
+
+
+class ImportFormat(StrEnum):
+    CSV = "csv"
+    NDJSON = "ndjson"
@@ -0,0 +1,35 @@
+class InvalidImportId(Exception):
+    def __str__(self) -> str:
+        return "Import id must be 1 to 32 lowercase letters, digits or underscores"
+
+
+class ImportFormatError(Exception):
+    def __init__(self, line: int, reason: str) -> None:
+        self.line = line
+        self.reason = reason
+
+    def __str__(self) -> str:
+        return f"Row {self.line}: {self.reason}"
+
+
+class InvalidForeignKeys(Exception):
+    def __init__(self, count: int, sample: list[int]) -> None:
+        self.count = count
+        self.sample = sample
+
+    def __str__(self) -> str:
+        rows = ", ".join(map(str, self.sample))
+        return f"{self.count} rows reference missing records, e.g. rows {rows}"
+
+
+class ConflictingClasses(Exception):
+    def __init__(self, kind: str) -> None:
+        self.kind = kind
+
+    def __str__(self) -> str:
+        return f"Imported classes overlap other classes of the same {self.kind}"
+
+
+class ImportNotFound(Exception):
+    def __str__(self) -> str:
+        return "Import not found"
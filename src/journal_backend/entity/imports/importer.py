@@ -0,0 +1,328 @@
+"""Contain the bulk import of historical records through staging tables.
+
+An import of one kind of records goes through three resumable steps:
+1. the source rows are COPYed in batches to an UNLOGGED staging table;
+2. the staged rows referencing missing records are found set-wise,
+   with one anti-join per reference;
+3. the staged rows are merged into the real table in chunks of
+   consecutive rows, the later row of a duplicate winning.
+The checkpoint is saved in the transaction of every batch and chunk, so
+a rerun with the same import id continues where the last one stopped.
+Classes must be imported before the academic reports referencing them.
+"""
+import codecs
+import csv
+import json
+import re
+from typing import Any, AsyncIterator, Callable, Optional
+
+from sqlalchemy import select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from journal_backend.entity.classes.conflicts import conflict_kind
+from journal_backend.entity.imports.dto import (
+    ImportProgress,
+    checkpoint_to_progress,
+)
+from journal_backend.entity.imports.enums import ImportFormat
+from journal_backend.entity.imports.exceptions import (
+    ConflictingClasses,
+    ImportFormatError,
+    InvalidForeignKeys,
+    InvalidImportId,
+)
+from journal_backend.entity.imports.models import ImportCheckpoint
+from journal_backend.entity.imports.targets import ImportTarget
+
+IMPORT_ID_PATTERN = re.compile(r"[a-z0-9_]{1,32}")
+COPY_BATCH_SIZE = 50_000
+MERGE_CHUNK_SIZE = 250_000
+INVALID_SAMPLE_SIZE = 10
+
+ProgressCallback = Callable[[ImportProgress], None]
+
+checkpoints = ImportCheckpoint.__table__
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a stream of UTF-8 bytes into lines."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    tail = ""
+    async for chunk in chunks:
+        *lines, tail = (tail + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            yield line
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+async def read_rows(
+        lines: AsyncIterator[str],
+        fmt: ImportFormat,
+        target: ImportTarget,
+        skip: int = 0,
+) -> AsyncIterator[tuple[Any, ...]]:
+    """Parse the source into rows of the staging table, numbered from 1.
+
+    A CSV source starts with a header and can't have line breaks in its
+    values. Blank lines are ignored, the first `skip` rows are not parsed.
+
+    Raises:
+        ImportFormatError: A row can't be parsed.
+    """
+    header: Optional[list[str]] = None
+    row_number = 0
+    async for line in lines:
+        line = line.rstrip("\r")
+        if not line.strip():
+            continue
+        if fmt == ImportFormat.CSV and header is None:
+            header = next(csv.reader([line]))
+            missing = [f.name for f in target.fields if f.required and f.name not in header]
+            if missing:
+                raise ImportFormatError(0, f"the header misses {', '.join(missing)}")
+            continue
+
+        row_number += 1
+        if row_number <= skip:
+            continue
+        try:
+            if header is not None:
+                record = dict(zip(header, next(csv.reader([line]))))
+            else:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("expected a JSON object")
+            row = target.parse(record)
+        except ValueError as e:
+            raise ImportFormatError(row_number, str(e))
+        yield row_number, *row
+
+
+async def _batches(
+        rows: AsyncIterator[tuple[Any, ...]],
+        size: int,
+) -> AsyncIterator[list[tuple[Any, ...]]]:
+    batch = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class BulkImporter:
+    """Represent a resumable import of one kind of records.
+
+    Args:
+        engine (AsyncEngine): The engine of the primary database.
+        target (ImportTarget): The kind of the imported records.
+        import_id (str): The id the import is resumed by.
+        skip_invalid (bool): Whether rows referencing missing records are
+            dropped instead of failing the import.
+        on_progress (Optional[ProgressCallback]): Called after every step.
+    """
+
+    def __init__(
+            self,
+            engine: AsyncEngine,
+            target: ImportTarget,
+            import_id: str,
+            skip_invalid: bool = False,
+            on_progress: Optional[ProgressCallback] = None,
+            batch_size: int = COPY_BATCH_SIZE,
+            chunk_size: int = MERGE_CHUNK_SIZE,
+    ) -> None:
+        if not IMPORT_ID_PATTERN.fullmatch(import_id):
+            raise InvalidImportId
+        self.engine = engine
+        self.target = target
+        self.import_id = import_id
+        self.skip_invalid = skip_invalid
+        self.on_progress = on_progress
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        # Both parts are validated, the name is safe to put in statements
+        self.staging_table = f"import_{target.kind}_{import_id}"
+
+    async def run(self, lines: AsyncIterator[str], fmt: ImportFormat) -> ImportProgress:
+        """Import the source, or what is left of it.
+
+        The source is not read when a previous run staged it entirely.
+
+        Raises:
+            ImportFormatError: A row can't be parsed, the rows before its
+                batch stay staged.
+            InvalidForeignKeys: Rows reference missing records and
+                `skip_invalid` is off. Nothing of the import is merged.
+            ConflictingClasses: Merged classes overlap, the chunks merged
+                before stay merged.
+        """
+        async with self.engine.connect() as conn:
+            progress = await self._load_checkpoint(conn)
+            if progress.is_finished:
+                return progress
+            if not progress.is_staged:
+                rows = read_rows(lines, fmt, self.target, skip=progress.staged_rows)
+                await self._stage(conn, progress, rows)
+            await self._validate(conn, progress)
+            await self._merge(conn, progress)
+            await self._finish(conn, progress)
+        return progress
+
+    async def _load_checkpoint(self, conn: AsyncConnection) -> ImportProgress:
+        await conn.execute(
+            insert(checkpoints).
+            values(import_id=self.import_id, kind=self.target.kind).
+            on_conflict_do_nothing()
+        )
+        row = (await conn.execute(
+            select(checkpoints).
+            where(checkpoints.c.import_id == self.import_id).
+            where(checkpoints.c.kind == self.target.kind)
+        )).one()
+        await conn.commit()
+        return checkpoint_to_progress(row)
+
+    async def _save(self, conn: AsyncConnection, progress: ImportProgress, **values: Any) -> None:
+        await conn.execute(
+            update(checkpoints).
+            where(checkpoints.c.import_id == self.import_id).
+            where(checkpoints.c.kind == self.target.kind).
+            values(**values)
+        )
+        for name, value in values.items():
+            setattr(progress, name, value)
+
+    def _report(self, progress: ImportProgress) -> None:
+        if self.on_progress is not None:
+            self.on_progress(progress)
+
+    async def _stage(
+            self,
+            conn: AsyncConnection,
+            progress: ImportProgress,
+            rows: AsyncIterator[tuple[Any, ...]],
+    ) -> None:
+        # Only created for an import left to stage, `_finish` drops it
+        await conn.execute(text(
+            f"CREATE UNLOGGED TABLE IF NOT EXISTS {self.staging_table} "
+            f"(line bigint NOT NULL, "
+            f"LIKE {self.target.table} INCLUDING DEFAULTS INCLUDING GENERATED)"
+        ))
+        await conn.commit()
+
+        raw_conn = await conn.get_raw_connection()
+        asyncpg_conn: Any = raw_conn.driver_connection
+        columns = ["line", *self.target.columns]
+        async for batch in _batches(rows, self.batch_size):
+            # The update begins the transaction the COPY then runs in
+            await self._save(conn, progress, staged_rows=batch[-1][0])
+            await asyncpg_conn.copy_records_to_table(
+                self.staging_table, columns=columns, records=batch
+            )
+            await conn.commit()
+            self._report(progress)
+
+        await conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS {self.staging_table}_line "
+            f"ON {self.staging_table} (line)"
+        ))
+        await conn.execute(text(f"ANALYZE {self.staging_table}"))
+        await self._save(conn, progress, is_staged=True)
+        await conn.commit()
+        self._report(progress)
+
+    async def _validate(self, conn: AsyncConnection, progress: ImportProgress) -> None:
+        checks = []
+        for fk in self.target.foreign_keys:
+            is_set = " AND ".join(f"s.{column} IS NOT NULL" for column in fk.columns)
+            matches = " AND ".join(
+                f"r.{ref} = s.{column}" for column, ref in zip(fk.columns, fk.ref_columns)
+            )
+            checks.append(
+                f"SELECT s.line FROM {self.staging_table} AS s "
+                f"WHERE s.line > :merged AND {is_set} "
+                f"AND NOT EXISTS (SELECT FROM {fk.table} AS r WHERE {matches})"
+            )
+        invalid = f"WITH invalid AS ({' UNION '.join(checks)}) "
+        params = {"merged": progress.merged_rows}
+
+        count, sample = (await conn.execute(
+            text(
+                invalid +
+                "SELECT count(*), "
+                f"(array_agg(line ORDER BY line))[1:{INVALID_SAMPLE_SIZE}] FROM invalid"
+            ),
+            params,
+        )).one()
+        if count:
+            if not self.skip_invalid:
+                await conn.rollback()
+                raise InvalidForeignKeys(count, sample)
+            await conn.execute(
+                text(
+                    invalid +
+                    f"DELETE FROM {self.staging_table} "
+                    "WHERE line IN (SELECT line FROM invalid)"
+                ),
+                params,
+            )
+            await self._save(conn, progress, invalid_rows=progress.invalid_rows + count)
+        await conn.commit()
+        self._report(progress)
+
+    async def _merge(self, conn: AsyncConnection, progress: ImportProgress) -> None:
+        columns = ", ".join(self.target.columns)
+        conflict = ", ".join(self.target.conflict)
+        updates = ", ".join(
+            f"{column} = excluded.{column}"
+            for column in self.target.columns
+            if column not in self.target.conflict
+        )
+        if self.target.touch_column is not None:
+            updates = ", ".join(filter(None, (updates, f"{self.target.touch_column} = now()")))
+        merge = text(
+            f"INSERT INTO {self.target.table} ({columns}) "
+            f"SELECT DISTINCT ON ({conflict}) {columns} FROM {self.staging_table} "
+            "WHERE line > :lower AND line <= :upper "
+            f"ORDER BY {conflict}, line DESC "
+            f"ON CONFLICT ({conflict}) "
+            + (f"DO UPDATE SET {updates}" if updates else "DO NOTHING")
+        )
+        while progress.merged_rows < progress.staged_rows:
+            upper = min(progress.merged_rows + self.chunk_size, progress.staged_rows)
+            try:
+                await conn.execute(merge, {"lower": progress.merged_rows, "upper": upper})
+            except IntegrityError as e:
+                kind = conflict_kind(e)
+                if kind is None:
+                    raise
+                await conn.rollback()
+                raise ConflictingClasses(kind) from e
+            await self._save(conn, progress, merged_rows=upper)
+            await conn.commit()
+            self._report(progress)
+
+    async def _finish(self, conn: AsyncConnection, progress: ImportProgress) -> None:
+        if self.target.after_merge is not None:
+            await conn.execute(text(self.target.after_merge))
+        await conn.execute(text(f"DROP TABLE IF EXISTS {self.staging_table}"))
+        await self._save(conn, progress, is_finished=True)
+        await conn.commit()
+        self._report(progress)
+
+
+async def get_import_progress(engine: AsyncEngine, import_id: str) -> list[ImportProgress]:
+    async with engine.connect() as conn:
+        rows = (await conn.execute(
+            select(checkpoints).
+            where(checkpoints.c.import_id == import_id).
+            order_by(checkpoints.c.kind)
+        )).all()
+    return [checkpoint_to_progress(row) for row in rows]
@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, PrimaryKeyConstraint, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from journal_backend.database.base import Base
+
+
+class ImportCheckpoint(Base):  # type: ignore[misc]
+    """Represent how far a bulk import of one kind of records got.
+
+    A rerun of the same import continues from here.
+    """
+    __tablename__ = "import_checkpoints"
+
+    import_id: Mapped[str] = mapped_column(String(32))
+    kind: Mapped[str] = mapped_column(String(32))
+    # Rows are counted by their number in the source
+    staged_rows: Mapped[int] = mapped_column(BigInteger, default=0)
+    merged_rows: Mapped[int] = mapped_column(BigInteger, default=0)
+    invalid_rows: Mapped[int] = mapped_column(BigInteger, default=0)
+    is_staged: Mapped[bool] = mapped_column(default=False)
+    is_finished: Mapped[bool] = mapped_column(default=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+    __table_args__ = (
+        PrimaryKeyConstraint("import_id", "kind"),
+    )
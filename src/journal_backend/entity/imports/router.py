@@ -0,0 +1,131 @@
+import logging
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+)
+from starlette import status
+
+from journal_backend.config import Config
+from journal_backend.depends_stub import Stub
+from journal_backend.entity.classes.cache import ScheduleCache
+from journal_backend.entity.classes.timetable import TimetableIndex
+from journal_backend.entity.common.job_queue import JobQueue
+from journal_backend.entity.imports import exceptions
+from journal_backend.entity.imports.dto import ImportProgress
+from journal_backend.entity.imports.enums import ImportFormat, ImportKind
+from journal_backend.entity.imports.importer import (
+    BulkImporter,
+    get_import_progress,
+    iter_lines,
+)
+from journal_backend.entity.imports.targets import TARGETS
+from journal_backend.entity.students.verification import (
+    VERIFY_AGGREGATES_JOB,
+    verify_academic_aggregates,
+)
+from journal_backend.entity.users.dependencies import current_user
+from journal_backend.entity.users.dto import Principal
+from journal_backend.entity.users.enums import Role
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/imports", tags=["imports"])
+
+
+def log_progress(progress: ImportProgress) -> None:
+    logger.info(
+        "Import %s of %s: %d rows staged, %d merged, %d invalid",
+        progress.import_id,
+        progress.kind,
+        progress.staged_rows,
+        progress.merged_rows,
+        progress.invalid_rows,
+    )
+
+
+@router.post("/{import_id}/{kind}")
+async def upload_import(
+        import_id: str,
+        kind: ImportKind,
+        request: Request,
+        background_tasks: BackgroundTasks,
+        format: ImportFormat = ImportFormat.CSV,
+        skip_invalid: bool = False,
+        caller: Principal = Depends(current_user),
+        engine: AsyncEngine = Depends(Stub(AsyncEngine)),
+        schedule_cache: ScheduleCache = Depends(Stub(ScheduleCache)),
+        timetable: TimetableIndex = Depends(Stub(TimetableIndex)),
+        cfg: Config = Depends(Stub(Config)),
+        job_queue: JobQueue = Depends(Stub(JobQueue)),
+        session_factory: async_sessionmaker[AsyncSession] = Depends(Stub(async_sessionmaker)),
+) -> ImportProgress:
+    """Import the CSV or NDJSON request body, streamed to the database as it arrives.
+
+    Sending the same import again resumes it, the rows already staged are skipped.
+    The academic aggregates are verified once the rows are merged.
+    """
+    if caller.role != Role.ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+
+    try:
+        importer = BulkImporter(
+            engine,
+            TARGETS[kind],
+            import_id,
+            skip_invalid=skip_invalid,
+            on_progress=log_progress,
+        )
+        progress = await importer.run(iter_lines(request.stream()), format)
+    except exceptions.InvalidImportId as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except (exceptions.ImportFormatError, exceptions.InvalidForeignKeys) as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except exceptions.ConflictingClasses as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    finally:
+        # The merged classes bypass the invalidation of the cached schedules
+        # and the updates of the timetable index
+        if kind == ImportKind.CLASSES:
+            timetable.reload_soon()
+            try:
+                await schedule_cache.invalidate_all()
+            except RedisError:
+                logger.warning("Schedule cache is unavailable", exc_info=True)
+
+    # The merged rows bypass the incremental update of the aggregates
+    if cfg.jobs.enabled:
+        await job_queue.enqueue(VERIFY_AGGREGATES_JOB, {})
+    else:
+        background_tasks.add_task(verify_academic_aggregates, session_factory)
+    return progress
+
+
+@router.get("/{import_id}")
+async def get_import(
+        import_id: str,
+        caller: Principal = Depends(current_user),
+        engine: AsyncEngine = Depends(Stub(AsyncEngine)),
+) -> list[ImportProgress]:
+    if caller.role != Role.ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+
+    progress: list[ImportProgress] = await get_import_progress(engine, import_id)
+    if not progress:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(exceptions.ImportNotFound())
+        )
+    return progress
@@ -0,0 +1,159 @@
+"""Contain what the bulk import knows about every kind of records it loads."""
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional
+
+from journal_backend.entity.classes.models import DEFAULT_CLASS_DURATION
+from journal_backend.entity.imports.enums import ImportKind
+from journal_backend.entity.students.enums import Graduation
+
+_TRUE = frozenset({"1", "t", "true", "y", "yes"})
+_FALSE = frozenset({"0", "f", "false", "n", "no"})
+
+
+def parse_int(value: Any) -> int:
+    if isinstance(value, bool):
+        raise ValueError("expected an integer")
+    return int(value)
+
+
+def parse_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise ValueError("expected a boolean")
+
+
+def parse_datetime(value: Any) -> datetime:
+    moment = datetime.fromisoformat(str(value))
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment
+
+
+def parse_minutes(value: Any) -> timedelta:
+    return timedelta(minutes=float(value))
+
+
+def parse_grade(value: Any) -> str:
+    # Stored by name, given either by name or by value
+    grade: str
+    if isinstance(value, str) and not value.strip().isdigit():
+        grade = Graduation[value.strip().upper()].name
+    else:
+        grade = Graduation(parse_int(value)).name
+    return grade
+
+
+@dataclass(frozen=True)
+class Field:
+    name: str
+    parse: Callable[[Any], Any]
+    required: bool = True
+    default: Any = None
+
+
+@dataclass(frozen=True)
+class ForeignKeyCheck:
+    columns: tuple[str, ...]
+    table: str
+    ref_columns: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class ImportTarget:
+    """Represent a table the bulk import loads.
+
+    Attributes:
+        kind (ImportKind): The kind of the records.
+        table (str): The table the records are merged into.
+        fields (tuple[Field, ...]): The columns taken from the source.
+        conflict (tuple[str, ...]): The unique columns a record is updated by.
+        foreign_keys (tuple[ForeignKeyCheck, ...]): The references checked before merging.
+        after_merge (Optional[str]): The statement run once everything is merged.
+        touch_column (Optional[str]): The column set to the merge time of the
+            updated records.
+    """
+    kind: ImportKind
+    table: str
+    fields: tuple[Field, ...]
+    conflict: tuple[str, ...]
+    foreign_keys: tuple[ForeignKeyCheck, ...]
+    after_merge: Optional[str] = None
+    touch_column: Optional[str] = "updated_on"
+
+    @property
+    def columns(self) -> list[str]:
+        return [f.name for f in self.fields]
+
+    def parse(self, record: dict[str, Any]) -> tuple[Any, ...]:
+        """Convert a source record to the row of the staging table.
+
+        Raises:
+            ValueError: The record misses a field or has a malformed one.
+        """
+        values = []
+        for f in self.fields:
+            value = record.get(f.name)
+            if value is None or value == "":
+                if f.required:
+                    raise ValueError(f"{f.name} is missing")
+                values.append(f.default)
+                continue
+            try:
+                values.append(f.parse(value))
+            except (KeyError, ValueError, TypeError):
+                raise ValueError(f"{f.name} is malformed: {value!r}")
+        return tuple(values)
+
+
+CLASSES = ImportTarget(
+    kind=ImportKind.CLASSES,
+    table="classes",
+    fields=(
+        Field("id", parse_int),
+        Field("starts_at", parse_datetime),
+        Field("duration", parse_minutes, required=False, default=DEFAULT_CLASS_DURATION),
+        Field("group_id", parse_int),
+        Field("teacher_id", parse_int, required=False),
+        Field("subject_id", parse_int, required=False),
+        Field("classroom_id", parse_int, required=False),
+    ),
+    conflict=("id",),
+    foreign_keys=(
+        ForeignKeyCheck(("group_id",), "groups", ("id",)),
+        ForeignKeyCheck(("teacher_id",), "teachers", ("id",)),
+        ForeignKeyCheck(("subject_id",), "subjects", ("id",)),
+        ForeignKeyCheck(("classroom_id",), "classrooms", ("id",)),
+        # Like the constraint, checked only when both are set
+        ForeignKeyCheck(
+            ("teacher_id", "subject_id"), "competencies", ("teacher_id", "subject_id")
+        ),
+    ),
+    # Classes are imported with their ids, the later ones are generated after them
+    after_merge="SELECT setval(pg_get_serial_sequence('classes', 'id'), max(id)) FROM classes",
+)
+
+ACADEMIC_REPORTS = ImportTarget(
+    kind=ImportKind.ACADEMIC_REPORTS,
+    table="academic_reports",
+    fields=(
+        Field("student_id", parse_int),
+        Field("class_id", parse_int),
+        Field("is_attended", parse_bool, required=False, default=False),
+        Field("grade", parse_grade, required=False),
+    ),
+    conflict=("student_id", "class_id"),
+    foreign_keys=(
+        ForeignKeyCheck(("student_id",), "students", ("id",)),
+        ForeignKeyCheck(("class_id",), "classes", ("id",)),
+    ),
+)
+
+TARGETS: dict[ImportKind, ImportTarget] = {
+    target.kind: target for target in (CLASSES, ACADEMIC_REPORTS)
+}
@@ -1,9 +1,11 @@
 from .classes.models import Class, Classroom
-from .students.models import AcademicReport, Group, Student
+from .imports.models import ImportCheckpoint
+from .students.models import AcademicAggregate, AcademicReport, Group, Student
 from .teachers.models import Competence, Subject, Teacher
 from .users.models import UserIdentity
 
 __all__ = (
+    "AcademicAggregate",
     "AcademicReport",
     "Class",
     "Classroom",
@@ -12,5 +14,6 @@ __all__ = (
     "Group",
     "Teacher",
     "Competence",
-    "Subject"
+    "Subject",
+    "ImportCheckpoint",
 )
@@ -0,0 +1,89 @@
+"""Contain the grade and attendance aggregates of the students.
+
+An aggregate sums the reports of a student for the classes of a subject in
+a term. The reports saved through the API update their aggregates in their
+own transaction, the verification job recomputes the aggregates from the
+reports, fixing the ones the reports written by other means (the admin,
+the bulk import) left behind. The reports of the classes without a subject
+are not aggregated.
+"""
+from dataclasses import dataclass, fields
+from typing import Any, Iterable, Mapping, Optional
+
+from sqlalchemy import (
+    ColumnElement,
+    Integer,
+    case,
+    cast,
+    extract,
+    func,
+    literal_column,
+)
+
+from journal_backend.entity.students.dto import AcademicReportCreate
+from journal_backend.entity.students.enums import Graduation
+
+# Namespace of the advisory locks the writers of a student's reports take
+AGGREGATES_LOCK = 1
+
+# (student_id, subject_id, term)
+AggregateKey = tuple[int, int, int]
+
+
+def term_expr(starts_at: Any) -> ColumnElement[int]:
+    """Return the term of a class start, e.g. 20241 or 20242 for 2024/25.
+
+    The autumn term runs from September to January, the spring one from
+    February to August. Shifted back by 8 months, they are the first 5 and
+    the last 7 months of the academic year.
+    """
+    shifted = func.timezone("UTC", starts_at) - literal_column("INTERVAL '8 months'")
+    return (
+        cast(extract("year", shifted), Integer) * 10 +
+        case((extract("month", shifted) <= 5, 1), else_=2)
+    )
+
+
+def grade_value_expr(grade: Any) -> ColumnElement[int]:
+    return case({g: g.value for g in Graduation}, value=grade)
+
+
+@dataclass
+class AggregateDelta:
+    reports_count: int = 0
+    attended_count: int = 0
+    graded_count: int = 0
+    grade_sum: int = 0
+
+    def add(self, report: AcademicReportCreate, sign: int) -> None:
+        self.reports_count += sign
+        self.attended_count += sign * report.is_attended
+        if report.grade is not None:
+            self.graded_count += sign
+            self.grade_sum += sign * report.grade.value
+
+    def __bool__(self) -> bool:
+        return any(getattr(self, f.name) for f in fields(self))
+
+
+def aggregate_deltas(
+        old_reports: Iterable[AcademicReportCreate],
+        new_reports: Iterable[AcademicReportCreate],
+        class_terms: Mapping[int, tuple[Optional[int], int]],
+) -> dict[AggregateKey, AggregateDelta]:
+    """Return the changes to the aggregates of replacing the old reports by the new ones.
+
+    Args:
+        old_reports: The saved reports the new ones replace.
+        new_reports: The reports being saved.
+        class_terms: The `(subject_id, term)` of the classes of the reports.
+    """
+    deltas: dict[AggregateKey, AggregateDelta] = {}
+    for reports, sign in ((old_reports, -1), (new_reports, 1)):
+        for report in reports:
+            subject_id, term = class_terms.get(report.class_id, (None, 0))
+            if subject_id is None:
+                continue
+            key = (report.student_id, subject_id, term)
+            deltas.setdefault(key, AggregateDelta()).add(report, sign)
+    return {key: delta for key, delta in deltas.items() if delta}
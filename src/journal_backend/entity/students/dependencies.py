@@ -5,8 +5,10 @@ from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from journal_backend.depends_stub import Stub
+from journal_backend.entity.classes.cache import ScheduleCache
 from journal_backend.entity.classes.repository import ClassRepository
-from journal_backend.entity.common.email_sender import EmailSender
+from journal_backend.entity.common.email_sender import EmailSender, MailSender
+from journal_backend.entity.common.password_hasher import PasswordHasher
 from journal_backend.entity.students.repository import StudentRepository
 from journal_backend.entity.students.service import StudentService
 from journal_backend.entity.users.repository import UserRepository
@@ -20,20 +22,24 @@ else:
 async def get_student_repository(
         session: AsyncSession = Depends(Stub(AsyncSession)),
 ) -> StudentRepository:
-    yield StudentRepository(session)
+    return StudentRepository(session)
 
 
 async def get_student_service(
         student_repository: StudentRepository = Depends(Stub(StudentRepository)),
         user_repository: UserRepository = Depends(Stub(UserRepository)),
         class_repository: ClassRepository = Depends(Stub(ClassRepository)),
-        email_sender: EmailSender = Depends(Stub(EmailSender)),
+        email_sender: MailSender = Depends(Stub(EmailSender)),
         redis_conn: RedisT = Depends(Stub(Redis)),  # type:ignore
+        password_hasher: PasswordHasher = Depends(Stub(PasswordHasher)),
+        schedule_cache: ScheduleCache = Depends(Stub(ScheduleCache)),
 ) -> StudentService:
-    yield StudentService(
+    return StudentService(
         student_repository,
         user_repository,
         class_repository,
         email_sender,
-        redis_conn
+        redis_conn,
+        password_hasher,
+        schedule_cache,
     )
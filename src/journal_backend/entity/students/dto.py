@@ -1,12 +1,16 @@
 from dataclasses import dataclass
 from datetime import date, datetime
-from typing import Any, Optional
+from typing import Any, Iterable, Optional, Sequence
 
 from pydantic import EmailStr
 
 from journal_backend.entity.classes.dto import ClassRead, to_read_dto
 from journal_backend.entity.students.enums import Graduation
-from journal_backend.entity.students.models import AcademicReport, Student
+from journal_backend.entity.students.models import (
+    AcademicAggregate,
+    AcademicReport,
+    Student,
+)
 
 
 @dataclass
@@ -99,3 +103,90 @@ def build_academic_reports_response(
             class_=to_read_dto(class_=report.class_),
         ))
     return resp
+
+
+@dataclass(frozen=True, kw_only=True)
+class AcademicAggregateRead:
+    student_id: int
+    subject_id: int
+    subject: str
+    term: int
+    reports_count: int
+    attended_count: int
+    graded_count: int
+    average_grade: Optional[float] = None
+    attendance_rate: Optional[float] = None
+
+
+def aggregate_to_read_dto(aggregate: AcademicAggregate, subject: str) -> AcademicAggregateRead:
+    return AcademicAggregateRead(
+        student_id=aggregate.student_id,
+        subject_id=aggregate.subject_id,
+        subject=subject,
+        term=aggregate.term,
+        reports_count=aggregate.reports_count,
+        attended_count=aggregate.attended_count,
+        graded_count=aggregate.graded_count,
+        average_grade=(
+            aggregate.grade_sum / aggregate.graded_count if aggregate.graded_count else None
+        ),
+        attendance_rate=(
+            aggregate.attended_count / aggregate.reports_count
+            if aggregate.reports_count else None
+        ),
+    )
+
+
+@dataclass(frozen=True)
+class GradebookStudent:
+    id: int
+    surname: str
+    name: str
+
+
+@dataclass(frozen=True)
+class GradebookClass:
+    id: int
+    starts_at: datetime
+    subject: Optional[str] = None
+
+
+@dataclass(frozen=True, kw_only=True)
+class Gradebook:
+    """Represent the reports of a group as a students x classes matrix.
+
+    `grades[i][j]` is the grade value of `students[i]` for `classes[j]` and
+    `attendance[i][j]` whether they attended it, both null without a report.
+    """
+    students: list[GradebookStudent]
+    classes: list[GradebookClass]
+    grades: list[list[Optional[int]]]
+    attendance: list[list[Optional[bool]]]
+
+
+def build_gradebook(rows: Iterable[Sequence[Any]]) -> Gradebook:
+    """Fold the rows of `StudentRepository.get_gradebook_rows` into a matrix."""
+    students: dict[int, GradebookStudent] = {}
+    classes: dict[int, GradebookClass] = {}
+    cells: dict[tuple[int, int], tuple[Optional[bool], Optional[Graduation]]] = {}
+    for student_id, surname, name, class_id, starts_at, subject, is_attended, grade in rows:
+        students.setdefault(student_id, GradebookStudent(student_id, surname, name))
+        if class_id is None:
+            continue
+        classes.setdefault(class_id, GradebookClass(class_id, starts_at, subject))
+        if is_attended is not None:
+            cells[student_id, class_id] = (is_attended, grade)
+
+    columns = sorted(classes.values(), key=lambda class_: (class_.starts_at, class_.id))
+    grades = []
+    attendance = []
+    for student_id in students:
+        row = [cells.get((student_id, class_.id), (None, None)) for class_ in columns]
+        grades.append([grade.value if grade is not None else None for _, grade in row])
+        attendance.append([is_attended for is_attended, _ in row])
+    return Gradebook(
+        students=list(students.values()),
+        classes=columns,
+        grades=grades,
+        attendance=attendance,
+    )
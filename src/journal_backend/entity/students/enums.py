@@ -1,4 +1,4 @@
-from enum import IntEnum
+from enum import IntEnum, StrEnum
 
 
 class Graduation(IntEnum):
@@ -8,3 +8,8 @@ class Graduation(IntEnum):
     SATISFACTORILY = 3
     GOOD = 4
     EXCELLENT = 5
+
+
+class ExportFormat(StrEnum):
+    CSV = "csv"
+    NDJSON = "ndjson"
@@ -0,0 +1,121 @@
+"""Contain the streaming export of academic reports.
+
+The rows are fetched through a server-side cursor and sent chunk by chunk,
+so an export of any size holds one chunk in memory. The columns of
+`ACADEMIC_REPORTS` in the bulk import are among the exported ones.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, AsyncGenerator, Iterable, Optional, Sequence
+
+import anyio
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from journal_backend.database.routing import READ_ONLY
+from journal_backend.entity.classes.models import Class
+from journal_backend.entity.students.enums import ExportFormat
+from journal_backend.entity.students.models import (
+    AcademicReport,
+    Group,
+    Student,
+)
+from journal_backend.entity.teachers.models import Subject
+from journal_backend.entity.users.models import UserIdentity
+
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_COLUMNS = (
+    "student_id",
+    "surname",
+    "name",
+    "group",
+    "class_id",
+    "starts_at",
+    "subject",
+    "is_attended",
+    "grade",
+)
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+    ExportFormat.NDJSON: "application/x-ndjson",
+}
+
+
+def academic_reports_export(group_id: Optional[int] = None) -> Select[Any]:
+    """Select the reports of the students of a group, or of every student.
+
+    The rows come in the order of the (student_id, class_id) unique index,
+    so the database doesn't have to sort them before sending the first one.
+    """
+    stmt = (
+        select(
+            AcademicReport.student_id,
+            UserIdentity.surname,
+            UserIdentity.name,
+            Group.name,
+            AcademicReport.class_id,
+            Class.starts_at,
+            Subject.name,
+            AcademicReport.is_attended,
+            AcademicReport.grade,
+        ).
+        join(Student, onclause=Student.id == AcademicReport.student_id).
+        join(UserIdentity, onclause=UserIdentity.id == Student.id).
+        outerjoin(Group, onclause=Group.id == Student.group_id).
+        join(Class, onclause=Class.id == AcademicReport.class_id).
+        outerjoin(Subject, onclause=Subject.id == Class.subject_id).
+        order_by(AcademicReport.student_id, AcademicReport.class_id)
+    )
+    if group_id is not None:
+        stmt = stmt.where(Student.group_id == group_id)
+    return stmt
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def encode_csv(rows: Iterable[Sequence[Any]]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(map(_plain, row) for row in rows)
+    return buffer.getvalue()
+
+
+def encode_ndjson(rows: Iterable[Sequence[Any]]) -> str:
+    return "".join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, map(_plain, row))), ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+
+async def stream_academic_reports(
+        session_factory: async_sessionmaker[AsyncSession],
+        stmt: Select[Any],
+        fmt: ExportFormat,
+) -> AsyncGenerator[str, None]:
+    """Encode the selected reports chunk by chunk.
+
+    The export has its own session, the one of the request is closed
+    before the response starts.
+    """
+    encode = encode_csv if fmt == ExportFormat.CSV else encode_ndjson
+    session = session_factory()
+    session.info[READ_ONLY] = True
+    try:
+        result = await session.stream(stmt.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+        if fmt == ExportFormat.CSV:
+            yield encode_csv([EXPORT_COLUMNS])
+        async for rows in result.partitions():
+            yield encode(rows)
+    finally:
+        # Closing the session ends the transaction and the cursor with it,
+        # also when the response is cancelled because the client left
+        with anyio.CancelScope(shield=True):
+            await session.close()
@@ -0,0 +1,25 @@
+"""Contain the loading profiles of students and academic reports."""
+from sqlalchemy.orm import contains_eager, joinedload, load_only, raiseload
+
+from journal_backend.entity.classes.loading import CLASS_CARD
+from journal_backend.entity.students.models import AcademicReport, Student
+from journal_backend.entity.users.models import UserIdentity
+
+# What `students.dto.model_to_read_dto` reads
+STUDENT_CARD = (
+    joinedload(Student.identity, innerjoin=True),
+    joinedload(Student.group),
+    raiseload("*"),
+)
+
+# What `students.dto.build_academic_reports_response` reads. The query
+# must join `Class` itself, it is reused to load `AcademicReport.class_`.
+REPORT_VIEW = (
+    joinedload(AcademicReport.student, innerjoin=True).options(
+        load_only(Student.id, raiseload=True),
+        joinedload(Student.identity, innerjoin=True).load_only(UserIdentity.name, raiseload=True),
+        raiseload("*"),
+    ),
+    contains_eager(AcademicReport.class_).options(*CLASS_CARD),
+    raiseload("*"),
+)
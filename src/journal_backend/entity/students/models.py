@@ -1,10 +1,11 @@
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import ForeignKey, PrimaryKeyConstraint
+from sqlalchemy import ForeignKey, Index, PrimaryKeyConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from starlette.requests import Request
 
 from journal_backend.database.base import Base
+from journal_backend.database.mixins import TimestampColumnsMixin
 from journal_backend.entity.students.enums import Graduation
 from journal_backend.entity.users.models import UserIdentity
 
@@ -12,7 +13,7 @@ if TYPE_CHECKING:
     from journal_backend.entity.classes.models import Class
 
 
-class Student(Base):  # type: ignore[misc]
+class Student(TimestampColumnsMixin, Base):  # type: ignore[misc]
     __tablename__ = "students"
 
     id: Mapped[int] = mapped_column(
@@ -21,10 +22,15 @@ class Student(Base):  # type: ignore[misc]
     )
     group_id: Mapped[Optional[int]] = mapped_column(ForeignKey("groups.id", ondelete="SET NULL"))
 
-    identity: Mapped["UserIdentity"] = relationship(lazy="joined")
-    group: Mapped["Group"] = relationship(back_populates="students", lazy="joined")
+    identity: Mapped["UserIdentity"] = relationship(lazy="raise_on_sql")
+    group: Mapped["Group"] = relationship(back_populates="students", lazy="raise_on_sql")
     academic_reports: Mapped[list["AcademicReport"]] = relationship(back_populates='student')
 
+    __table_args__ = (
+        # Group rosters seek on the id within the group
+        Index("ix_students_group_id_id", "group_id", "id"),
+    )
+
     async def __admin_repr__(self, _: Request) -> str:
         return f"{self.identity.surname} {self.identity.name}"
 
@@ -32,7 +38,7 @@ class Student(Base):  # type: ignore[misc]
         return f"<div>{self.identity.surname} {self.identity.name}</div>"
 
 
-class Group(Base):  # type: ignore[misc]
+class Group(TimestampColumnsMixin, Base):  # type: ignore[misc]
     __tablename__ = "groups"
 
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -49,7 +55,7 @@ class Group(Base):  # type: ignore[misc]
         return f"{self.name}"
 
 
-class AcademicReport(Base):  # type: ignore[misc]
+class AcademicReport(TimestampColumnsMixin, Base):  # type: ignore[misc]
     __tablename__ = "academic_reports"
 
     student_id: Mapped[int] = mapped_column(ForeignKey("students.id", ondelete="NO ACTION"))
@@ -60,14 +66,37 @@ class AcademicReport(Base):  # type: ignore[misc]
     student: Mapped["Student"] = relationship(
         back_populates='academic_reports',
         cascade="save-update",
-        lazy='joined',
+        lazy="raise_on_sql",
     )
     class_: Mapped["Class"] = relationship(
         back_populates='academic_reports',
         cascade="save-update",
-        lazy='joined'
+        lazy="raise_on_sql"
     )
 
     __table_args__ = (
         PrimaryKeyConstraint("student_id", "class_id"),
+        # The primary key serves the lookups by student, this one the ones by class
+        Index("ix_academic_reports_class_id", "class_id"),
+    )
+
+
+class AcademicAggregate(Base):  # type: ignore[misc]
+    """Represent the sums of the reports of a student for a subject in a term.
+
+    Kept up to date with the reports, see `students/aggregates.py`.
+    """
+    __tablename__ = "academic_aggregates"
+
+    student_id: Mapped[int] = mapped_column(ForeignKey("students.id", ondelete="CASCADE"))
+    subject_id: Mapped[int] = mapped_column(ForeignKey("subjects.id", ondelete="CASCADE"))
+    # E.g. 20241 for the autumn term of 2024/25, 20242 for its spring term
+    term: Mapped[int] = mapped_column()
+    reports_count: Mapped[int] = mapped_column(default=0)
+    attended_count: Mapped[int] = mapped_column(default=0)
+    graded_count: Mapped[int] = mapped_column(default=0)
+    grade_sum: Mapped[int] = mapped_column(default=0)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("student_id", "subject_id", "term"),
     )
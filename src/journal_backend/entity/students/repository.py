@@ -1,17 +1,78 @@
-from datetime import date
-from typing import Any, Sequence
+from datetime import date, timedelta
+from typing import Any, Optional, Sequence
 
-from sqlalchemy import func, select
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import (
+    Integer,
+    and_,
+    any_,
+    bindparam,
+    column,
+    delete,
+    exists,
+    func,
+    lambda_stmt,
+    or_,
+    select,
+    table,
+    text,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
-from journal_backend.entity.classes.models import Class
+from journal_backend.entity.classes.models import Class, Classroom
+from journal_backend.entity.common.conditional import ResourceVersion
+from journal_backend.entity.common.pagination import (
+    Cursor,
+    Page,
+    paginate,
+    seek,
+)
+from journal_backend.entity.students.aggregates import (
+    AGGREGATES_LOCK,
+    AggregateDelta,
+    AggregateKey,
+    aggregate_deltas,
+    grade_value_expr,
+    term_expr,
+)
 from journal_backend.entity.students.dto import AcademicReportCreate
+from journal_backend.entity.students.loading import REPORT_VIEW, STUDENT_CARD
 from journal_backend.entity.students.models import (
+    AcademicAggregate,
     AcademicReport,
     Group,
     Student,
 )
+from journal_backend.entity.teachers.models import Subject
+from journal_backend.entity.users.models import UserIdentity
+
+# Batches of reports from this size on are sent with COPY
+COPY_THRESHOLD = 5000
+REPORTS_BATCH_TABLE = "academic_reports_batch"
+REPORTS_BATCH_COLUMNS = ["student_id", "class_id", "is_attended", "grade"]
+AGGREGATE_KEY = [
+    AcademicAggregate.student_id,
+    AcademicAggregate.subject_id,
+    AcademicAggregate.term,
+]
+AGGREGATE_COUNTS = ["reports_count", "attended_count", "graded_count", "grade_sum"]
+# The types of the key the students of a group are paginated by
+STUDENT_PAGE_KEY = (int,)
+
+# The names shown next to the reports come from the identities of both
+StudentIdentity = aliased(UserIdentity)
+TeacherIdentity = aliased(UserIdentity)
+
+# The advisory locks are taken in the order of the ids, so writers don't deadlock
+LOCK_STUDENTS = text(
+    "SELECT pg_advisory_xact_lock(:namespace, id) "
+    "FROM (SELECT DISTINCT unnest(CAST(:student_ids AS integer[])) AS id ORDER BY id) AS ids"
+).bindparams(
+    bindparam("namespace", AGGREGATES_LOCK),
+    bindparam("student_ids", type_=ARRAY(Integer)),
+)
 
 
 class StudentRepository:
@@ -29,15 +90,45 @@ class StudentRepository:
         return student
 
     async def get_by_id(self, student_id: int) -> Student:
-        stmt = select(Student).where(Student.id == student_id)
-        student = await self.session.scalar(stmt)
+        stmt = lambda_stmt(
+            lambda: select(Student).options(*STUDENT_CARD).where(Student.id == student_id)
+        )
+        student: Student = await self.session.scalar(stmt)
         return student
 
+    async def get_version(self, student_id: int) -> Optional[ResourceVersion]:
+        """Return the version of the student's card, None when there is no student."""
+        stmt = lambda_stmt(
+            lambda: select(
+                func.greatest(Student.updated_on, UserIdentity.updated_on, Group.updated_on)
+            ).
+            join(UserIdentity, UserIdentity.id == Student.id).
+            outerjoin(Group, Group.id == Student.group_id).
+            where(Student.id == student_id)
+        )
+        last_modified = await self.session.scalar(stmt)
+        if last_modified is None:
+            return None
+        return ResourceVersion.of_rows(last_modified)
+
+    async def exists(self, student_id: int) -> bool:
+        stmt = lambda_stmt(lambda: select(exists().where(Student.id == student_id)))
+        return bool(await self.session.scalar(stmt))
+
+    async def get_group_id(self, student_id: int) -> Optional[int]:
+        stmt = lambda_stmt(lambda: select(Student.group_id).where(Student.id == student_id))
+        group_id: Optional[int] = await self.session.scalar(stmt)
+        return group_id
+
     async def get_group_by_name(self, name: str) -> Group:
         stmt = select(Group).where(Group.name == name)
         group = await self.session.scalar(stmt)
         return group
 
+    async def group_exists(self, group_id: int) -> bool:
+        stmt = lambda_stmt(lambda: select(exists().where(Group.id == group_id)))
+        return bool(await self.session.scalar(stmt))
+
     async def get_group_by_id(self, id_: int) -> Group:
         stmt = select(Group).where(Group.id == id_)
         group = await self.session.scalar(stmt)
@@ -49,56 +140,366 @@ class StudentRepository:
             d_left: date,
             d_right: date
     ) -> Sequence[AcademicReport]:
-        stmt = (
-            select(AcademicReport).
+        stmt = lambda_stmt(
+            lambda: select(AcademicReport).
             join(Class, onclause=Class.id == AcademicReport.class_id).
+            options(*REPORT_VIEW).
             where(AcademicReport.student_id == student_id).
-            where(Class.starts_at.between(d_left, d_right))
+            where(Class.starts_at >= d_left).
+            where(Class.starts_at < d_right)
         )
 
         res = await self.session.scalars(stmt)
-        return res.unique().all()
-
-    async def create_academic_reports(self, reports: list[AcademicReportCreate]) -> None:
-        for report in reports:
-            insert_stmt = (
-                insert(AcademicReport).
-                values(**report.__dict__).
-                on_conflict_do_update(
+        return res.all()
+
+    async def get_academic_reports_version(
+            self,
+            student_id: int,
+            d_left: date,
+            d_right: date
+    ) -> ResourceVersion:
+        """Return the version of what `get_academic_reports` returns.
+
+        Renaming the student, the group, the subject, the classroom or the
+        teacher of a class changes the reports too.
+        """
+        stmt = lambda_stmt(
+            lambda: select(
+                func.max(
+                    func.greatest(
+                        AcademicReport.updated_on,
+                        Class.updated_on,
+                        StudentIdentity.updated_on,
+                        Group.updated_on,
+                        Subject.updated_on,
+                        Classroom.updated_on,
+                        TeacherIdentity.updated_on,
+                    )
+                ),
+                func.count(),
+            ).
+            join(Class, onclause=Class.id == AcademicReport.class_id).
+            join(StudentIdentity, onclause=StudentIdentity.id == AcademicReport.student_id).
+            join(Group, onclause=Group.id == Class.group_id).
+            outerjoin(Subject, onclause=Subject.id == Class.subject_id).
+            outerjoin(Classroom, onclause=Classroom.id == Class.classroom_id).
+            outerjoin(TeacherIdentity, onclause=TeacherIdentity.id == Class.teacher_id).
+            where(AcademicReport.student_id == student_id).
+            where(Class.starts_at >= d_left).
+            where(Class.starts_at < d_right)
+        )
+        last_modified, count = (await self.session.execute(stmt)).one()
+        return ResourceVersion.of_rows(last_modified, count)
+
+    async def find_invalid_reports(
+            self,
+            reports: Sequence[AcademicReportCreate],
+    ) -> list[tuple[int, int, bool]]:
+        """Return `(student_id, class_id, student_exists)` of the reports that can't be saved.
+
+        A report can't be saved when its student doesn't exist or its class
+        is not one of the student's group.
+        """
+        batch = _batch_keys(reports)
+        stmt = (
+            select(batch.c.student_id, batch.c.class_id, Student.id.is_not(None)).
+            select_from(batch).
+            outerjoin(Student, Student.id == batch.c.student_id).
+            outerjoin(
+                Class,
+                and_(Class.id == batch.c.class_id, Class.group_id == Student.group_id),
+            ).
+            where(or_(Student.id.is_(None), Class.id.is_(None)))
+        )
+        res = await self.session.execute(stmt)
+        return [(row[0], row[1], row[2]) for row in res.all()]
+
+    async def create_academic_reports(self, reports: Sequence[AcademicReportCreate]) -> None:
+        """Upsert the reports and update their aggregates in one transaction.
+
+        The reports must have distinct `(student_id, class_id)`, a row can't be
+        updated twice by one statement.
+        """
+        # The other writers of the students' reports wait for the commit, so
+        # the reports replaced are the ones read here
+        await self.session.execute(
+            LOCK_STUDENTS,
+            {"student_ids": [report.student_id for report in reports]},
+        )
+        old_reports = await self.get_saved_reports(reports)
+        class_terms = await self.get_class_terms([report.class_id for report in reports])
+
+        if len(reports) >= COPY_THRESHOLD:
+            await self._copy_academic_reports(reports)
+        else:
+            insert_stmt = insert(AcademicReport).values(
+                [report.__dict__ for report in reports]
+            )
+            await self.session.execute(
+                insert_stmt.on_conflict_do_update(
                     index_elements=[AcademicReport.student_id, AcademicReport.class_id],
-                    set_={'grade': report.grade, 'is_attended': report.is_attended}
+                    set_={
+                        "grade": insert_stmt.excluded.grade,
+                        "is_attended": insert_stmt.excluded.is_attended,
+                        "updated_on": func.now(),
+                    },
                 )
             )
-            await self.session.execute(insert_stmt)
+        await self.apply_aggregate_deltas(aggregate_deltas(old_reports, reports, class_terms))
         await self.session.commit()
 
-    async def get_students_by_group_id(
+    async def _copy_academic_reports(self, reports: Sequence[AcademicReportCreate]) -> None:
+        # COPY streams the rows without binding parameters (a statement can
+        # bind at most 32767), then a single statement merges them
+        conn = await self.session.connection()
+        await conn.execute(text(
+            f"CREATE TEMP TABLE {REPORTS_BATCH_TABLE} "
+            "(LIKE academic_reports INCLUDING DEFAULTS) ON COMMIT DROP"
+        ))
+        raw_conn = await conn.get_raw_connection()
+        asyncpg_conn: Any = raw_conn.driver_connection
+        await asyncpg_conn.copy_records_to_table(
+            REPORTS_BATCH_TABLE,
+            columns=REPORTS_BATCH_COLUMNS,
+            records=[
+                (
+                    report.student_id,
+                    report.class_id,
+                    report.is_attended,
+                    report.grade.name if report.grade is not None else None,
+                )
+                for report in reports
+            ],
+        )
+
+        batch = table(REPORTS_BATCH_TABLE, *(column(name) for name in REPORTS_BATCH_COLUMNS))
+        insert_stmt = insert(AcademicReport).from_select(REPORTS_BATCH_COLUMNS, select(batch))
+        await conn.execute(
+            insert_stmt.on_conflict_do_update(
+                index_elements=[AcademicReport.student_id, AcademicReport.class_id],
+                set_={
+                    "grade": insert_stmt.excluded.grade,
+                    "is_attended": insert_stmt.excluded.is_attended,
+                    "updated_on": func.now(),
+                },
+            )
+        )
+
+    async def get_saved_reports(
             self,
-            group_id: int,
-            limit: int,
-            offset: int
-    ) -> tuple[list[Student], int]:
-        group_students_rows = (
+            reports: Sequence[AcademicReportCreate],
+    ) -> list[AcademicReportCreate]:
+        """Return the saved versions of the reports."""
+        batch = _batch_keys(reports)
+        stmt = (
+            select(
+                AcademicReport.student_id,
+                AcademicReport.class_id,
+                AcademicReport.is_attended,
+                AcademicReport.grade,
+            ).
+            join(
+                batch,
+                and_(
+                    AcademicReport.student_id == batch.c.student_id,
+                    AcademicReport.class_id == batch.c.class_id,
+                ),
+            )
+        )
+        res = await self.session.execute(stmt)
+        return [AcademicReportCreate(*row) for row in res.all()]
+
+    async def get_class_terms(
+            self,
+            class_ids: Sequence[int],
+    ) -> dict[int, tuple[Optional[int], int]]:
+        """Return the `(subject_id, term)` of the classes by their ids."""
+        ids = bindparam("class_ids", list(set(class_ids)), type_=ARRAY(Integer))
+        stmt = (
+            select(Class.id, Class.subject_id, term_expr(Class.starts_at)).
+            where(Class.id == any_(ids))
+        )
+        res = await self.session.execute(stmt)
+        return {row[0]: (row[1], row[2]) for row in res.all()}
+
+    async def apply_aggregate_deltas(self, deltas: dict[AggregateKey, AggregateDelta]) -> None:
+        if not deltas:
+            return
+        insert_stmt = insert(AcademicAggregate)
+        await self.session.execute(
+            insert_stmt.on_conflict_do_update(
+                index_elements=AGGREGATE_KEY,
+                set_={
+                    name: getattr(AcademicAggregate, name) + getattr(insert_stmt.excluded, name)
+                    for name in AGGREGATE_COUNTS
+                },
+            ),
+            [
+                {"student_id": student_id, "subject_id": subject_id, "term": term,
+                 **delta.__dict__}
+                for (student_id, subject_id, term), delta in sorted(deltas.items())
+            ],
+        )
+
+    async def get_student_ids(self, after: int, limit: int) -> list[int]:
+        stmt = select(Student.id).where(Student.id > after).order_by(Student.id).limit(limit)
+        res = await self.session.scalars(stmt)
+        return list(res.all())
+
+    async def recompute_academic_aggregates(self, student_ids: Sequence[int]) -> int:
+        """Recompute the aggregates of the students from their reports and commit.
+
+        Returns:
+            int: The amount of aggregates that were wrong.
+        """
+        await self.session.execute(LOCK_STUDENTS, {"student_ids": list(student_ids)})
+
+        ids = bindparam("student_ids", list(student_ids), type_=ARRAY(Integer))
+        term = term_expr(Class.starts_at)
+        fresh_stmt = (
             select(
-                func.row_number().over(order_by=Student.id).label('id_in_group'),  # type:ignore
-                Student.id
+                AcademicReport.student_id,
+                Class.subject_id,
+                term,
+                func.count(),
+                func.count().filter(AcademicReport.is_attended),  # type:ignore[no-untyped-call]
+                func.count(AcademicReport.grade),
+                func.coalesce(func.sum(grade_value_expr(AcademicReport.grade)), 0),
             ).
-            where(Student.group_id == group_id).cte()
+            join(Class, onclause=Class.id == AcademicReport.class_id).
+            where(AcademicReport.student_id == any_(ids)).
+            where(Class.subject_id.is_not(None)).
+            group_by(AcademicReport.student_id, Class.subject_id, term)
+        )
+        saved_stmt = (
+            select(*AGGREGATE_KEY, *(getattr(AcademicAggregate, n) for n in AGGREGATE_COUNTS)).
+            where(AcademicAggregate.student_id == any_(ids))
+        )
+        fresh = {tuple(row[:3]): tuple(row[3:]) for row in await self.session.execute(fresh_stmt)}
+        saved = {tuple(row[:3]): tuple(row[3:]) for row in await self.session.execute(saved_stmt)}
+
+        wrong = [key for key, counts in fresh.items() if saved.get(key) != counts]
+        stale = [key for key in saved if key not in fresh]
+        if wrong:
+            insert_stmt = insert(AcademicAggregate)
+            await self.session.execute(
+                insert_stmt.on_conflict_do_update(
+                    index_elements=AGGREGATE_KEY,
+                    set_={name: getattr(insert_stmt.excluded, name) for name in AGGREGATE_COUNTS},
+                ),
+                [
+                    dict(zip(["student_id", "subject_id", "term", *AGGREGATE_COUNTS],
+                             key + fresh[key]))
+                    for key in wrong
+                ],
+            )
+        if stale:
+            await self.session.execute(
+                delete(AcademicAggregate).where(tuple_(*AGGREGATE_KEY).in_(stale))
+            )
+        await self.session.commit()
+        return len(wrong) + len(stale)
+
+    async def get_academic_aggregates(
+            self,
+            student_id: Optional[int] = None,
+            group_id: Optional[int] = None,
+            term: Optional[int] = None,
+    ) -> Sequence[Any]:
+        """Return the aggregates of a student or of a group, with the subject names."""
+        stmt = (
+            select(AcademicAggregate, Subject.name).
+            join(Subject, onclause=Subject.id == AcademicAggregate.subject_id).
+            order_by(*AGGREGATE_KEY)
+        )
+        if student_id is not None:
+            stmt = stmt.where(AcademicAggregate.student_id == student_id)
+        if group_id is not None:
+            stmt = (
+                stmt.join(Student, onclause=Student.id == AcademicAggregate.student_id).
+                where(Student.group_id == group_id)
+            )
+        if term is not None:
+            stmt = stmt.where(AcademicAggregate.term == term)
+        res = await self.session.execute(stmt)
+        return res.all()
+
+    async def get_gradebook_rows(
+            self,
+            group_id: int,
+            d_left: date,
+            d_right: date,
+            subject_id: Optional[int] = None,
+    ) -> Sequence[Any]:
+        """Return a row per student of the group and class of the group between the days.
+
+        The rows are `(student_id, surname, name, class_id, starts_at, subject,
+        is_attended, grade)`, the class columns are null for a student when the
+        group has no classes, the report ones when there is no report.
+        """
+        class_filter = and_(
+            Class.group_id == Student.group_id,
+            Class.starts_at >= d_left,
+            Class.starts_at < d_right + timedelta(days=1),
         )
+        if subject_id is not None:
+            class_filter = and_(class_filter, Class.subject_id == subject_id)
         stmt = (
-            select(Student).
-            add_cte(group_students_rows).
-            join(group_students_rows, onclause=Student.id == group_students_rows.c.id).
-            where(group_students_rows.c.id_in_group > offset).
-            limit(limit)
+            select(
+                Student.id,
+                UserIdentity.surname,
+                UserIdentity.name,
+                Class.id,
+                Class.starts_at,
+                Subject.name,
+                AcademicReport.is_attended,
+                AcademicReport.grade,
+            ).
+            join(UserIdentity, onclause=UserIdentity.id == Student.id).
+            outerjoin(Class, onclause=class_filter).
+            outerjoin(Subject, onclause=Subject.id == Class.subject_id).
+            outerjoin(
+                AcademicReport,
+                onclause=and_(
+                    AcademicReport.student_id == Student.id,
+                    AcademicReport.class_id == Class.id,
+                ),
+            ).
+            where(Student.group_id == group_id).
+            order_by(UserIdentity.surname, UserIdentity.name, Student.id)
+        )
+        res = await self.session.execute(stmt)
+        return res.all()
+
+    async def get_students_by_group_id(
+            self,
+            group_id: int,
+            limit: int,
+            cursor: Optional[Cursor],
+    ) -> Page[Student]:
+        stmt = seek(
+            select(Student).options(*STUDENT_CARD).where(Student.group_id == group_id),
+            [Student.id],
+            cursor,
+            limit,
         )
         res = await self.session.scalars(stmt)
+        return paginate(res.all(), lambda student: (student.id,), cursor, limit)
 
-        students = list(res.all())
-        total_in_group = await self.session.scalar(
-            select(func.count(group_students_rows.c.id)).add_cte(group_students_rows)
+    async def count_students_in_group(self, group_id: int) -> int:
+        stmt = lambda_stmt(
+            lambda: select(func.count()).select_from(Student).where(Student.group_id == group_id)
         )
-        if not total_in_group:
-            total_in_group = 0
+        total_in_group: int = await self.session.scalar(stmt)
+        return total_in_group
+
 
-        return students, total_in_group
+def _batch_keys(reports: Sequence[AcademicReportCreate]) -> Any:
+    # The batch is passed as two arrays, so the statement is the same whatever its size
+    return func.unnest(  # type:ignore[no-untyped-call]
+        bindparam("student_ids", [r.student_id for r in reports], type_=ARRAY(Integer)),
+        bindparam("class_ids", [r.class_id for r in reports], type_=ARRAY(Integer)),
+    ).table_valued(
+        column("student_id", Integer),
+        column("class_id", Integer),
+    ).render_derived(name="batch")
@@ -1,37 +1,88 @@
-from typing import Literal
+from datetime import date
+from typing import Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from starlette import status
 
 from journal_backend.config import Config
+from journal_backend.database.routes import SessionReleasingRoute
 from journal_backend.depends_stub import Stub
-from journal_backend.entity.classes.dto import (
-    DailySchedule,
-    build_schedule_response,
-)
+from journal_backend.entity.classes.dto import DailySchedule
 from journal_backend.entity.classes.exceptions import ClassNotFound
+from journal_backend.entity.common.conditional import (
+    ResourceVersion,
+    check_not_modified,
+)
+from journal_backend.entity.common.date_range import (
+    DateRange,
+    PeriodQuery,
+    period_query,
+)
+from journal_backend.entity.common.exceptions import (
+    InvalidCursor,
+    InvalidDateRange,
+    PasswordHasherOverloaded,
+)
+from journal_backend.entity.common.job_queue import JobQueue
 from journal_backend.entity.common.pagination import (
+    MAX_PAGE_SIZE,
+    CursorPaginationResponse,
     PaginationResponse,
-    generate_pagination_response,
+    decode_cursor,
+    generate_cursor_pagination_response,
+    pagination_json_response,
 )
+from journal_backend.entity.common.streaming import ClosingStreamingResponse
 from journal_backend.entity.students import exceptions
 from journal_backend.entity.students.dto import (
+    AcademicAggregateRead,
     AcademicReportCreate,
     AcademicReportRead,
     AuthResponse,
+    Gradebook,
     Group,
     StudentCreate,
     StudentRead,
+    aggregate_to_read_dto,
     build_academic_reports_response,
+    build_gradebook,
     model_to_read_dto,
 )
+from journal_backend.entity.students.enums import ExportFormat
+from journal_backend.entity.students.export import (
+    EXPORT_MEDIA_TYPES,
+    stream_academic_reports,
+)
+from journal_backend.entity.students.repository import STUDENT_PAGE_KEY
 from journal_backend.entity.students.service import StudentService
+from journal_backend.entity.students.verification import (
+    VERIFY_AGGREGATES_JOB,
+    verify_academic_aggregates,
+)
 from journal_backend.entity.users import exceptions as u_exceptions
 from journal_backend.entity.users.dependencies import current_user
-from journal_backend.entity.users.models import UserIdentity
+from journal_backend.entity.users.dto import Principal
+from journal_backend.entity.users.enums import Role
 
-router = APIRouter(prefix="/students", tags=["students"])
-groups_router = APIRouter(prefix="/groups", tags=["students", "groups"])
+router = APIRouter(
+    prefix="/students",
+    tags=["students"],
+    route_class=SessionReleasingRoute,
+)
+groups_router = APIRouter(
+    prefix="/groups",
+    tags=["students", "groups"],
+    route_class=SessionReleasingRoute,
+)
 
 
 @router.post("")
@@ -56,6 +107,11 @@ async def register(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except PasswordHasherOverloaded as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -70,13 +126,17 @@ async def register(
 @router.get("/{student_id}")
 async def retrieve_student(
         student_id: int | Literal["me"],
-        caller: UserIdentity = Depends(current_user),
+        request: Request,
+        response: Response,
+        caller: Principal = Depends(current_user),
         student_service: StudentService = Depends(Stub(StudentService))
 ) -> StudentRead:
     if student_id == "me":
         student_id = caller.id
 
     try:
+        version = await student_service.get_version_by_id(student_id, caller)
+        check_not_modified(request, version)
         student = await student_service.get_by_id(student_id, caller)
     except exceptions.StudentNotFound as e:
         raise HTTPException(
@@ -89,59 +149,136 @@ async def retrieve_student(
             detail=str(e),
         )
 
+    response.headers.update(version.headers)
     return model_to_read_dto(student)
 
 
-@router.get("/{student_id}/schedule")
+@router.get(
+    "/{student_id}/schedule",
+    response_model=PaginationResponse[DailySchedule],
+)
 async def get_student_weekly_schedule(
         student_id: int | Literal["me"],
-        offset: int = 0,
-        caller: UserIdentity = Depends(current_user),
+        request: Request,
+        query: PeriodQuery = Depends(period_query),
+        caller: Principal = Depends(current_user),
         student_service: StudentService = Depends(Stub(StudentService))
-) -> PaginationResponse[DailySchedule]:
+) -> Response:
     try:
-        classes_by_days = await student_service.get_schedule_by_id(student_id, offset, caller)
+        days = await student_service.get_schedule_by_id(student_id, query.period, caller)
+    except InvalidDateRange as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except exceptions.StudentPermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
     except exceptions.StudentNotFound as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
         )
 
+    version = ResourceVersion.of_content(days)
+    check_not_modified(request, version)
+
     uri_prefix = f"{router.prefix}/{student_id}/schedule"
-    return PaginationResponse(
-        next_url=f"{uri_prefix}?offset={offset + 1}",
-        prev_url=f"{uri_prefix}?offset={offset - 1}",
-        data=build_schedule_response(classes_by_days),
-    )
+    response: Response = pagination_json_response(*query.page_urls(uri_prefix), days)
+    response.headers.update(version.headers)
+    return response
 
 
 @router.get("/{student_id}/academic_reports")
 async def get_student_academic_reports(
         student_id: int | Literal["me"],
-        offset: int = 0,
-        caller: UserIdentity = Depends(current_user),
+        request: Request,
+        response: Response,
+        query: PeriodQuery = Depends(period_query),
+        caller: Principal = Depends(current_user),
         student_service: StudentService = Depends(Stub(StudentService))
 ) -> PaginationResponse[AcademicReportRead]:
     try:
-        reports = await student_service.get_academic_reports_by_id(student_id, offset, caller)
+        version = await student_service.get_academic_reports_version(
+            student_id, query.period, caller
+        )
+        check_not_modified(request, version)
+        reports = await student_service.get_academic_reports_by_id(
+            student_id, query.period, caller
+        )
+    except InvalidDateRange as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except exceptions.StudentPermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
     except exceptions.StudentNotFound as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
         )
 
+    response.headers.update(version.headers)
     uri_prefix = f"{router.prefix}/{student_id}/academic_reports"
+    next_url, prev_url = query.page_urls(uri_prefix)
     return PaginationResponse(
-        next_url=f"{uri_prefix}?offset={offset + 1}",
-        prev_url=f"{uri_prefix}?offset={offset - 1}",
+        next_url=next_url,
+        prev_url=prev_url,
         data=build_academic_reports_response(reports),
     )
 
 
+@router.get("/{student_id}/academic_aggregates")
+async def get_student_academic_aggregates(
+        student_id: int | Literal["me"],
+        term: Optional[int] = None,
+        caller: Principal = Depends(current_user),
+        student_service: StudentService = Depends(Stub(StudentService))
+) -> list[AcademicAggregateRead]:
+    try:
+        aggregates = await student_service.get_academic_aggregates_by_id(student_id, term, caller)
+    except exceptions.StudentPermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    except exceptions.StudentNotFound as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+
+    return [aggregate_to_read_dto(aggregate, subject) for aggregate, subject in aggregates]
+
+
+@router.post('/academic_aggregates/verify', status_code=status.HTTP_202_ACCEPTED)
+async def verify_aggregates(
+        background_tasks: BackgroundTasks,
+        caller: Principal = Depends(current_user),
+        cfg: Config = Depends(Stub(Config)),
+        job_queue: JobQueue = Depends(Stub(JobQueue)),
+        session_factory: async_sessionmaker[AsyncSession] = Depends(Stub(async_sessionmaker)),
+) -> None:
+    """Recompute the aggregates from the reports, e.g. after a bulk import."""
+    if caller.role != Role.ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
+
+    if cfg.jobs.enabled:
+        await job_queue.enqueue(VERIFY_AGGREGATES_JOB, {})
+    else:
+        background_tasks.add_task(verify_academic_aggregates, session_factory)
+
+
 @router.post('/academic_reports')
 async def create_academic_reports(
         reports: list[AcademicReportCreate],
-        caller: UserIdentity = Depends(current_user),
+        caller: Principal = Depends(current_user),
         service: StudentService = Depends(Stub(StudentService))
 ) -> None:
     try:
@@ -158,6 +295,36 @@ async def create_academic_reports(
         )
 
 
+@router.get('/academic_reports/export')
+async def export_academic_reports(
+        group_id: Optional[int] = None,
+        format: ExportFormat = ExportFormat.CSV,
+        caller: Principal = Depends(current_user),
+        service: StudentService = Depends(Stub(StudentService)),
+        session_factory: async_sessionmaker[AsyncSession] = Depends(Stub(async_sessionmaker)),
+) -> ClosingStreamingResponse:
+    """Stream the reports of the students of a group, or of the whole school."""
+    try:
+        stmt = await service.export_academic_reports(group_id, caller)
+    except exceptions.StudentPermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    except exceptions.GroupNotFound as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+
+    filename = "academic_reports" if group_id is None else f"academic_reports_{group_id}"
+    return ClosingStreamingResponse(
+        stream_academic_reports(session_factory, stmt, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'},
+    )
+
+
 @groups_router.get('/{group_id}')
 async def retrieve_group_info(
         group_id: int,
@@ -171,20 +338,126 @@ async def retrieve_group_info(
     )
 
 
+@groups_router.get('/{group_id}/academic_aggregates')
+async def get_group_academic_aggregates(
+        group_id: int,
+        term: Optional[int] = None,
+        caller: Principal = Depends(current_user),
+        service: StudentService = Depends(Stub(StudentService)),
+) -> list[AcademicAggregateRead]:
+    try:
+        aggregates = await service.get_group_academic_aggregates(group_id, term, caller)
+    except exceptions.StudentPermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    except exceptions.GroupNotFound as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+
+    return [aggregate_to_read_dto(aggregate, subject) for aggregate, subject in aggregates]
+
+
+@groups_router.get('/{group_id}/gradebook')
+async def get_group_gradebook(
+        group_id: int,
+        from_: Optional[date] = Query(default=None, alias="from"),
+        to: Optional[date] = None,
+        subject: Optional[int] = None,
+        caller: Principal = Depends(current_user),
+        service: StudentService = Depends(Stub(StudentService)),
+) -> Gradebook:
+    """Return the reports of the group between the days, the current week by default."""
+    week = DateRange.week()
+    try:
+        rows = await service.get_group_gradebook(
+            group_id,
+            from_ or week.start,
+            to or week.end,
+            subject,
+            caller,
+        )
+    except InvalidDateRange as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except exceptions.StudentPermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    except exceptions.GroupNotFound as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+
+    return build_gradebook(rows)
+
+
+@groups_router.get(
+    '/{group_id}/schedule',
+    response_model=PaginationResponse[DailySchedule],
+)
+async def get_group_weekly_schedule(
+        group_id: int,
+        request: Request,
+        query: PeriodQuery = Depends(period_query),
+        caller: Principal = Depends(current_user),
+        service: StudentService = Depends(Stub(StudentService)),
+) -> Response:
+    try:
+        days = await service.get_group_schedule(group_id, query.period, caller)
+    except InvalidDateRange as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except exceptions.StudentPermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+    except exceptions.GroupNotFound as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+
+    version = ResourceVersion.of_content(days)
+    check_not_modified(request, version)
+
+    uri_prefix = f"{groups_router.prefix}/{group_id}/schedule"
+    response: Response = pagination_json_response(*query.page_urls(uri_prefix), days)
+    response.headers.update(version.headers)
+    return response
+
+
 @groups_router.get('/{group_id}/students')
 async def get_group_students(
         group_id: int,
-        limit: int = 25,
-        offset: int = 0,
-        caller: UserIdentity = Depends(current_user),
+        limit: int = Query(default=25, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = None,
+        with_total: bool = False,
+        caller: Principal = Depends(current_user),
         service: StudentService = Depends(Stub(StudentService)),
-) -> PaginationResponse[StudentRead]:
+) -> CursorPaginationResponse[StudentRead]:
     try:
-        students, total_in_group = await service.get_students_by_group_id(
+        page, total_in_group = await service.get_students_by_group_id(
             group_id,
             caller,
             limit,
-            offset
+            decode_cursor(cursor, STUDENT_PAGE_KEY) if cursor else None,
+            with_total,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
     except exceptions.StudentPermissionError as e:
         raise HTTPException(
@@ -197,13 +470,13 @@ async def get_group_students(
             detail=str(e)
         )
 
-    return generate_pagination_response(
-        uri_prefix=f"{groups_router.prefix}/{group_id}",
-        offset=offset,
+    return generate_cursor_pagination_response(
+        uri_prefix=f"{groups_router.prefix}/{group_id}/students",
+        page=page,
         limit=limit,
-        max_offset=total_in_group,
+        total=total_in_group,
         data=[
             model_to_read_dto(student)
-            for student in students
+            for student in page.items
         ]
     )
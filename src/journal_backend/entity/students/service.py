@@ -1,23 +1,32 @@
-import asyncio
 import uuid
 from datetime import date, timedelta
 from email.message import EmailMessage
-from typing import TYPE_CHECKING, Literal, TypeAlias
+from typing import TYPE_CHECKING, Any, Literal, Optional, Sequence, TypeAlias
 
-from fastapi_users import jwt
-from passlib.context import CryptContext
 from redis.asyncio import Redis
+from sqlalchemy import Select
 
 from journal_backend.config import AppConfig, SMTPConfig
+from journal_backend.entity.classes.cache import SCHEDULE_DAYS, ScheduleCache
+from journal_backend.entity.classes.dto import (
+    DailySchedule,
+    build_schedule_response,
+)
+from journal_backend.entity.classes.enums import ScheduleOwner
 from journal_backend.entity.classes.exceptions import ClassNotFound
 from journal_backend.entity.classes.models import Class
 from journal_backend.entity.classes.repository import ClassRepository
-from journal_backend.entity.common.email_sender import EmailSender
+from journal_backend.entity.common.conditional import ResourceVersion
+from journal_backend.entity.common.date_range import MAX_PERIOD_DAYS, DateRange
+from journal_backend.entity.common.email_sender import MailSender
+from journal_backend.entity.common.pagination import Cursor, Page
+from journal_backend.entity.common.password_hasher import PasswordHasher
 from journal_backend.entity.students import exceptions
 from journal_backend.entity.students.dto import (
     AcademicReportCreate,
     StudentCreate,
 )
+from journal_backend.entity.students.export import academic_reports_export
 from journal_backend.entity.students.models import (
     AcademicReport,
     Group,
@@ -25,11 +34,13 @@ from journal_backend.entity.students.models import (
 )
 from journal_backend.entity.students.repository import StudentRepository
 from journal_backend.entity.users import exceptions as u_exceptions
+from journal_backend.entity.users.dto import Principal
 from journal_backend.entity.users.enums import Role
-from journal_backend.entity.users.models import UserIdentity
 from journal_backend.entity.users.repository import UserRepository
+from journal_backend.entity.users.tokens import generate_access_token
 
-DaySchedule: TypeAlias = list[Class]
+# Bounds the size of a gradebook, a year of classes
+MAX_GRADEBOOK_DAYS = 366
 
 if TYPE_CHECKING:
     RedisT: TypeAlias = Redis[str]  # type:ignore
@@ -47,15 +58,18 @@ class StudentService:
             repo: StudentRepository,
             user_repo: UserRepository,
             class_repo: ClassRepository,
-            email_sender: EmailSender,
+            email_sender: MailSender,
             redis_conn: RedisT,  # type:ignore
+            password_hasher: PasswordHasher,
+            schedule_cache: ScheduleCache,
     ) -> None:
         self.repo = repo
         self.user_repo = user_repo
         self.class_repo = class_repo
         self.email_sender = email_sender
         self.redis_conn = redis_conn
-        self.context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.password_hasher = password_hasher
+        self.schedule_cache = schedule_cache
 
     async def create(
             self,
@@ -76,7 +90,7 @@ class StudentService:
                 "name": student_create.name,
                 "surname": student_create.surname,
                 "email": student_create.email,
-                "hashed_password": self.context.hash(student_create.password),
+                "hashed_password": await self.password_hasher.hash(student_create.password),
                 "date_of_birth": student_create.date_of_birth,
                 "role": Role.STUDENT,
                 "is_verified": False,
@@ -88,11 +102,12 @@ class StudentService:
             group=group,
         )
 
-        auth_token = jwt.generate_jwt(
-            data={"sub": new_student.id},
-            secret=app_cfg.jwt_secret,
-            lifetime_seconds=app_cfg.jwt_lifetime_seconds
-        )
+        auth_token = generate_access_token(app_cfg, Principal(
+            id=new_student.id,
+            role=Role.STUDENT,
+            is_verified=False,
+            group_id=group.id,
+        ))
 
         one_time_token = uuid.uuid4()
         await self.redis_conn.setex(
@@ -110,17 +125,13 @@ class StudentService:
         em['To'] = student_create.email
         em['Subject'] = 'Mail confirmation'
         em.set_content(body)
-        asyncio.create_task(self.email_sender.send_email(
-            email_to=student_create.email,
-            em=em,
-            smtp_cfg=smtp_cfg
-        ))
 
         await self.repo.session.commit()
+        await self.email_sender.send_email(em)
 
         return auth_token, new_student
 
-    async def get_by_id(self, student_id: int, caller: UserIdentity) -> Student:
+    async def get_by_id(self, student_id: int, caller: Principal) -> Student:
         if caller.role == Role.STUDENT and caller.id != student_id:
             raise exceptions.StudentPermissionError
 
@@ -130,6 +141,16 @@ class StudentService:
 
         return student
 
+    async def get_version_by_id(self, student_id: int, caller: Principal) -> ResourceVersion:
+        if caller.role == Role.STUDENT and caller.id != student_id:
+            raise exceptions.StudentPermissionError
+
+        version: Optional[ResourceVersion] = await self.repo.get_version(student_id)
+        if version is None:
+            raise exceptions.StudentNotFound
+
+        return version
+
     async def get_group_info_by_id(self, group_id: int) -> Group:
         group = await self.repo.get_group_by_id(group_id)
         return group
@@ -137,103 +158,234 @@ class StudentService:
     async def get_schedule_by_id(
             self,
             student_id: int | Literal["me"],
-            offset: int,
-            caller: UserIdentity
-    ) -> dict[int, DaySchedule]:
+            period: DateRange,
+            caller: Principal
+    ) -> bytes:
         if student_id == "me":
             student_id = caller.id
 
         if caller.role == Role.STUDENT and caller.id != student_id:
             raise exceptions.StudentPermissionError
 
-        student = await self.repo.get_by_id(student_id)
-        if not student:
-            raise exceptions.StudentNotFound
+        period.check(MAX_PERIOD_DAYS)
+
+        group_id = caller.group_id if self._is_signed_self(student_id, caller) else None
+        if group_id is None:
+            # A token signed while the student had no group carries none
+            group_id = await self.repo.get_group_id(student_id)
+            if group_id is None:
+                if not await self.repo.exists(student_id):
+                    raise exceptions.StudentNotFound
+                # A student out of any group has no classes
+                return SCHEDULE_DAYS.dump_json([])
+
+        return await self._get_group_schedule(group_id, period)
 
-        now_with_offset = date.today() + timedelta(days=7 * offset)
-        monday = now_with_offset - timedelta(days=now_with_offset.weekday())
-        sunday = monday + timedelta(days=7)
+    async def get_group_schedule(
+            self,
+            group_id: int,
+            period: DateRange,
+            caller: Principal
+    ) -> bytes:
+        if caller.role == Role.STUDENT:
+            caller_group_id = (
+                caller.group_id if caller.from_claims else await self.repo.get_group_id(caller.id)
+            )
+            if caller_group_id != group_id:
+                raise exceptions.StudentPermissionError
 
-        classes_on_a_week: list[Class] = await self.class_repo.get_schedule_by_group_id(
-            student.group_id,
-            monday,
-            sunday
+        period.check(MAX_PERIOD_DAYS)
+        return await self._get_group_schedule(group_id, period, check_group=True)
+
+    async def _get_group_schedule(
+            self,
+            group_id: int,
+            period: DateRange,
+            check_group: bool = False,
+    ) -> bytes:
+        async def load() -> list[DailySchedule]:
+            classes: Sequence[Class] = await self.class_repo.get_schedule_by_group_id(
+                group_id,
+                period.start,
+                period.stop,
+            )
+            # Only a miss looks the group up, an unknown group is never cached
+            if check_group and not classes and not await self.repo.group_exists(group_id):
+                raise exceptions.GroupNotFound
+            schedule: list[DailySchedule] = build_schedule_response(classes)
+            return schedule
+
+        days: bytes = await self.schedule_cache.get_or_load(
+            ScheduleOwner.GROUP, group_id, period, load
         )
-        return self._aggregate_classes(classes_on_a_week)
+        return days
 
     async def create_academic_reports(
             self,
             reports: list[AcademicReportCreate],
-            caller: UserIdentity
+            caller: Principal
     ) -> None:
         if caller.role == Role.STUDENT:
             raise exceptions.StudentPermissionError
 
-        for report in reports:
-            student = await self.repo.get_by_id(report.student_id)
-            if not student:
-                raise exceptions.StudentNotFound
+        # The last report of the batch wins, like it would one by one
+        unique_reports = list({
+            (report.student_id, report.class_id): report
+            for report in reports
+        }.values())
+        if not unique_reports:
+            return
 
-            if not await self.class_repo.student_class_exists(student.group_id, report.class_id):
-                raise ClassNotFound
+        invalid = await self.repo.find_invalid_reports(unique_reports)
+        if any(not student_exists for _, _, student_exists in invalid):
+            raise exceptions.StudentNotFound
+        if invalid:
+            raise ClassNotFound
 
-        await self.repo.create_academic_reports(reports)
+        await self.repo.create_academic_reports(unique_reports)
 
     async def get_academic_reports_by_id(
             self,
             student_id: int | Literal["me"],
-            offset: int,
-            caller: UserIdentity
+            period: DateRange,
+            caller: Principal
     ) -> list[AcademicReport]:
-        if student_id == "me":
-            student_id = caller.id
+        student_id = await self._readable_student_id(student_id, caller)
+        period.check(MAX_PERIOD_DAYS)
 
-        if caller.role == Role.STUDENT and caller.id != student_id:
-            raise exceptions.StudentPermissionError
+        reports: list[AcademicReport] = await self.repo.get_academic_reports(
+            student_id=student_id,
+            d_left=period.start,
+            d_right=period.stop,
+        )
 
-        student: Student = await self.repo.get_by_id(student_id)
-        if not student:
-            raise exceptions.StudentNotFound
+        return reports
 
-        now_with_offset = date.today() + timedelta(days=7 * offset)
-        monday = now_with_offset - timedelta(days=now_with_offset.weekday())
-        sunday = monday + timedelta(days=7)
+    async def get_academic_reports_version(
+            self,
+            student_id: int | Literal["me"],
+            period: DateRange,
+            caller: Principal
+    ) -> ResourceVersion:
+        student_id = await self._readable_student_id(student_id, caller)
+        period.check(MAX_PERIOD_DAYS)
 
-        reports: list[AcademicReport] = await self.repo.get_academic_reports(
+        version: ResourceVersion = await self.repo.get_academic_reports_version(
             student_id=student_id,
-            d_left=monday,
-            d_right=sunday,
+            d_left=period.start,
+            d_right=period.stop,
         )
+        return version
 
-        return reports
+    async def get_academic_aggregates_by_id(
+            self,
+            student_id: int | Literal["me"],
+            term: Optional[int],
+            caller: Principal
+    ) -> Sequence[Any]:
+        student_id = await self._readable_student_id(student_id, caller)
+
+        aggregates: Sequence[Any] = await self.repo.get_academic_aggregates(
+            student_id=student_id,
+            term=term,
+        )
+        return aggregates
+
+    async def get_group_academic_aggregates(
+            self,
+            group_id: int,
+            term: Optional[int],
+            caller: Principal
+    ) -> Sequence[Any]:
+        if caller.role == Role.STUDENT:
+            raise exceptions.StudentPermissionError
+
+        if not await self.repo.group_exists(group_id):
+            raise exceptions.GroupNotFound
+
+        aggregates: Sequence[Any] = await self.repo.get_academic_aggregates(
+            group_id=group_id,
+            term=term,
+        )
+        return aggregates
+
+    async def get_group_gradebook(
+            self,
+            group_id: int,
+            d_left: date,
+            d_right: date,
+            subject_id: Optional[int],
+            caller: Principal,
+    ) -> Sequence[Any]:
+        if caller.role == Role.STUDENT:
+            raise exceptions.StudentPermissionError
+
+        DateRange(d_left, d_right).check(MAX_GRADEBOOK_DAYS)
+
+        rows: Sequence[Any] = await self.repo.get_gradebook_rows(
+            group_id, d_left, d_right, subject_id
+        )
+        # A group has no rows when it has no students, or doesn't exist
+        if not rows and not await self.repo.group_exists(group_id):
+            raise exceptions.GroupNotFound
+        return rows
 
     async def get_students_by_group_id(
             self,
             group_id: int,
-            caller: UserIdentity,
+            caller: Principal,
             limit: int,
-            offset: int
-    ) -> tuple[list[Student], int]:
+            cursor: Optional[Cursor],
+            with_total: bool = False,
+    ) -> tuple[Page[Student], Optional[int]]:
         if caller.role == Role.STUDENT:
             raise exceptions.StudentPermissionError
 
-        group = await self.repo.get_group_by_id(group_id)
-        if not group:
+        if not await self.repo.group_exists(group_id):
             raise exceptions.GroupNotFound
 
-        students, total_in_group = await self.repo.get_students_by_group_id(
-            group_id,
-            limit,
-            offset
-        )
-        return students, total_in_group
+        page = await self.repo.get_students_by_group_id(group_id, limit, cursor)
+        total_in_group = None
+        if with_total:
+            total_in_group = await self.repo.count_students_in_group(group_id)
+        return page, total_in_group
+
+    async def export_academic_reports(
+            self,
+            group_id: Optional[int],
+            caller: Principal,
+    ) -> Select[Any]:
+        # The whole school is exported by admins only
+        if caller.role == Role.STUDENT or (group_id is None and caller.role != Role.ADMIN):
+            raise exceptions.StudentPermissionError
+
+        if group_id is not None and not await self.repo.group_exists(group_id):
+            raise exceptions.GroupNotFound
+
+        stmt: Select[Any] = academic_reports_export(group_id)
+        return stmt
+
+    async def _readable_student_id(
+            self,
+            student_id: int | Literal["me"],
+            caller: Principal
+    ) -> int:
+        """Return the id of an existing student whose data the caller can read."""
+        readable_id: int = caller.id if student_id == "me" else student_id
+
+        if caller.role == Role.STUDENT and caller.id != readable_id:
+            raise exceptions.StudentPermissionError
+
+        if not self._is_signed_self(readable_id, caller):
+            if not await self.repo.exists(readable_id):
+                raise exceptions.StudentNotFound
+
+        return readable_id
 
     @staticmethod
-    def _aggregate_classes(classes: list[Class]) -> dict[int, DaySchedule]:
-        schedule_by_days: dict[int, Class] = {}
-        for class_ in classes:
-            weekday = class_.starts_at.weekday()
-            if not schedule_by_days.get(weekday):
-                schedule_by_days[weekday] = []
-            schedule_by_days[weekday].append(class_)
-        return schedule_by_days
+    def _is_signed_self(student_id: int | Literal["me"], caller: Principal) -> bool:
+        # A student asking for their own data with a claims token is known to
+        # exist and to belong to the signed group, so no lookup is needed.
+        return bool(
+            caller.from_claims and caller.role == Role.STUDENT and caller.id == student_id
+        )
@@ -0,0 +1,50 @@
+"""Contain the job verifying the grade and attendance aggregates.
+
+Enqueue it after writing reports by other means than the API, or run it
+periodically: it recomputes the aggregates of every student from their
+reports and fixes the wrong ones.
+"""
+import logging
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from journal_backend.entity.students.repository import StudentRepository
+
+logger = logging.getLogger(__name__)
+
+VERIFY_AGGREGATES_JOB = "verify_academic_aggregates"
+VERIFY_CHUNK_SIZE = 200
+
+
+async def verify_academic_aggregates(
+        session_factory: async_sessionmaker[AsyncSession],
+        chunk_size: int = VERIFY_CHUNK_SIZE,
+) -> int:
+    """Recompute the aggregates of every student, a chunk of students per transaction.
+
+    Returns:
+        int: The amount of aggregates that were wrong.
+    """
+    wrong = 0
+    last_id = 0
+    while True:
+        async with session_factory() as session:
+            repo = StudentRepository(session)
+            student_ids = await repo.get_student_ids(after=last_id, limit=chunk_size)
+            if not student_ids:
+                break
+            wrong += await repo.recompute_academic_aggregates(student_ids)
+        last_id = student_ids[-1]
+
+    if wrong:
+        logger.warning("Fixed %d academic aggregates", wrong)
+    return wrong
+
+
+async def handle_verify_aggregates(
+        session_factory: async_sessionmaker[AsyncSession],
+        payload: dict[str, Any],
+) -> None:
+    """Run a `verify_academic_aggregates` job."""
+    await verify_academic_aggregates(session_factory)
@@ -0,0 +1,17 @@
+"""Contain the loading profiles of teachers."""
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+
+from journal_backend.entity.teachers.models import Teacher
+
+# What `teachers.dto.model_to_read_dto` reads
+TEACHER_CARD = (
+    joinedload(Teacher.identity, innerjoin=True),
+    raiseload("*"),
+)
+
+# The competencies are a collection, loaded with a second query instead
+# of multiplying the teacher row
+TEACHER_COMPETENCIES = (
+    selectinload(Teacher.competencies),
+    raiseload("*"),
+)
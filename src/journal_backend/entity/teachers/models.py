@@ -5,11 +5,12 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 from starlette.requests import Request
 
 from journal_backend.database.base import Base
+from journal_backend.database.mixins import TimestampColumnsMixin
 from journal_backend.entity.classes.models import Class
 from journal_backend.entity.users.models import UserIdentity
 
 
-class Teacher(Base):  # type: ignore[misc]
+class Teacher(TimestampColumnsMixin, Base):  # type: ignore[misc]
     __tablename__ = "teachers"
 
     id: Mapped[int] = mapped_column(
@@ -19,11 +20,11 @@ class Teacher(Base):  # type: ignore[misc]
     qualification: Mapped[Optional[str]] = mapped_column()
     education: Mapped[Optional[str]] = mapped_column()
 
-    identity: Mapped["UserIdentity"] = relationship(lazy="joined")
+    identity: Mapped["UserIdentity"] = relationship(lazy="raise_on_sql")
     competencies: Mapped[list["Subject"]] = relationship(
         back_populates="competents",
         secondary='competencies',
-        lazy="joined"
+        lazy="raise_on_sql"
     )
     classes: Mapped[list["Class"]] = relationship(back_populates="teacher")
 
@@ -37,7 +38,7 @@ class Teacher(Base):  # type: ignore[misc]
         return f"<div>{self.identity.surname} {self.identity.name}</div>"
 
 
-class Subject(Base):  # type: ignore[misc]
+class Subject(TimestampColumnsMixin, Base):  # type: ignore[misc]
     __tablename__ = "subjects"
 
     id: Mapped[int] = mapped_column(primary_key=True)
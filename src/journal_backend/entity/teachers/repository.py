@@ -1,9 +1,15 @@
-from typing import Any
+from typing import Any, Optional
 
-from sqlalchemy import select
+from sqlalchemy import exists, func, lambda_stmt, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from journal_backend.entity.common.conditional import ResourceVersion
+from journal_backend.entity.teachers.loading import (
+    TEACHER_CARD,
+    TEACHER_COMPETENCIES,
+)
 from journal_backend.entity.teachers.models import Subject, Teacher
+from journal_backend.entity.users.models import UserIdentity
 
 
 class TeacherRepository:
@@ -28,6 +34,27 @@ class TeacherRepository:
         return subject
 
     async def get_by_id(self, teacher_id: int) -> Teacher:
-        stmt = select(Teacher).where(Teacher.id == teacher_id)
+        stmt = select(Teacher).options(*TEACHER_CARD).where(Teacher.id == teacher_id)
         teacher = await self.session.scalar(stmt)
         return teacher
+
+    async def get_with_competencies(self, teacher_id: int) -> Optional[Teacher]:
+        stmt = select(Teacher).options(*TEACHER_COMPETENCIES).where(Teacher.id == teacher_id)
+        teacher: Optional[Teacher] = await self.session.scalar(stmt)
+        return teacher
+
+    async def get_version(self, teacher_id: int) -> Optional[ResourceVersion]:
+        """Return the version of the teacher's card, None when there is no teacher."""
+        stmt = lambda_stmt(
+            lambda: select(func.greatest(Teacher.updated_on, UserIdentity.updated_on)).
+            join(UserIdentity, UserIdentity.id == Teacher.id).
+            where(Teacher.id == teacher_id)
+        )
+        last_modified = await self.session.scalar(stmt)
+        if last_modified is None:
+            return None
+        return ResourceVersion.of_rows(last_modified)
+
+    async def exists(self, teacher_id: int) -> bool:
+        stmt = lambda_stmt(lambda: select(exists().where(Teacher.id == teacher_id)))
+        return bool(await self.session.scalar(stmt))
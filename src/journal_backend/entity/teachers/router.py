@@ -1,11 +1,25 @@
 from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from starlette import status
 
 from journal_backend.config import Config
+from journal_backend.database.routes import SessionReleasingRoute
 from journal_backend.depends_stub import Stub
-from journal_backend.entity.common.pagination import PaginationResponse
+from journal_backend.entity.classes.dto import DailySchedule
+from journal_backend.entity.common.conditional import (
+    ResourceVersion,
+    check_not_modified,
+)
+from journal_backend.entity.common.date_range import PeriodQuery, period_query
+from journal_backend.entity.common.exceptions import (
+    InvalidDateRange,
+    PasswordHasherOverloaded,
+)
+from journal_backend.entity.common.pagination import (
+    PaginationResponse,
+    pagination_json_response,
+)
 from journal_backend.entity.teachers import exceptions
 from journal_backend.entity.teachers.dto import (
     AuthResponse,
@@ -17,9 +31,13 @@ from journal_backend.entity.teachers.models import Competence
 from journal_backend.entity.teachers.service import TeacherService
 from journal_backend.entity.users import exceptions as u_exceptions
 from journal_backend.entity.users.dependencies import current_user
-from journal_backend.entity.users.models import UserIdentity
+from journal_backend.entity.users.dto import Principal
 
-router = APIRouter(prefix="/teachers", tags=['teachers'])
+router = APIRouter(
+    prefix="/teachers",
+    tags=['teachers'],
+    route_class=SessionReleasingRoute,
+)
 
 
 @router.post("")
@@ -38,6 +56,11 @@ async def register(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except PasswordHasherOverloaded as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
     return AuthResponse(
         token=auth_token,
         teacher=model_to_read_dto(teacher)
@@ -47,13 +70,17 @@ async def register(
 @router.get("/{teacher_id}")
 async def retrieve_teacher(
         teacher_id: int | Literal["me"],
-        caller: UserIdentity = Depends(current_user),
+        request: Request,
+        response: Response,
+        caller: Principal = Depends(current_user),
         teacher_service: TeacherService = Depends(Stub(TeacherService))
 ) -> TeacherRead:
     if teacher_id == 'me':
         teacher_id = caller.id
 
     try:
+        version = await teacher_service.get_version_by_id(teacher_id, caller)
+        check_not_modified(request, version)
         teacher = await teacher_service.get_by_id(teacher_id, caller)
     except exceptions.TeacherNotFound as e:
         raise HTTPException(
@@ -66,36 +93,52 @@ async def retrieve_teacher(
             detail=str(e),
         )
 
+    response.headers.update(version.headers)
     return model_to_read_dto(teacher)
 
 
-@router.get("/{teacher_id}/schedule")
+@router.get(
+    "/{teacher_id}/schedule",
+    response_model=PaginationResponse[DailySchedule],
+)
 async def get_teacher_weekly_schedule(
         teacher_id: int | Literal["me"],
-        offset: int = 0,
-        caller: UserIdentity = Depends(current_user),
+        request: Request,
+        query: PeriodQuery = Depends(period_query),
+        caller: Principal = Depends(current_user),
         teacher_service: TeacherService = Depends(Stub(TeacherService))
-) -> PaginationResponse:
+) -> Response:
     try:
-        schedule = await teacher_service.get_schedule_by_id(teacher_id, offset, caller)
+        days = await teacher_service.get_schedule_by_id(teacher_id, query.period, caller)
+    except InvalidDateRange as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except exceptions.TeacherPermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
     except exceptions.TeacherNotFound as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
         )
 
+    version = ResourceVersion.of_content(days)
+    check_not_modified(request, version)
+
     uri_prefix = f"{router.prefix}/{teacher_id}/schedule"
-    return PaginationResponse(
-        next_url=f"{uri_prefix}?offset={offset + 1}",
-        prev_url=f"{uri_prefix}?offset={offset - 1}",
-        data=schedule,
-    )
+    response: Response = pagination_json_response(*query.page_urls(uri_prefix), days)
+    response.headers.update(version.headers)
+    return response
 
 
 @router.get("/{teacher_id}/competencies")
 async def get_teacher_competencies(
         teacher_id: int | Literal['me'],
-        caller: UserIdentity = Depends(current_user),
+        caller: Principal = Depends(current_user),
         teacher_service: TeacherService = Depends(Stub(TeacherService))
 ) -> list[str]:
     try:
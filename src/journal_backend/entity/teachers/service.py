@@ -1,22 +1,26 @@
-from datetime import date, timedelta
-from typing import Literal, TypeAlias
-
-from fastapi_users import jwt
-from passlib.context import CryptContext
+from typing import Literal, Optional, Sequence
 
 from journal_backend.config import AppConfig
+from journal_backend.entity.classes.cache import ScheduleCache
+from journal_backend.entity.classes.dto import (
+    DailySchedule,
+    build_schedule_response,
+)
+from journal_backend.entity.classes.enums import ScheduleOwner
 from journal_backend.entity.classes.models import Class
 from journal_backend.entity.classes.repository import ClassRepository
+from journal_backend.entity.common.conditional import ResourceVersion
+from journal_backend.entity.common.date_range import MAX_PERIOD_DAYS, DateRange
+from journal_backend.entity.common.password_hasher import PasswordHasher
 from journal_backend.entity.teachers import exceptions
 from journal_backend.entity.teachers.dto import TeacherCreate
 from journal_backend.entity.teachers.models import Competence, Teacher
 from journal_backend.entity.teachers.repository import TeacherRepository
+from journal_backend.entity.users.dto import Principal
 from journal_backend.entity.users.enums import Role
 from journal_backend.entity.users.exceptions import UserAlreadyExists
-from journal_backend.entity.users.models import UserIdentity
 from journal_backend.entity.users.repository import UserRepository
-
-DaySchedule: TypeAlias = list[Class]
+from journal_backend.entity.users.tokens import generate_access_token
 
 
 class TeacherService:
@@ -25,11 +29,14 @@ class TeacherService:
             repo: TeacherRepository,
             user_repo: UserRepository,
             class_repo: ClassRepository,
+            password_hasher: PasswordHasher,
+            schedule_cache: ScheduleCache,
     ) -> None:
         self.repo = repo
         self.user_repo = user_repo
         self.class_repo = class_repo
-        self.context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.password_hasher = password_hasher
+        self.schedule_cache = schedule_cache
 
     async def create(
             self,
@@ -45,7 +52,7 @@ class TeacherService:
                 "name": teacher_create.name,
                 "surname": teacher_create.surname,
                 "email": teacher_create.email,
-                "hashed_password": self.context.hash(teacher_create.password),
+                "hashed_password": await self.password_hasher.hash(teacher_create.password),
                 "date_of_birth": teacher_create.date_of_birth,
                 "role": Role.TEACHER,
                 "is_verified": False,
@@ -65,15 +72,15 @@ class TeacherService:
             ]
         )
 
-        auth_token = jwt.generate_jwt(
-            data={"sub": new_teacher.id},
-            secret=app_cfg.jwt_secret,
-            lifetime_seconds=app_cfg.jwt_lifetime_seconds
-        )
+        auth_token = generate_access_token(app_cfg, Principal(
+            id=new_teacher.id,
+            role=Role.TEACHER,
+            is_verified=False,
+        ))
 
         return auth_token, new_teacher
 
-    async def get_by_id(self, teacher_id: int, caller: UserIdentity) -> Teacher:
+    async def get_by_id(self, teacher_id: int, caller: Principal) -> Teacher:
         if caller.role != Role.ADMIN and teacher_id != caller.id:
             raise exceptions.TeacherPermissionError
 
@@ -83,10 +90,20 @@ class TeacherService:
 
         return teacher
 
+    async def get_version_by_id(self, teacher_id: int, caller: Principal) -> ResourceVersion:
+        if caller.role != Role.ADMIN and teacher_id != caller.id:
+            raise exceptions.TeacherPermissionError
+
+        version: Optional[ResourceVersion] = await self.repo.get_version(teacher_id)
+        if version is None:
+            raise exceptions.TeacherNotFound
+
+        return version
+
     async def get_competencies(
             self,
             teacher_id: int | Literal['me'],
-            caller: UserIdentity
+            caller: Principal
     ) -> list[Competence]:
         if teacher_id == "me":
             teacher_id = caller.id
@@ -94,7 +111,7 @@ class TeacherService:
         if caller.role != Role.ADMIN and teacher_id != caller.id:
             raise exceptions.TeacherPermissionError
 
-        teacher = await self.repo.get_by_id(teacher_id)
+        teacher = await self.repo.get_with_competencies(teacher_id)
         if not teacher:
             raise exceptions.TeacherNotFound
 
@@ -103,36 +120,33 @@ class TeacherService:
     async def get_schedule_by_id(
             self,
             teacher_id: int | Literal["me"],
-            offset: int,
-            caller: UserIdentity
-    ) -> dict[int, DaySchedule]:
+            period: DateRange,
+            caller: Principal
+    ) -> bytes:
         if teacher_id == "me":
             teacher_id = caller.id
 
         if caller.role != Role.ADMIN and caller.id != teacher_id:
             raise exceptions.TeacherPermissionError
 
-        teacher = await self.repo.get_by_id(teacher_id)
-        if not teacher:
-            raise exceptions.TeacherNotFound
+        period.check(MAX_PERIOD_DAYS)
 
-        now_with_offset = date.today() + timedelta(days=7 * offset)
-        monday = now_with_offset - timedelta(days=now_with_offset.weekday())
-        sunday = monday + timedelta(days=7)
+        is_signed_self = (
+            caller.from_claims and caller.role == Role.TEACHER and caller.id == teacher_id
+        )
+        if not is_signed_self and not await self.repo.exists(teacher_id):
+            raise exceptions.TeacherNotFound
 
-        classes_on_a_week: list[Class] = await self.class_repo.get_schedule_by_teacher_id(
-            teacher_id,
-            monday,
-            sunday
+        async def load() -> list[DailySchedule]:
+            classes: Sequence[Class] = await self.class_repo.get_schedule_by_teacher_id(
+                teacher_id,
+                period.start,
+                period.stop,
+            )
+            schedule: list[DailySchedule] = build_schedule_response(classes)
+            return schedule
+
+        days: bytes = await self.schedule_cache.get_or_load(
+            ScheduleOwner.TEACHER, teacher_id, period, load
         )
-        return self._aggregate_classes(classes_on_a_week)
-
-    @staticmethod
-    def _aggregate_classes(classes: list[Class]) -> dict[int, DaySchedule]:
-        schedule_by_days: dict[int, Class] = {}
-        for class_ in classes:
-            weekday = class_.starts_at.weekday()
-            if not schedule_by_days.get(weekday):
-                schedule_by_days[weekday] = []
-            schedule_by_days[weekday].append(class_)
-        return schedule_by_days
+        return days
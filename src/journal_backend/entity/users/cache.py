@@ -0,0 +1,79 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from journal_backend.entity.users.models import UserIdentity
+
+
+class IdentityCache:
+    """Represent a bounded LRU cache of user identities with a per-entry TTL.
+
+    The cache lives in the process memory, so explicit invalidation only
+    reaches the current worker; the TTL bounds staleness for the others.
+
+    Attributes:
+        max_size (int): The maximum amount of cached identities.
+        ttl_seconds (float): The lifetime of a cached identity.
+        hits (int): The amount of lookups served from the cache.
+        misses (int): The amount of lookups that fell through to the database.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[int, tuple[float, UserIdentity]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, user_id: int) -> Optional[UserIdentity]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, identity = entry
+        if expires_at <= time.monotonic():
+            del self._entries[user_id]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return identity
+
+    def put(self, identity: UserIdentity) -> None:
+        if self.max_size <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds
+        self._entries[identity.id] = (expires_at, _detached_copy(identity))
+        self._entries.move_to_end(identity.id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def _detached_copy(identity: UserIdentity) -> UserIdentity:
+    # The cached instance must not stay bound to the session of the request
+    # that loaded it, so the column values are copied into a detached object.
+    values = {
+        attr.key: getattr(identity, attr.key)
+        for attr in inspect(UserIdentity).column_attrs
+    }
+    copy = UserIdentity(**values)
+    make_transient_to_detached(copy)
+    return copy
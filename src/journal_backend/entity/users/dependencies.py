@@ -9,32 +9,34 @@ from fastapi_users.authentication import (
     BearerTransport,
     JWTStrategy,
 )
-from fastapi_users.jwt import decode_jwt
 from jwt import InvalidTokenError
-from pydantic import SecretStr
 from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 
 from journal_backend.config import Config
 from journal_backend.depends_stub import Stub
+from journal_backend.entity.users.cache import IdentityCache
+from journal_backend.entity.users.dto import Principal
 from journal_backend.entity.users.models import UserIdentity
 from journal_backend.entity.users.repository import UserRepository
 from journal_backend.entity.users.service import UserService
+from journal_backend.entity.users.tokens import (
+    ClaimsJWTStrategy,
+    decode_access_token,
+    principal_from_claims,
+)
 
 if TYPE_CHECKING:
     RedisT: TypeAlias = Redis[str]  # type:ignore
 else:
     RedisT = Redis
 
-JWT_ALGORITHM = "HS256"
-JWT_AUDIENCE = "fastapi-users:auth"
-
-
 async def get_user_repository(
         session: AsyncSession = Depends(Stub(AsyncSession)),
+        identity_cache: IdentityCache = Depends(Stub(IdentityCache)),
 ) -> UserRepository:
-    yield UserRepository(session, UserIdentity)
+    return UserRepository(session, UserIdentity, identity_cache=identity_cache)
 
 
 async def get_user_service(
@@ -42,11 +44,13 @@ async def get_user_service(
         config: Config = Depends(Stub(Config)),
         redis_conn: RedisT = Depends(Stub(Redis))  # type:ignore
 ) -> UserService:
-    yield UserService(user_repository, config.app.jwt_secret, redis_conn)
+    return UserService(user_repository, config.app.jwt_secret, redis_conn)
 
 
-def get_jwt_strategy(config: Config = Depends(Stub(Config))) -> JWTStrategy[UserIdentity, int]:
-    return JWTStrategy(secret=config.app.jwt_secret, lifetime_seconds=3600)
+def get_jwt_strategy(
+        strategy: ClaimsJWTStrategy = Depends(Stub(ClaimsJWTStrategy)),
+) -> JWTStrategy[UserIdentity, int]:
+    return strategy  # type:ignore[no-any-return]
 
 
 auth_backend = AuthenticationBackend(
@@ -69,20 +73,32 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="users/login")
 async def current_user(
         token: str = Depends(oauth2_scheme),
         cfg: Config = Depends(Stub(Config)),
-        user_repo: UserRepository = Depends(Stub(UserRepository))
-) -> UserIdentity:
+        user_repo: UserRepository = Depends(Stub(UserRepository)),
+        identity_cache: IdentityCache = Depends(Stub(IdentityCache)),
+) -> Principal:
     try:
-        user_id = int(decode_jwt(
-            encoded_jwt=token,
-            secret=SecretStr(cfg.app.jwt_secret),
-            audience=[JWT_AUDIENCE],
-            algorithms=[JWT_ALGORITHM],
-        )['sub'])
+        payload = decode_access_token(cfg.app, token)
+        user_id = int(payload['sub'])
+        principal = principal_from_claims(payload) if cfg.app.jwt_claims else None
     except (InvalidTokenError, KeyError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid auth token"
         )
 
+    if principal is not None:
+        return principal
+
+    user = identity_cache.get(user_id)
+    if user is not None:
+        return Principal.from_identity(user)
+
     user = await user_repo.get(user_id)
-    return user
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid auth token"
+        )
+
+    identity_cache.put(user)
+    return Principal.from_identity(user)
@@ -1,10 +1,12 @@
+from dataclasses import dataclass
 from datetime import date
-from typing import Any
+from typing import Any, Optional
 
 from fastapi_users import schemas
 from fastapi_users.schemas import CreateUpdateDictModel
 
 from journal_backend.entity.users.enums import Role
+from journal_backend.entity.users.models import UserIdentity
 
 
 class UserRead(schemas.BaseUser[int]):
@@ -23,3 +25,27 @@ class UserCreate(schemas.BaseUserCreate):
 class UserUpdate(CreateUpdateDictModel):
     param: str
     value: Any
+
+
+@dataclass(frozen=True, kw_only=True)
+class Principal:
+    """Represent the authenticated caller of a request.
+
+    Attributes:
+        id (int): The id of the user.
+        role (Role): The role of the user.
+        is_verified (bool): Whether the user has confirmed their email.
+        group_id (Optional[int]): The group of a student, known only for claims tokens.
+        from_claims (bool): Whether the fields were taken from signed token claims
+            (and so reflect the state at the moment the token was issued).
+    """
+
+    id: int
+    role: Role
+    is_verified: bool
+    group_id: Optional[int] = None
+    from_claims: bool = False
+
+    @classmethod
+    def from_identity(cls, identity: UserIdentity) -> "Principal":
+        return cls(id=identity.id, role=identity.role, is_verified=identity.is_verified)
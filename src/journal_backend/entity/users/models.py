@@ -6,10 +6,11 @@ from sqlalchemy.orm import Mapped, mapped_column
 from starlette.requests import Request
 
 from journal_backend.database.base import Base
+from journal_backend.database.mixins import TimestampColumnsMixin
 from journal_backend.entity.users.enums import Role
 
 
-class UserIdentity(Base):  # type:ignore[misc]
+class UserIdentity(TimestampColumnsMixin, Base):  # type:ignore[misc]
     __tablename__ = "user_identity"
 
     id: Mapped[int] = mapped_column(primary_key=True)
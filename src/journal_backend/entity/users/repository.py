@@ -7,6 +7,7 @@ from fastapi_users_db_sqlalchemy import (
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from journal_backend.entity.users.cache import IdentityCache
 from journal_backend.entity.users.models import UserIdentity
 
 
@@ -18,8 +19,10 @@ class UserRepository(SQLAlchemyUserDatabase[UserIdentity, int]):
             oauth_account_table: Optional[
                 Type[SQLAlchemyBaseOAuthAccountTable[int]]
             ] = None,
+            identity_cache: Optional[IdentityCache] = None,
     ) -> None:
         super().__init__(session, user_table, oauth_account_table)
+        self.identity_cache = identity_cache
 
     async def create(self, create_dict: Dict[str, Any]) -> UserIdentity:
         user = self.user_table(**create_dict)
@@ -32,6 +35,16 @@ class UserRepository(SQLAlchemyUserDatabase[UserIdentity, int]):
         stmt = update(UserIdentity).where(UserIdentity.id == student_id).values(is_verified=True)
         await self.session.execute(stmt)
         await self.session.commit()
+        self._invalidate(student_id)
+
+    async def update(self, user: UserIdentity, update_dict: Dict[str, Any]) -> UserIdentity:
+        user = await super().update(user, update_dict)
+        self._invalidate(user.id)
+        return user
+
+    async def delete(self, user: UserIdentity) -> None:
+        await super().delete(user)
+        self._invalidate(user.id)
 
     async def last(self) -> Optional[UserIdentity]:
         stmt = select(UserIdentity.id).order_by(UserIdentity.id.desc())
@@ -39,3 +52,7 @@ class UserRepository(SQLAlchemyUserDatabase[UserIdentity, int]):
         if last_id is None:
             return None
         return await self.get(last_id)
+
+    def _invalidate(self, user_id: int) -> None:
+        if self.identity_cache is not None:
+            self.identity_cache.invalidate(user_id)
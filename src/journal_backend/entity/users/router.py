@@ -6,6 +6,8 @@ from fastapi_users.fastapi_users import (  # type: ignore[attr-defined]
 from fastapi_users.router import get_reset_password_router, get_verify_router
 from starlette import status
 
+from journal_backend.database.dependencies import read_write
+from journal_backend.database.routes import SessionReleasingRoute
 from journal_backend.depends_stub import Stub
 from journal_backend.entity.users import exceptions
 from journal_backend.entity.users.dependencies import (
@@ -14,17 +16,21 @@ from journal_backend.entity.users.dependencies import (
     current_user,
     get_user_service,
 )
-from journal_backend.entity.users.dto import UserRead, UserUpdate
-from journal_backend.entity.users.models import UserIdentity
+from journal_backend.entity.users.dto import Principal, UserRead, UserUpdate
 from journal_backend.entity.users.service import UserService
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = APIRouter(
+    prefix="/users",
+    tags=["users"],
+    route_class=SessionReleasingRoute,
+)
 
 
 @router.get('/confirm-email')
+@read_write  # type:ignore[misc]
 async def confirm_email(
         em_token: str,
-        caller: UserIdentity = Depends(current_user),
+        caller: Principal = Depends(current_user),
         user_service: UserService = Depends(Stub(UserService)),
 ) -> str:
     try:
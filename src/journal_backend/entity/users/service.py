@@ -6,6 +6,7 @@ from fastapi_users.password import PasswordHelperProtocol
 from redis.asyncio import Redis
 
 from journal_backend.entity.users import exceptions
+from journal_backend.entity.users.dto import Principal
 from journal_backend.entity.users.models import UserIdentity
 from journal_backend.entity.users.repository import UserRepository
 
@@ -29,7 +30,7 @@ class UserService(IntegerIDMixin, BaseUserManager[UserIdentity, int]):
 
         super().__init__(user_repo, password_helper)
 
-    async def confirm_email(self, token: str, caller: UserIdentity) -> None:
+    async def confirm_email(self, token: str, caller: Principal) -> None:
         student_id = await self.redis_conn.get(token)
         if not student_id:
             raise exceptions.InvalidConfirmationToken
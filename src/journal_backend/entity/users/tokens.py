@@ -0,0 +1,97 @@
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi_users.authentication import JWTStrategy
+from fastapi_users.jwt import decode_jwt, generate_jwt
+from pydantic import SecretStr
+
+from journal_backend.config import AppConfig
+from journal_backend.entity.users.dto import Principal
+from journal_backend.entity.users.enums import Role
+from journal_backend.entity.users.models import UserIdentity
+
+JWT_ALGORITHM = "HS256"
+JWT_AUDIENCE = "fastapi-users:auth"
+
+GroupIdLoader = Callable[[int], Awaitable[Optional[int]]]
+
+
+def generate_access_token(app_cfg: AppConfig, principal: Principal) -> str:
+    data: dict[str, Any] = {"sub": str(principal.id), "aud": [JWT_AUDIENCE]}
+    if app_cfg.jwt_claims:
+        data.update(
+            role=principal.role.value,
+            group_id=principal.group_id,
+            is_verified=principal.is_verified,
+        )
+    return generate_jwt(
+        data=data,
+        secret=app_cfg.jwt_secret,
+        lifetime_seconds=app_cfg.jwt_lifetime_seconds,
+        algorithm=JWT_ALGORITHM,
+    )
+
+
+def decode_access_token(app_cfg: AppConfig, token: str) -> dict[str, Any]:
+    return decode_jwt(
+        encoded_jwt=token,
+        secret=SecretStr(app_cfg.jwt_secret),
+        audience=[JWT_AUDIENCE],
+        algorithms=[JWT_ALGORITHM],
+    )
+
+
+def principal_from_claims(payload: dict[str, Any]) -> Optional[Principal]:
+    """Build the principal from the token claims.
+
+    Returns:
+        Optional[Principal]: None if the token was issued without claims.
+    """
+    if "role" not in payload:
+        return None
+    return Principal(
+        id=int(payload["sub"]),
+        role=Role(payload["role"]),
+        group_id=payload.get("group_id"),
+        is_verified=bool(payload.get("is_verified")),
+        from_claims=True,
+    )
+
+
+class ClaimsJWTStrategy(JWTStrategy[UserIdentity, int]):
+    """Represent a JWT strategy that optionally signs the caller claims into tokens.
+
+    Attributes:
+        include_claims (bool): Whether role, group and verification status are signed in.
+        group_id_loader (GroupIdLoader): Look up the group of a student by its id.
+    """
+
+    def __init__(
+            self,
+            secret: str,
+            lifetime_seconds: int,
+            include_claims: bool,
+            group_id_loader: GroupIdLoader,
+    ) -> None:
+        super().__init__(
+            secret=secret,
+            lifetime_seconds=lifetime_seconds,
+            token_audience=[JWT_AUDIENCE],
+            algorithm=JWT_ALGORITHM,
+        )
+        self.include_claims = include_claims
+        self.group_id_loader = group_id_loader
+
+    async def write_token(self, user: UserIdentity) -> str:
+        data: dict[str, Any] = {"sub": str(user.id), "aud": self.token_audience}
+        if self.include_claims:
+            group_id = None
+            if user.role == Role.STUDENT:
+                group_id = await self.group_id_loader(user.id)
+            data.update(
+                role=user.role.value,
+                group_id=group_id,
+                is_verified=user.is_verified,
+            )
+        return generate_jwt(
+            data, self.encode_key, self.lifetime_seconds, algorithm=self.algorithm
+        )
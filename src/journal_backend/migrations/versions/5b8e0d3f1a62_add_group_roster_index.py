@@ -0,0 +1,37 @@
+"""add group roster index
+
+Revision ID: 5b8e0d3f1a62
+Revises: c41f2a9d7e35
+Create Date: 2024-06-24 10:37:12.904117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e0d3f1a62'
+down_revision: Union[str, None] = 'c41f2a9d7e35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_students_group_id_id',
+            'students',
+            ['group_id', 'id'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_students_group_id_id',
+            table_name='students',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,43 @@
+"""add seconds to class period
+
+Revision ID: 7d5b2f9e3a14
+Revises: 6c3a8e1f4d27
+Create Date: 2024-07-23 09:12:40.517396
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d5b2f9e3a14'
+down_revision: Union[str, None] = '6c3a8e1f4d27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Only the durations with days or months were added depending on the time zone
+RECOMPUTE_PERIODS = (
+    "UPDATE classes SET duration = duration "
+    "WHERE extract(day FROM duration) <> 0 OR extract(month FROM duration) <> 0 "
+    "OR extract(year FROM duration) <> 0"
+)
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE OR REPLACE FUNCTION class_period(starts_at timestamptz, duration interval) "
+        "RETURNS tstzrange LANGUAGE sql IMMUTABLE PARALLEL SAFE "
+        "AS 'SELECT tstzrange(starts_at, "
+        "starts_at + make_interval(secs => extract(epoch FROM duration)))'"
+    )
+    op.execute(RECOMPUTE_PERIODS)
+
+
+def downgrade() -> None:
+    op.execute(
+        "CREATE OR REPLACE FUNCTION class_period(starts_at timestamptz, duration interval) "
+        "RETURNS tstzrange LANGUAGE sql IMMUTABLE PARALLEL SAFE "
+        "AS 'SELECT tstzrange(starts_at, starts_at + duration)'"
+    )
+    op.execute(RECOMPUTE_PERIODS)
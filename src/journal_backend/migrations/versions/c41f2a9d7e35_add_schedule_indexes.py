@@ -0,0 +1,74 @@
+"""add schedule indexes
+
+Revision ID: c41f2a9d7e35
+Revises: 7ebe4bee0222
+Create Date: 2024-06-20 14:02:41.518305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41f2a9d7e35'
+down_revision: Union[str, None] = '7ebe4bee0222'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY does not lock the tables for writes, but cannot run in a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_classes_group_id_starts_at',
+            'classes',
+            ['group_id', 'starts_at'],
+            postgresql_include=['id', 'duration', 'teacher_id', 'subject_id', 'classroom_id'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_classes_teacher_id_starts_at',
+            'classes',
+            ['teacher_id', 'starts_at'],
+            postgresql_include=['id', 'duration', 'group_id', 'subject_id', 'classroom_id'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_classes_starts_at_brin',
+            'classes',
+            ['starts_at'],
+            postgresql_using='brin',
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_academic_reports_class_id',
+            'academic_reports',
+            ['class_id'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_academic_reports_class_id',
+            table_name='academic_reports',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_classes_starts_at_brin',
+            table_name='classes',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_classes_teacher_id_starts_at',
+            table_name='classes',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_classes_group_id_starts_at',
+            table_name='classes',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,130 @@
+from typing import AsyncGenerator
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from journal_backend.config import Config
+from journal_backend.database.base import Base
+from journal_backend.entity.models import *  # noqa
+from journal_backend.entity.students.dto import AcademicReportCreate
+from journal_backend.entity.students.enums import Graduation
+from journal_backend.entity.students.models import AcademicAggregate
+from journal_backend.entity.students.repository import StudentRepository
+from journal_backend.entity.students.verification import (
+    verify_academic_aggregates,
+)
+
+SCHEMA = "academic_aggregates"
+STUDENT_ID = 2
+SEED = [
+    """
+    INSERT INTO user_identity
+        (id, name, surname, email, hashed_password, role, is_active, is_verified)
+    VALUES (1, 'T', 'T', 't@example.com', 'hash', 'TEACHER', true, true),
+           (2, 'S', 'S', 's@example.com', 'hash', 'STUDENT', true, true)
+    """,
+    "INSERT INTO groups (id, name, admission_year) VALUES (1, 'g', 2024)",
+    "INSERT INTO students (id, group_id) VALUES (2, 1)",
+    "INSERT INTO subjects (id, name) VALUES (1, 'math'), (2, 'physics')",
+    # Autumn and spring terms of 2024/25, the last class has no subject
+    """
+    INSERT INTO classes (id, starts_at, duration, group_id, subject_id) VALUES
+        (1, '2024-09-02 09:00+00', interval '90 minutes', 1, 1),
+        (2, '2025-01-31 09:00+00', interval '90 minutes', 1, 1),
+        (3, '2025-02-03 09:00+00', interval '90 minutes', 1, 2),
+        (4, '2025-02-04 09:00+00', interval '90 minutes', 1, NULL)
+    """,
+]
+
+
+async def is_reachable(engine: AsyncEngine) -> bool:
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except Exception:
+        return False
+    return True
+
+
+@pytest_asyncio.fixture
+async def session_factory(
+        config: Config,
+) -> AsyncGenerator[async_sessionmaker[AsyncSession], None]:
+    engine = create_async_engine(
+        config.db.uri,
+        connect_args={"server_settings": {"search_path": SCHEMA}},
+    )
+    if not await is_reachable(engine):
+        await engine.dispose()
+        pytest.skip("a local Postgres instance is required")
+
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await conn.run_sync(Base.metadata.create_all)
+        for stmt in SEED:
+            await conn.execute(text(stmt))
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+    await engine.dispose()
+
+
+async def aggregates(
+        session_factory: async_sessionmaker[AsyncSession],
+) -> dict[tuple[int, int], tuple[int, ...]]:
+    async with session_factory() as session:
+        rows = await session.scalars(select(AcademicAggregate))
+        return {
+            (row.subject_id, row.term): (
+                row.reports_count, row.attended_count, row.graded_count, row.grade_sum
+            )
+            for row in rows
+        }
+
+
+@pytest.mark.asyncio
+async def test_reports_update_their_aggregates(
+        session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    async with session_factory() as session:
+        await StudentRepository(session).create_academic_reports([
+            AcademicReportCreate(STUDENT_ID, 1, True, Graduation.GOOD),
+            AcademicReportCreate(STUDENT_ID, 2, False),
+            AcademicReportCreate(STUDENT_ID, 3, True, Graduation.EXCELLENT),
+            AcademicReportCreate(STUDENT_ID, 4, True, Graduation.TERRIBLY),
+        ])
+    async with session_factory() as session:
+        await StudentRepository(session).create_academic_reports([
+            AcademicReportCreate(STUDENT_ID, 2, True, Graduation.SATISFACTORILY),
+        ])
+
+    assert await aggregates(session_factory) == {
+        (1, 20241): (2, 2, 2, 7),
+        (2, 20242): (1, 1, 1, 5),
+    }
+    assert await verify_academic_aggregates(session_factory) == 0
+
+
+@pytest.mark.asyncio
+async def test_verification_fixes_the_aggregates(
+        session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    async with session_factory() as session:
+        await StudentRepository(session).create_academic_reports([
+            AcademicReportCreate(STUDENT_ID, 1, True, Graduation.GOOD),
+        ])
+        # Moved to another subject behind the aggregates' back
+        await session.execute(text("UPDATE classes SET subject_id = 2 WHERE id = 1"))
+        await session.execute(update(AcademicAggregate).values(grade_sum=0))
+        await session.commit()
+
+    assert await verify_academic_aggregates(session_factory) == 2
+    assert await aggregates(session_factory) == {(2, 20241): (1, 1, 1, 4)}
@@ -0,0 +1,170 @@
+import json
+from datetime import date, timedelta
+from typing import Any, AsyncGenerator, Awaitable, Callable, Iterator
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+)
+
+from journal_backend.config import Config
+from journal_backend.database.base import Base
+from journal_backend.entity.classes.repository import ClassRepository
+from journal_backend.entity.models import *  # noqa
+from journal_backend.entity.students.repository import StudentRepository
+
+# Seeded into its own schema, so the other integration tests keep their tables
+SCHEMA = "query_plans"
+HOT_TABLES = {"classes", "academic_reports"}
+
+GROUPS = 20
+STUDENTS_PER_GROUP = 20
+TEACHERS = 40
+SUBJECTS = 10
+CLASSROOMS = 20
+# Two classes a day for every group during two academic years
+CLASSES = GROUPS * 2 * 365 * 2
+SEED = [
+    f"""
+    INSERT INTO user_identity
+        (id, name, surname, email, hashed_password, role, is_active, is_verified)
+    SELECT i, 'name', 'surname', 'user' || i || '@example.com', 'hash',
+           (CASE WHEN i <= {TEACHERS} THEN 'TEACHER' ELSE 'STUDENT' END)::role, true, true
+    FROM generate_series(1, {TEACHERS + GROUPS * STUDENTS_PER_GROUP}) AS i
+    """,
+    f"""
+    INSERT INTO groups (id, name, admission_year)
+    SELECT i, 'group' || i, 2022 FROM generate_series(1, {GROUPS}) AS i
+    """,
+    f"""
+    INSERT INTO students (id, group_id)
+    SELECT {TEACHERS} + i, (i - 1) % {GROUPS} + 1
+    FROM generate_series(1, {GROUPS * STUDENTS_PER_GROUP}) AS i
+    """,
+    f"INSERT INTO teachers (id) SELECT i FROM generate_series(1, {TEACHERS}) AS i",
+    f"""
+    INSERT INTO subjects (id, name)
+    SELECT i, 'subject' || i FROM generate_series(1, {SUBJECTS}) AS i
+    """,
+    f"""
+    INSERT INTO classrooms (id, name)
+    SELECT i, 'room' || i FROM generate_series(1, {CLASSROOMS}) AS i
+    """,
+    f"""
+    INSERT INTO competencies (teacher_id, subject_id)
+    SELECT t, s FROM generate_series(1, {TEACHERS}) AS t, generate_series(1, {SUBJECTS}) AS s
+    """,
+    f"""
+    INSERT INTO classes (id, starts_at, duration, group_id, teacher_id, subject_id, classroom_id)
+    SELECT i,
+           timestamptz '2022-09-01 09:00+00' + (i - 1) / {GROUPS} * interval '12 hours',
+           interval '90 minutes',
+           (i - 1) % {GROUPS} + 1,
+           i % {TEACHERS} + 1,
+           i % {SUBJECTS} + 1,
+           i % {CLASSROOMS} + 1
+    FROM generate_series(1, {CLASSES}) AS i
+    """,
+    """
+    INSERT INTO academic_reports (student_id, class_id, is_attended)
+    SELECT s.id, c.id, true FROM classes AS c JOIN students AS s ON s.group_id = c.group_id
+    """,
+    "ANALYZE",
+]
+
+WEEK_START = date(2023, 3, 6)
+WEEK_END = WEEK_START + timedelta(days=6)
+
+HOT_PATHS: dict[str, Callable[[AsyncSession], Awaitable[Any]]] = {
+    "schedule_by_group": lambda s: ClassRepository(s).get_schedule_by_group_id(
+        3, WEEK_START, WEEK_END
+    ),
+    "schedule_by_teacher": lambda s: ClassRepository(s).get_schedule_by_teacher_id(
+        7, WEEK_START, WEEK_END
+    ),
+    "academic_reports": lambda s: StudentRepository(s).get_academic_reports(
+        TEACHERS + 5, WEEK_START, WEEK_END
+    ),
+    "student_class_exists": lambda s: ClassRepository(s).student_class_exists(3, 1003),
+}
+
+
+async def is_reachable(engine: AsyncEngine) -> bool:
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except Exception:
+        return False
+    return True
+
+
+@pytest_asyncio.fixture(scope="module")
+async def plans_engine(config: Config) -> AsyncGenerator[AsyncEngine, None]:
+    engine = create_async_engine(
+        config.db.uri,
+        connect_args={"server_settings": {"search_path": SCHEMA}},
+    )
+    if not await is_reachable(engine):
+        await engine.dispose()
+        pytest.skip("a local Postgres instance is required")
+
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await conn.run_sync(Base.metadata.create_all)
+        for stmt in SEED:
+            await conn.execute(text(stmt))
+    yield engine
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+    await engine.dispose()
+
+
+async def explain(
+        engine: AsyncEngine,
+        call: Callable[[AsyncSession], Awaitable[Any]],
+) -> list[dict[str, Any]]:
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany) -> None:  # type:ignore
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "after_cursor_execute", capture)
+    try:
+        async with AsyncSession(engine) as session:
+            await call(session)
+    finally:
+        event.remove(engine.sync_engine, "after_cursor_execute", capture)
+
+    plans = []
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = result.scalar_one()
+            plans.append((json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"])
+    return plans
+
+
+def plan_nodes(node: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", HOT_PATHS)
+async def test_hot_path_avoids_seq_scans(plans_engine: AsyncEngine, path: str) -> None:
+    plans = await explain(plans_engine, HOT_PATHS[path])
+
+    assert plans
+    for plan in plans:
+        seq_scans = [
+            node["Relation Name"]
+            for node in plan_nodes(plan)
+            if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in HOT_TABLES
+        ]
+        assert not seq_scans, f"{path} scans {seq_scans} sequentially"
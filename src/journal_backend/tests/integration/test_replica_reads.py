@@ -0,0 +1,54 @@
+import os
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from journal_backend.config import Config
+from journal_backend.database.routing import READ_ONLY, ReplicaRouter
+from journal_backend.database.sa_utils import (
+    create_engine,
+    create_routing_session_maker,
+)
+
+# The replica is any second Postgres instance accepting the test credentials
+REPLICA_PORT_ENV = "JOURNAL_TEST_REPLICA_PORT"
+
+
+async def is_reachable(engine: AsyncEngine) -> bool:
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except Exception:
+        return False
+    return True
+
+
+@pytest.mark.asyncio
+async def test_read_only_session_reads_from_replica(config: Config) -> None:
+    replica_port = os.environ.get(REPLICA_PORT_ENV, str(config.db.port + 1))
+    primary = create_engine(config.db)
+    replica = create_engine(config.db, config.db.make_uri(f"{config.db.host}:{replica_port}"))
+    router = ReplicaRouter(primary, [replica])
+    if not (await is_reachable(primary) and await is_reachable(replica)):
+        await router.aclose()
+        pytest.skip("two local Postgres instances are required")
+
+    primary_checkouts = primary.pool.metrics.checkouts  # type:ignore[attr-defined]
+    replica_checkouts = replica.pool.metrics.checkouts  # type:ignore[attr-defined]
+    try:
+        async with create_routing_session_maker(router)() as session:
+            session.info[READ_ONLY] = True
+            await session.scalar(select(1))
+            assert replica.pool.metrics.checkouts == replica_checkouts + 1  # type:ignore
+            assert primary.pool.metrics.checkouts == primary_checkouts  # type:ignore
+
+            await session.execute(text("SELECT 1"))
+            await session.scalar(select(1))
+            assert primary.pool.metrics.checkouts == primary_checkouts + 1  # type:ignore
+
+        router.mark_unhealthy(replica)
+        await router.check_replicas()
+        assert router.healthy_replicas == [replica]
+    finally:
+        await router.aclose()
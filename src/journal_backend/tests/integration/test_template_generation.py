@@ -0,0 +1,108 @@
+from typing import AsyncGenerator
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from starlette.requests import Request
+from starlette_admin.exceptions import ActionFailed
+
+from journal_backend.admin.loading import ADMIN_SESSION
+from journal_backend.admin.views import ClassTemplateView
+from journal_backend.config import Config
+from journal_backend.database.base import Base
+from journal_backend.entity.classes.models import Class, ClassTemplate
+from journal_backend.entity.models import *  # noqa
+
+SCHEMA = "class_templates"
+SEED = [
+    "INSERT INTO groups (id, name, admission_year) VALUES (1, 'g', 2024)",
+    # Mondays and Tuesdays of the far future, the generation only replaces future classes
+    """
+    INSERT INTO class_templates (id, weekday, every_weeks, starts_on, ends_on, starts_at,
+                                 time_zone, duration, group_id)
+    VALUES (1, 0, 1, '2100-09-06', '2100-09-30', '09:00', 'Europe/Moscow', '90 minutes', 1),
+           (2, 1, 1, '2100-09-06', '2100-09-30', '09:00', 'Europe/Moscow', '90 minutes', 1)
+    """,
+]
+
+
+async def is_reachable(engine: AsyncEngine) -> bool:
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except Exception:
+        return False
+    return True
+
+
+@pytest_asyncio.fixture
+async def session_factory(
+        config: Config,
+) -> AsyncGenerator[async_sessionmaker[AsyncSession], None]:
+    engine = create_async_engine(
+        config.db.uri,
+        connect_args={"server_settings": {"search_path": f"{SCHEMA},public"}},
+    )
+    if not await is_reachable(engine):
+        await engine.dispose()
+        pytest.skip("a local Postgres instance is required")
+
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await conn.run_sync(Base.metadata.create_all)
+        for stmt in SEED:
+            await conn.execute(text(stmt))
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+    await engine.dispose()
+
+
+def admin_request(session: AsyncSession) -> Request:
+    # What `AdminViewMiddleware` leaves in the scope
+    session.info[ADMIN_SESSION] = True
+    return Request({"type": "http", "state": {"session": session}})
+
+
+async def count_classes(session_factory: async_sessionmaker[AsyncSession]) -> int:
+    async with session_factory() as session:
+        return (await session.execute(select(func.count(Class.id)))).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_admin_action_generates_the_templates(
+        session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    async with session_factory() as session:
+        message = await ClassTemplateView(ClassTemplate).generate(
+            admin_request(session), ["1", "2"]
+        )
+
+    assert message == "8 classes created, 0 future classes replaced"
+    assert await count_classes(session_factory) == 8
+
+
+@pytest.mark.asyncio
+async def test_admin_action_applies_no_template_on_conflict(
+        session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    async with session_factory() as session:
+        # The group already has a class on the first Tuesday
+        await session.execute(text(
+            "INSERT INTO classes (starts_at, duration, group_id) "
+            "VALUES ('2100-09-07 06:30+00', interval '1 hour', 1)"
+        ))
+        await session.commit()
+
+    async with session_factory() as session:
+        with pytest.raises(ActionFailed, match="Template 2:.*no template was applied"):
+            await ClassTemplateView(ClassTemplate).generate(admin_request(session), ["1", "2"])
+
+    assert await count_classes(session_factory) == 1
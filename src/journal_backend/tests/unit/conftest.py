@@ -1,4 +1,5 @@
-from unittest.mock import AsyncMock, Mock
+from typing import Any, Callable
+from unittest.mock import AsyncMock, MagicMock, Mock
 
 import pytest
 from fastapi import FastAPI
@@ -8,6 +9,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from journal_backend.app_setup import create_app, initialise_routers
 from journal_backend.config import Config
 from journal_backend.depends_stub import Stub
+from journal_backend.entity.classes.cache import ScheduleCache
+from journal_backend.entity.classes.timetable import TimetableIndex
+from journal_backend.entity.common.password_hasher import PasswordHasher
 from journal_backend.entity.students.dependencies import get_student_service
 from journal_backend.entity.students.service import StudentService
 from journal_backend.entity.teachers.dependencies import get_teacher_service
@@ -16,6 +20,48 @@ from journal_backend.entity.users.dependencies import get_user_service
 from journal_backend.entity.users.service import UserService
 
 
+class CapturingSession:
+    """Record the statements sent by a repository instead of running them."""
+
+    def __init__(self) -> None:
+        self.statements: list[Any] = []
+
+    async def execute(self, stmt: Any, params: Any = None) -> AsyncMock:
+        self.statements.append(stmt)
+        return AsyncMock(all=lambda: [])
+
+    async def scalar(self, stmt: Any) -> None:
+        self.statements.append(stmt)
+
+    async def scalars(self, stmt: Any) -> MagicMock:
+        self.statements.append(stmt)
+        return MagicMock()
+
+    async def commit(self) -> None:
+        pass
+
+
+@pytest.fixture(scope="function")
+def capturing_session() -> CapturingSession:
+    return CapturingSession()
+
+
+@pytest.fixture(scope="function")
+def make_student_service() -> Callable[..., StudentService]:
+    def make(repo: Any, schedule_cache: Any = None) -> StudentService:
+        return StudentService(
+            repo,
+            AsyncMock(),
+            AsyncMock(),
+            AsyncMock(),
+            AsyncMock(),
+            AsyncMock(),
+            schedule_cache or AsyncMock(),
+        )
+
+    return make
+
+
 @pytest.fixture(scope="function")
 def config_mock() -> Mock:
     return Mock()
@@ -49,8 +95,11 @@ def init_basic_dependencies(
         report_repo_mock: Mock
 ):
     session_mock = AsyncMock()
+    password_hasher_mock = AsyncMock()
+    password_hasher_mock.hash.return_value = "hashed_password"
     config_mock.app.jwt_lifetime_seconds = 5
     config_mock.app.jwt_secret = "secret"
+    config_mock.app.jwt_claims = False
     config_mock.smtp.email = "randomshit@gmail.com"
 
     app.dependency_overrides[Stub(UserService)] = get_user_service
@@ -58,6 +107,9 @@ def init_basic_dependencies(
     app.dependency_overrides[Stub(TeacherService)] = get_teacher_service
     app.dependency_overrides[Stub(AsyncSession)] = lambda: session_mock
     app.dependency_overrides[Stub(Config)] = lambda: config_mock
+    app.dependency_overrides[Stub(PasswordHasher)] = lambda: password_hasher_mock
+    app.dependency_overrides[Stub(ScheduleCache)] = lambda: AsyncMock()
+    app.dependency_overrides[Stub(TimetableIndex)] = lambda: Mock()
 
 
 @pytest.fixture(scope="function")
@@ -0,0 +1,83 @@
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from journal_backend.entity.classes.models import Class
+from journal_backend.entity.models import *  # noqa
+from journal_backend.entity.students.aggregates import (
+    AggregateDelta,
+    aggregate_deltas,
+    term_expr,
+)
+from journal_backend.entity.students.dto import (
+    AcademicReportCreate,
+    aggregate_to_read_dto,
+)
+from journal_backend.entity.students.enums import Graduation
+from journal_backend.entity.students.models import AcademicAggregate
+
+CLASS_TERMS = {10: (1, 20241), 11: (1, 20241), 12: (2, 20242), 13: (None, 20241)}
+
+
+def test_new_reports_are_added() -> None:
+    deltas = aggregate_deltas([], [
+        AcademicReportCreate(7, 10, True, Graduation.GOOD),
+        AcademicReportCreate(7, 11, False),
+        AcademicReportCreate(7, 12, True, Graduation.EXCELLENT),
+        AcademicReportCreate(7, 13, True, Graduation.TERRIBLY),
+    ], CLASS_TERMS)
+
+    assert deltas == {
+        (7, 1, 20241): AggregateDelta(
+            reports_count=2, attended_count=1, graded_count=1, grade_sum=4
+        ),
+        (7, 2, 20242): AggregateDelta(
+            reports_count=1, attended_count=1, graded_count=1, grade_sum=5
+        ),
+    }
+
+
+def test_replaced_reports_are_subtracted() -> None:
+    old = [
+        AcademicReportCreate(7, 10, False),
+        AcademicReportCreate(7, 11, True, Graduation.GOOD),
+    ]
+    new = [
+        AcademicReportCreate(7, 10, True, Graduation.SATISFACTORILY),
+        AcademicReportCreate(7, 11, True, Graduation.GOOD),
+    ]
+
+    assert aggregate_deltas(old, new, CLASS_TERMS) == {
+        (7, 1, 20241): AggregateDelta(attended_count=1, graded_count=1, grade_sum=3),
+    }
+    assert aggregate_deltas(new, new, CLASS_TERMS) == {}
+
+
+def test_term_of_class_start() -> None:
+    sql = str(
+        select(term_expr(Class.starts_at)).compile(
+            dialect=postgresql.dialect(),  # type:ignore[no-untyped-call]
+            compile_kwargs={"literal_binds": True},
+        )
+    )
+
+    assert "timezone('UTC', classes.starts_at) - INTERVAL '8 months'" in sql
+    assert "EXTRACT(month FROM" in sql
+
+
+def test_read_dto_derives_the_rates() -> None:
+    aggregate: Any = AcademicAggregate(
+        student_id=7, subject_id=1, term=20241,
+        reports_count=4, attended_count=3, graded_count=2, grade_sum=9,
+    )
+
+    read = aggregate_to_read_dto(aggregate, "Math")
+
+    assert read.average_grade == 4.5
+    assert read.attendance_rate == 0.75
+    empty = AcademicAggregate(
+        student_id=7, subject_id=1, term=20241,
+        reports_count=0, attended_count=0, graded_count=0, grade_sum=0,
+    )
+    assert aggregate_to_read_dto(empty, "Math").average_grade is None
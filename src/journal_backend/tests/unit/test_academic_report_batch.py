@@ -0,0 +1,72 @@
+from typing import Any, Callable
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from journal_backend.entity.classes.exceptions import ClassNotFound
+from journal_backend.entity.models import *  # noqa
+from journal_backend.entity.students import exceptions
+from journal_backend.entity.students.dto import AcademicReportCreate
+from journal_backend.entity.students.enums import Graduation
+from journal_backend.entity.students.repository import StudentRepository
+from journal_backend.entity.students.service import StudentService
+from journal_backend.entity.users.dto import Principal
+from journal_backend.entity.users.enums import Role
+
+TEACHER = Principal(id=1, role=Role.TEACHER, is_verified=True)
+
+
+@pytest.mark.asyncio
+async def test_batch_is_validated_and_written_by_one_statement_each(
+        capturing_session: Any,
+        make_student_service: Callable[..., StudentService],
+) -> None:
+    repo = StudentRepository(capturing_session)
+    reports = [AcademicReportCreate(i, 100 + i, True, Graduation.GOOD) for i in range(30)]
+
+    await make_student_service(repo).create_academic_reports(reports, TEACHER)
+
+    validate, _lock, _saved, _classes, upsert = capturing_session.statements
+    validate_sql = str(validate.compile(dialect=postgresql.dialect()))  # type:ignore
+    assert "unnest" in validate_sql
+    assert len(validate.compile().params) == 2
+    upsert_sql = str(upsert.compile(dialect=postgresql.dialect()))  # type:ignore
+    assert upsert_sql.count("ON CONFLICT") == 1
+    assert "grade = excluded.grade" in upsert_sql
+
+
+@pytest.mark.asyncio
+async def test_duplicate_reports_keep_the_last(
+        make_student_service: Callable[..., StudentService],
+) -> None:
+    repo = AsyncMock()
+    repo.find_invalid_reports.return_value = []
+    first = AcademicReportCreate(1, 2, False)
+    last = AcademicReportCreate(1, 2, True, Graduation.EXCELLENT)
+
+    await make_student_service(repo).create_academic_reports([first, last], TEACHER)
+
+    repo.create_academic_reports.assert_awaited_once_with([last])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "invalid, error",
+    [
+        ([(1, 2, True), (3, 4, False)], exceptions.StudentNotFound),
+        ([(1, 2, True)], ClassNotFound),
+    ],
+)
+async def test_invalid_batch_is_not_written(
+        invalid: list[tuple[int, int, bool]],
+        error: type[Exception],
+        make_student_service: Callable[..., StudentService],
+) -> None:
+    repo = AsyncMock()
+    repo.find_invalid_reports.return_value = invalid
+    reports = [AcademicReportCreate(1, 2, True), AcademicReportCreate(3, 4, True)]
+
+    with pytest.raises(error):
+        await make_student_service(repo).create_academic_reports(reports, TEACHER)
+    repo.create_academic_reports.assert_not_awaited()
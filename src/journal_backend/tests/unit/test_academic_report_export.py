@@ -0,0 +1,89 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import Any, AsyncGenerator
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from journal_backend.entity.common.streaming import ClosingStreamingResponse
+from journal_backend.entity.models import *  # noqa
+from journal_backend.entity.students.enums import Graduation
+from journal_backend.entity.students.export import (
+    EXPORT_COLUMNS,
+    academic_reports_export,
+    encode_csv,
+    encode_ndjson,
+)
+
+ROW = (
+    7, "Ivanov", "Ivan", "g", 42,
+    datetime(2024, 9, 2, 9, tzinfo=timezone.utc), None, True, Graduation.GOOD,
+)
+
+
+def compiled_sql(group_id: Any) -> str:
+    return str(academic_reports_export(group_id).compile(dialect=postgresql.dialect()))  # type:ignore[no-untyped-call]
+
+
+def test_export_follows_the_report_index() -> None:
+    sql = compiled_sql(None)
+
+    assert "WHERE" not in sql
+    assert sql.endswith(
+        "ORDER BY academic_reports.student_id, academic_reports.class_id"
+    )
+    assert "students.group_id = " in compiled_sql(1)
+
+
+def test_encode_csv() -> None:
+    assert encode_csv([EXPORT_COLUMNS, ROW]) == (
+        "student_id,surname,name,group,class_id,starts_at,subject,is_attended,grade\n"
+        "7,Ivanov,Ivan,g,42,2024-09-02T09:00:00+00:00,,True,GOOD\n"
+    )
+
+
+def test_encode_ndjson() -> None:
+    lines = encode_ndjson([ROW, ROW]).splitlines()
+
+    assert len(lines) == 2
+    assert json.loads(lines[0]) == {
+        "student_id": 7,
+        "surname": "Ivanov",
+        "name": "Ivan",
+        "group": "g",
+        "class_id": 42,
+        "starts_at": "2024-09-02T09:00:00+00:00",
+        "subject": None,
+        "is_attended": True,
+        "grade": "GOOD",
+    }
+
+
+@pytest.mark.asyncio
+async def test_response_closes_the_generator_on_disconnect() -> None:
+    closed = asyncio.Event()
+    sent = asyncio.Event()
+
+    async def rows() -> AsyncGenerator[str, None]:
+        try:
+            while True:
+                yield "row\n"
+                await asyncio.sleep(0)
+        finally:
+            closed.set()
+
+    async def receive() -> Any:
+        await sent.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Any) -> None:
+        if message["type"] == "http.response.body":
+            sent.set()
+            # The client is gone, the response is cancelled while sending
+            await asyncio.Event().wait()
+
+    response = ClosingStreamingResponse(rows(), media_type="text/csv")
+    await asyncio.wait_for(response({"type": "http"}, receive, send), timeout=1)
+
+    assert closed.is_set()
@@ -0,0 +1,179 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, AsyncIterator
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    async_sessionmaker,
+    create_async_engine,
+)
+from starlette import status
+
+from journal_backend.depends_stub import Stub
+from journal_backend.entity.classes.cache import ScheduleCache
+from journal_backend.entity.classes.enums import ConflictKind
+from journal_backend.entity.common.job_queue import JobQueue
+from journal_backend.entity.imports.dto import ImportProgress
+from journal_backend.entity.imports.enums import ImportFormat
+from journal_backend.entity.imports.exceptions import (
+    ConflictingClasses,
+    ImportFormatError,
+    InvalidImportId,
+)
+from journal_backend.entity.imports.importer import (
+    BulkImporter,
+    iter_lines,
+    read_rows,
+)
+from journal_backend.entity.imports.targets import ACADEMIC_REPORTS, CLASSES
+from journal_backend.entity.models import *  # noqa
+from journal_backend.entity.students.verification import VERIFY_AGGREGATES_JOB
+from journal_backend.entity.users.dependencies import current_user
+from journal_backend.entity.users.dto import Principal
+from journal_backend.entity.users.enums import Role
+
+
+async def stream(*items: Any) -> AsyncIterator[Any]:
+    for item in items:
+        yield item
+
+
+async def collect(items: AsyncIterator[Any]) -> list[Any]:
+    return [item async for item in items]
+
+
+@pytest.mark.asyncio
+async def test_lines_split_across_chunks() -> None:
+    text = "﻿student_id,class_id\n1,2\r\nπ,3\n4,5".encode()
+    chunks = [text[i:i + 3] for i in range(0, len(text), 3)]
+
+    lines = await collect(iter_lines(stream(*chunks)))
+
+    assert lines == ["student_id,class_id", "1,2\r", "π,3", "4,5"]
+
+
+@pytest.mark.asyncio
+async def test_csv_rows_are_numbered_and_resumed() -> None:
+    lines = stream(
+        "student_id,class_id,grade,is_attended",
+        "1,10,EXCELLENT,yes",
+        "",
+        "2,10,3,0",
+        "3,11,,",
+    )
+
+    rows = await collect(read_rows(lines, ImportFormat.CSV, ACADEMIC_REPORTS, skip=1))
+
+    assert rows == [(2, 2, 10, False, "SATISFACTORILY"), (3, 3, 11, False, None)]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_classes() -> None:
+    lines = stream(
+        '{"id": 7, "starts_at": "2024-09-02T09:00:00", "group_id": 1, "duration": 45}',
+    )
+
+    rows = await collect(read_rows(lines, ImportFormat.NDJSON, CLASSES))
+
+    assert rows == [(
+        1, 7, datetime(2024, 9, 2, 9, tzinfo=timezone.utc),
+        timedelta(minutes=45), 1, None, None, None,
+    )]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("fmt", "lines", "line"),
+    [
+        (ImportFormat.CSV, ["student_id,grade", "1,A"], 0),
+        (ImportFormat.CSV, ["student_id,class_id,grade", "1,2,5", "1,2,BRILLIANT"], 2),
+        (ImportFormat.NDJSON, ['{"student_id": 1, "class_id": 2}', "[1, 2]"], 2),
+        (ImportFormat.NDJSON, ['{"student_id": true, "class_id": 2}'], 1),
+    ],
+)
+async def test_malformed_rows(fmt: ImportFormat, lines: list[str], line: int) -> None:
+    with pytest.raises(ImportFormatError) as e:
+        await collect(read_rows(stream(*lines), fmt, ACADEMIC_REPORTS))
+
+    assert e.value.line == line
+
+
+@pytest.mark.parametrize("import_id", ["", "2024; DROP TABLE classes", "Spring", "x" * 33])
+def test_import_id_is_checked(import_id: str) -> None:
+    engine = create_async_engine("postgresql+asyncpg://localhost/journal")
+
+    with pytest.raises(InvalidImportId):
+        BulkImporter(engine, CLASSES, import_id)
+
+
+def test_uploaded_import_verifies_aggregates(
+        client: TestClient,
+        app: FastAPI,
+        config_mock: Mock,
+        monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    importer = Mock()
+    importer.return_value.run = AsyncMock(
+        return_value=ImportProgress(import_id="2024-fall", kind="academic_reports")
+    )
+    monkeypatch.setattr("journal_backend.entity.imports.router.BulkImporter", importer)
+    job_queue = AsyncMock()
+    config_mock.jobs.enabled = True
+    app.dependency_overrides[Stub(AsyncEngine)] = lambda: Mock()
+    app.dependency_overrides[Stub(JobQueue)] = lambda: job_queue
+    app.dependency_overrides[Stub(async_sessionmaker)] = lambda: Mock()
+    app.dependency_overrides[current_user] = lambda: Principal(
+        id=1, role=Role.ADMIN, is_verified=True
+    )
+
+    resp = client.post("/imports/2024-fall/academic_reports", content=b"student_id,class_id\n")
+
+    assert resp.status_code == status.HTTP_200_OK
+    job_queue.enqueue.assert_awaited_once_with(VERIFY_AGGREGATES_JOB, {})
+
+
+@pytest.mark.asyncio
+async def test_finished_import_leaves_no_staging_table() -> None:
+    conn = AsyncMock()
+    conn.execute.return_value = Mock(one=lambda: SimpleNamespace(
+        import_id="fall_2024", kind="classes", staged_rows=10, merged_rows=10,
+        invalid_rows=0, is_staged=True, is_finished=True,
+    ))
+    engine = Mock()
+    engine.connect.return_value.__aenter__ = AsyncMock(return_value=conn)
+    engine.connect.return_value.__aexit__ = AsyncMock(return_value=False)
+
+    progress = await BulkImporter(engine, CLASSES, "fall_2024").run(stream(), ImportFormat.CSV)
+
+    assert progress.is_finished
+    statements = [str(call.args[0]) for call in conn.execute.await_args_list]
+    assert not any("CREATE" in stmt for stmt in statements)
+
+
+def test_failed_import_keeps_its_status_without_redis(
+        client: TestClient,
+        app: FastAPI,
+        monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    importer = Mock()
+    importer.return_value.run = AsyncMock(side_effect=ConflictingClasses(ConflictKind.GROUP))
+    monkeypatch.setattr("journal_backend.entity.imports.router.BulkImporter", importer)
+    schedule_cache = AsyncMock()
+    schedule_cache.invalidate_all.side_effect = RedisConnectionError
+    app.dependency_overrides[Stub(AsyncEngine)] = lambda: Mock()
+    app.dependency_overrides[Stub(ScheduleCache)] = lambda: schedule_cache
+    app.dependency_overrides[Stub(JobQueue)] = lambda: AsyncMock()
+    app.dependency_overrides[Stub(async_sessionmaker)] = lambda: Mock()
+    app.dependency_overrides[current_user] = lambda: Principal(
+        id=1, role=Role.ADMIN, is_verified=True
+    )
+
+    resp = client.post("/imports/2024-fall/classes", content=b"starts_at\n")
+
+    assert resp.status_code == status.HTTP_409_CONFLICT
+    schedule_cache.invalidate_all.assert_awaited_once()
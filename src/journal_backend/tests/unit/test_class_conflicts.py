@@ -0,0 +1,152 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+from starlette import status
+from starlette_admin.exceptions import FormValidationError
+
+from journal_backend.admin.views import ClassView
+from journal_backend.depends_stub import Stub
+from journal_backend.entity.classes.conflicts import (
+    batch_conflicts,
+    conflict_kind,
+)
+from journal_backend.entity.classes.dto import ClassConflict, ProposedClass
+from journal_backend.entity.classes.enums import ConflictKind
+from journal_backend.entity.classes.models import Class
+from journal_backend.entity.classes.repository import (
+    ClassRepository,
+    find_conflicts_stmt,
+)
+from journal_backend.entity.models import *  # noqa
+from journal_backend.entity.users.dependencies import current_user
+from journal_backend.entity.users.dto import Principal
+from journal_backend.entity.users.enums import Role
+
+MONDAY = datetime(2024, 9, 2, 9, 0, tzinfo=timezone.utc)
+
+
+class ExclusionViolation(Exception):
+    sqlstate = "23P01"
+
+
+def exclusion_error(constraint: str) -> IntegrityError:
+    orig = ExclusionViolation(
+        f'conflicting key value violates exclusion constraint "{constraint}"'
+    )
+    return IntegrityError("INSERT INTO classes ...", {}, orig)
+
+
+def proposal(
+        hours: float,
+        group_id: int = 1,
+        teacher_id: Optional[int] = None,
+        classroom_id: Optional[int] = None,
+) -> ProposedClass:
+    return ProposedClass(
+        starts_at=MONDAY + timedelta(hours=hours),
+        group_id=group_id,
+        teacher_id=teacher_id,
+        classroom_id=classroom_id,
+    )
+
+
+def test_overlaps_within_the_batch() -> None:
+    proposals = [
+        proposal(0, teacher_id=7, classroom_id=3),
+        # Starts when the first ends, the periods are half-open
+        proposal(1.5, teacher_id=7, classroom_id=3),
+        proposal(2, group_id=2, teacher_id=7),
+        proposal(0.5, group_id=3, classroom_id=3),
+    ]
+
+    conflicts = batch_conflicts(proposals)
+
+    assert sorted(conflicts, key=lambda c: (c.index, c.kind)) == [
+        ClassConflict(index=1, kind=ConflictKind.CLASSROOM, other_index=3),
+        ClassConflict(index=2, kind=ConflictKind.TEACHER, other_index=1),
+        ClassConflict(index=3, kind=ConflictKind.CLASSROOM, other_index=0),
+    ]
+
+
+def test_nested_class_conflicts_with_the_longest() -> None:
+    proposals = [
+        ProposedClass(starts_at=MONDAY, duration=timedelta(hours=4), group_id=1),
+        proposal(1),
+        proposal(3),
+    ]
+
+    assert batch_conflicts(proposals) == [
+        ClassConflict(index=1, kind=ConflictKind.GROUP, other_index=0),
+        ClassConflict(index=2, kind=ConflictKind.GROUP, other_index=0),
+    ]
+
+
+def test_class_duration_must_be_positive() -> None:
+    with pytest.raises(ValueError):
+        ProposedClass(starts_at=MONDAY, duration=timedelta(0), group_id=1)
+
+
+def test_exclusion_violation_is_mapped_to_its_kind() -> None:
+    assert conflict_kind(exclusion_error("ex_classes_teacher_period")) == ConflictKind.TEACHER
+    assert conflict_kind(exclusion_error("ex_other")) is None
+    assert conflict_kind(IntegrityError("INSERT", {}, Exception("unique"))) is None
+
+
+def test_admin_form_shows_the_conflict() -> None:
+    view = ClassView(Class)
+
+    with pytest.raises(FormValidationError) as exc_info:
+        view.handle_exception(exclusion_error("ex_classes_classroom_period"))
+
+    assert list(exc_info.value.errors) == ["classroom"]
+
+
+def test_conflicts_are_found_in_one_statement() -> None:
+    stmt = find_conflicts_stmt([proposal(0), proposal(2, teacher_id=7)])
+
+    sql = str(stmt.compile(dialect=postgresql.dialect()))  # type:ignore[no-untyped-call]
+
+    assert sql.count("UNION ALL") == 2
+    assert sql.count("class_period(proposed.starts_at, proposed.duration)") == 3
+    for name in ("group_id", "teacher_id", "classroom_id"):
+        assert f"classes.{name} = proposed.{name}" in sql
+
+
+def test_check_conflicts_merges_both_checks(client: TestClient, app: FastAPI) -> None:
+    repo_mock = AsyncMock()
+    repo_mock.find_conflicts.return_value = [
+        ClassConflict(index=1, kind=ConflictKind.CLASSROOM, class_id=40),
+    ]
+    app.dependency_overrides[Stub(ClassRepository)] = lambda: repo_mock
+    app.dependency_overrides[current_user] = lambda: Principal(
+        id=1, role=Role.ADMIN, is_verified=True
+    )
+    body = [
+        {"starts_at": MONDAY.isoformat(), "group_id": 1, "classroom_id": 3},
+        {"starts_at": MONDAY.isoformat(), "group_id": 1, "classroom_id": 4},
+    ]
+
+    resp = client.post("/classes/conflicts", json=body)
+
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.json() == [
+        {"index": 1, "kind": "classroom", "class_id": 40, "other_index": None},
+        {"index": 1, "kind": "group", "class_id": None, "other_index": 0},
+    ]
+
+
+def test_check_conflicts_is_for_admins(client: TestClient, app: FastAPI) -> None:
+    app.dependency_overrides[Stub(ClassRepository)] = lambda: AsyncMock()
+    app.dependency_overrides[current_user] = lambda: Principal(
+        id=1, role=Role.TEACHER, is_verified=True
+    )
+
+    resp = client.post("/classes/conflicts", json=[])
+
+    assert resp.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,247 @@
+from datetime import date, datetime, time, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock
+from zoneinfo import ZoneInfo
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette import status
+from starlette.requests import Request
+from starlette_admin.exceptions import FormValidationError
+
+from journal_backend.admin.views import ClassTemplateView
+from journal_backend.depends_stub import Stub
+from journal_backend.entity.classes.cache import CHANGED_SCHEDULES
+from journal_backend.entity.classes.dto import (
+    ClassConflict,
+    OccurrenceConflict,
+    TemplateGeneration,
+)
+from journal_backend.entity.classes.enums import ConflictKind, ScheduleOwner
+from journal_backend.entity.classes.exceptions import (
+    InvalidTimeZone,
+    OccurrencesConflict,
+)
+from journal_backend.entity.classes.models import ClassTemplate
+from journal_backend.entity.classes.service import ClassService
+from journal_backend.entity.classes.templates import expand_template
+from journal_backend.entity.classes.timetable import CHANGED_CLASSES
+from journal_backend.entity.models import *  # noqa
+from journal_backend.entity.users.dependencies import current_user
+from journal_backend.entity.users.dto import Principal
+from journal_backend.entity.users.enums import Role
+
+BERLIN = ZoneInfo("Europe/Berlin")
+NOW = datetime(2024, 9, 1, tzinfo=timezone.utc)
+
+
+def make_template(**values: Any) -> ClassTemplate:
+    return ClassTemplate(**{
+        "id": 1,
+        "weekday": 0,
+        "every_weeks": 1,
+        "starts_on": date(2024, 9, 4),
+        "ends_on": date(2024, 9, 30),
+        "skipped_dates": [],
+        "starts_at": time(9, 0),
+        "time_zone": "UTC",
+        "duration": timedelta(minutes=90),
+        "group_id": 2,
+        "teacher_id": 7,
+        "classroom_id": 3,
+        **values,
+    })
+
+
+def monday(day: int, zone: object = timezone.utc, hour: int = 9) -> datetime:
+    return datetime(2024, 9, day, hour, tzinfo=zone)  # type:ignore[arg-type]
+
+
+def test_template_starts_on_its_weekday_after_its_first_day() -> None:
+    starts = expand_template(make_template(skipped_dates=[date(2024, 9, 16)]), after=NOW)
+
+    assert starts == [monday(9), monday(23), monday(30)]
+
+
+def test_template_repeats_every_few_weeks_from_now_on() -> None:
+    template = make_template(every_weeks=2, starts_on=date(2024, 9, 2))
+
+    assert expand_template(template, after=NOW) == [monday(2), monday(16), monday(30)]
+    assert expand_template(template, after=monday(2, hour=10)) == [monday(16), monday(30)]
+
+
+def test_template_keeps_its_local_time() -> None:
+    template = make_template(
+        starts_on=date(2024, 10, 21), ends_on=date(2024, 11, 1), time_zone="Europe/Berlin"
+    )
+
+    first, second = expand_template(template, after=NOW)
+
+    assert (first.astimezone(BERLIN).hour, second.astimezone(BERLIN).hour) == (9, 9)
+    # Summer time ends in between
+    assert second.astimezone(timezone.utc) - first.astimezone(timezone.utc) == timedelta(
+        weeks=1, hours=1
+    )
+
+
+def make_service(template: ClassTemplate) -> tuple[ClassService, AsyncMock]:
+    repo = AsyncMock()
+    repo.session.info = {}
+    repo.get_template.return_value = template
+    repo.delete_future_occurrences.return_value = [
+        SimpleNamespace(id=10, group_id=2, teacher_id=8),
+    ]
+    repo.get_future_occurrences.return_value = [monday(23)]
+    repo.find_conflicts.return_value = []
+    return ClassService(repo), repo
+
+
+@pytest.mark.asyncio
+async def test_generation_replaces_the_future_occurrences() -> None:
+    service, repo = make_service(make_template())
+    repo.insert_occurrences.return_value = [
+        SimpleNamespace(id=20 + day, starts_at=monday(day), duration=timedelta(minutes=90),
+                        group_id=2, teacher_id=7, classroom_id=3)
+        for day in (9, 16, 30)
+    ]
+
+    generation = await service.generate_template(1, now=NOW)
+
+    assert generation == TemplateGeneration(created=3, deleted=1)
+    # The graded occurrence of the 23rd was kept
+    template_id, starts = repo.insert_occurrences.call_args.args
+    assert starts == [monday(9), monday(16), monday(30)]
+    assert repo.session.info[CHANGED_SCHEDULES] == {
+        (ScheduleOwner.GROUP, 2), (ScheduleOwner.TEACHER, 7), (ScheduleOwner.TEACHER, 8)
+    }
+    changed = repo.session.info[CHANGED_CLASSES]
+    assert changed[10] is None
+    assert sorted(changed) == [10, 29, 36, 50]
+    repo.session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_generation_saves_nothing_on_conflicts() -> None:
+    service, repo = make_service(make_template())
+    repo.find_conflicts.return_value = [
+        ClassConflict(index=1, kind=ConflictKind.CLASSROOM, class_id=40),
+    ]
+
+    with pytest.raises(OccurrencesConflict) as exc_info:
+        await service.generate_template(1, now=NOW)
+
+    assert exc_info.value.conflicts == [
+        OccurrenceConflict(starts_at=monday(16), kind=ConflictKind.CLASSROOM, class_id=40),
+    ]
+    repo.insert_occurrences.assert_not_awaited()
+    repo.session.rollback.assert_awaited_once()
+    repo.session.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_templates_are_generated_all_or_none() -> None:
+    service, repo = make_service(make_template())
+    repo.insert_occurrences.return_value = []
+    repo.find_conflicts.side_effect = [
+        [],
+        [ClassConflict(index=0, kind=ConflictKind.GROUP, class_id=40)],
+    ]
+
+    with pytest.raises(OccurrencesConflict) as exc_info:
+        await service.generate_templates([1, 2], now=NOW)
+
+    assert exc_info.value.template_id == 2
+    repo.session.rollback.assert_awaited_once()
+    repo.session.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_template_with_unknown_time_zone_changes_nothing() -> None:
+    service, repo = make_service(make_template(time_zone="Europe/Moskow"))
+
+    with pytest.raises(InvalidTimeZone) as exc_info:
+        await service.generate_template(1, now=NOW)
+
+    assert exc_info.value.template_id == 1
+    repo.delete_future_occurrences.assert_not_awaited()
+    repo.session.commit.assert_not_awaited()
+
+
+def test_generate_endpoint_rejects_unknown_time_zone(client: TestClient, app: FastAPI) -> None:
+    service_mock = AsyncMock()
+    service_mock.generate_template.side_effect = InvalidTimeZone("Europe/Moskow", 1)
+    app.dependency_overrides[Stub(ClassService)] = lambda: service_mock
+    app.dependency_overrides[current_user] = lambda: Principal(
+        id=1, role=Role.ADMIN, is_verified=True
+    )
+
+    resp = client.post("/classes/templates/1/generate")
+
+    assert resp.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert "Europe/Moskow" in resp.json()["detail"]
+
+
+def template_form(**values: Any) -> dict[str, Any]:
+    return {
+        "time_zone": "Europe/Berlin",
+        "duration": time(1, 30),
+        "group": SimpleNamespace(id=2),
+        "teacher": None,
+        "subject": None,
+        **values,
+    }
+
+
+@pytest.mark.asyncio
+async def test_template_form_without_teacher_nor_subject() -> None:
+    data = template_form()
+
+    await ClassTemplateView(ClassTemplate).validate(Request({"type": "http"}), data)
+
+    assert data["duration"] == timedelta(minutes=90)
+
+
+@pytest.mark.asyncio
+async def test_template_form_rejects_unknown_time_zone() -> None:
+    with pytest.raises(FormValidationError) as exc_info:
+        await ClassTemplateView(ClassTemplate).validate(
+            Request({"type": "http"}), template_form(time_zone="Berlin")
+        )
+
+    assert list(exc_info.value.errors) == ["time_zone"]
+
+
+@pytest.mark.asyncio
+async def test_template_form_checks_the_competence_of_the_teacher() -> None:
+    session = AsyncMock()
+    session.get.return_value = SimpleNamespace(
+        competencies=[SimpleNamespace(name="math")],
+        identity=SimpleNamespace(name="ivan", surname="ivanov"),
+    )
+    request = Request({"type": "http", "state": {"session": session}})
+    data = template_form(teacher=SimpleNamespace(id=7), subject=SimpleNamespace(name="physics"))
+
+    with pytest.raises(FormValidationError) as exc_info:
+        await ClassTemplateView(ClassTemplate).validate(request, data)
+
+    assert list(exc_info.value.errors) == ["subject"]
+
+
+def test_generate_endpoint_lists_the_conflicts(client: TestClient, app: FastAPI) -> None:
+    service_mock = AsyncMock()
+    service_mock.generate_template.side_effect = OccurrencesConflict([
+        OccurrenceConflict(starts_at=monday(16), kind=ConflictKind.TEACHER, class_id=40),
+    ])
+    app.dependency_overrides[Stub(ClassService)] = lambda: service_mock
+    app.dependency_overrides[current_user] = lambda: Principal(
+        id=1, role=Role.ADMIN, is_verified=True
+    )
+
+    resp = client.post("/classes/templates/1/generate")
+
+    assert resp.status_code == status.HTTP_409_CONFLICT
+    assert resp.json()["detail"]["conflicts"] == [
+        {"starts_at": "2024-09-16T09:00:00+00:00", "kind": "teacher", "class_id": 40},
+    ]
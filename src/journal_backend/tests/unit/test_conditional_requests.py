@@ -0,0 +1,128 @@
+from datetime import date, datetime, timezone
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from redis.asyncio import Redis
+from sqlalchemy.dialects import postgresql
+from starlette import status
+from starlette.requests import Request
+from starlette.testclient import TestClient
+
+from journal_backend.depends_stub import Stub
+from journal_backend.entity.classes.repository import ClassRepository
+from journal_backend.entity.common.conditional import (
+    ResourceVersion,
+    check_not_modified,
+)
+from journal_backend.entity.common.email_sender import EmailSender
+from journal_backend.entity.students.models import Group, Student
+from journal_backend.entity.students.repository import StudentRepository
+from journal_backend.entity.users.dependencies import current_user
+from journal_backend.entity.users.dto import Principal
+from journal_backend.entity.users.enums import Role
+from journal_backend.entity.users.models import UserIdentity
+from journal_backend.entity.users.repository import UserRepository
+
+UPDATED_ON = datetime(2024, 9, 2, 8, 30, 15, 123456, tzinfo=timezone.utc)
+
+
+def make_request(**headers: str) -> Request:
+    return Request({
+        "type": "http",
+        "headers": [(name.replace("_", "-").encode(), value.encode())
+                    for name, value in headers.items()],
+    })
+
+
+def test_row_version_changes_with_count_and_time() -> None:
+    version = ResourceVersion.of_rows(UPDATED_ON, 3)
+
+    assert version.etag.startswith('W/"3-')
+    assert version.etag != ResourceVersion.of_rows(UPDATED_ON, 2).etag
+    assert version.etag != ResourceVersion.of_rows(UPDATED_ON.replace(microsecond=0), 3).etag
+    assert version.headers["Last-Modified"] == "Mon, 02 Sep 2024 08:30:15 GMT"
+    assert ResourceVersion.of_rows(None, 0).etag == 'W/"0-0"'
+
+
+
+@pytest.mark.asyncio
+async def test_reports_version_covers_the_names_shown() -> None:
+    session = AsyncMock()
+    session.execute.return_value = Mock(one=lambda: (UPDATED_ON, 3))
+
+    version = await StudentRepository(session).get_academic_reports_version(
+        1, date(2024, 9, 1), date(2024, 10, 1)
+    )
+
+    assert version == ResourceVersion.of_rows(UPDATED_ON, 3)
+    stmt = session.execute.await_args.args[0]
+    sql = str(stmt.compile(dialect=postgresql.dialect()))  # type:ignore[no-untyped-call]
+    for name in ("groups", "subjects", "classrooms", "user_identity_1", "user_identity_2"):
+        assert f"{name}.updated_on" in sql
+
+def test_version_matches_if_none_match() -> None:
+    version = ResourceVersion.of_rows(UPDATED_ON, 3)
+
+    assert version.matches(make_request(if_none_match=f'"other", {version.etag}'))
+    assert version.matches(make_request(if_none_match=version.etag.removeprefix("W/")))
+    assert version.matches(make_request(if_none_match="*"))
+    assert not version.matches(make_request(if_none_match='"other"'))
+    # If-None-Match takes precedence
+    assert not version.matches(make_request(
+        if_none_match='"other"', if_modified_since="Mon, 02 Sep 2024 08:30:15 GMT"
+    ))
+
+
+def test_version_matches_if_modified_since() -> None:
+    version = ResourceVersion.of_rows(UPDATED_ON, 3)
+
+    assert version.matches(make_request(if_modified_since="Mon, 02 Sep 2024 08:30:15 GMT"))
+    assert not version.matches(make_request(if_modified_since="Mon, 02 Sep 2024 08:30:14 GMT"))
+    assert not version.matches(make_request(if_modified_since="yesterday"))
+    assert not ResourceVersion.of_content(b"[]").matches(
+        make_request(if_modified_since="Mon, 02 Sep 2024 08:30:15 GMT")
+    )
+
+
+def test_check_not_modified_raises_304() -> None:
+    version = ResourceVersion.of_content(b"[]")
+
+    check_not_modified(make_request(), version)
+    with pytest.raises(HTTPException) as exc_info:
+        check_not_modified(make_request(if_none_match=version.etag), version)
+
+    assert exc_info.value.status_code == status.HTTP_304_NOT_MODIFIED
+    assert exc_info.value.headers is not None
+    assert exc_info.value.headers["ETag"] == version.etag
+
+
+def test_student_card_is_not_loaded_when_not_modified(client: TestClient, app: FastAPI) -> None:
+    student_repo_mock = AsyncMock()
+    app.dependency_overrides[Stub(StudentRepository)] = lambda: student_repo_mock
+    app.dependency_overrides[Stub(UserRepository)] = lambda: AsyncMock()
+    app.dependency_overrides[Stub(ClassRepository)] = lambda: AsyncMock()
+    app.dependency_overrides[Stub(Redis)] = lambda: AsyncMock()
+    app.dependency_overrides[Stub(EmailSender)] = lambda: AsyncMock()
+    app.dependency_overrides[current_user] = lambda: Principal(
+        id=1, role=Role.STUDENT, is_verified=True
+    )
+    student_repo_mock.get_version.return_value = ResourceVersion.of_rows(UPDATED_ON)
+    student_repo_mock.get_by_id.return_value = Student(
+        id=1,
+        identity=UserIdentity(id=1, name="Ivan", surname="Ivanov", email="ivan@mail.ru",
+                              is_verified=True),
+        group=Group(id=2, name="K0109", admission_year=2023),
+    )
+
+    resp = client.get("/students/me")
+    assert resp.status_code == status.HTTP_200_OK
+    etag = resp.headers["ETag"]
+
+    student_repo_mock.get_by_id.reset_mock()
+    resp = client.get("/students/me", headers={"If-None-Match": etag})
+
+    assert resp.status_code == status.HTTP_304_NOT_MODIFIED
+    assert resp.content == b""
+    assert resp.headers["ETag"] == etag
+    student_repo_mock.get_by_id.assert_not_awaited()
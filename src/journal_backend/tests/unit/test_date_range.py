@@ -0,0 +1,88 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from journal_backend.entity.classes.dto import build_schedule_response
+from journal_backend.entity.classes.models import Class, Classroom
+from journal_backend.entity.common.date_range import (
+    DateRange,
+    PeriodQuery,
+    period_query,
+)
+from journal_backend.entity.common.exceptions import InvalidDateRange
+from journal_backend.entity.models import *  # noqa
+from journal_backend.entity.students.models import Group
+from journal_backend.entity.teachers.models import Subject, Teacher
+from journal_backend.entity.users.models import UserIdentity
+
+
+def test_week_runs_from_monday_to_sunday() -> None:
+    week = DateRange.week(offset=-1)
+
+    assert week.start.weekday() == 0
+    assert week.end - week.start == timedelta(days=6)
+    assert week.start <= date.today() - timedelta(days=7) <= week.end
+    assert week.is_week
+    assert week.stop == week.end + timedelta(days=1)
+
+
+def test_range_shifts_by_its_length() -> None:
+    period = DateRange(date(2024, 9, 1), date(2024, 9, 30))
+
+    assert period.days == 30
+    assert not period.is_week
+    assert period.shift(1) == DateRange(date(2024, 10, 1), date(2024, 10, 30))
+    assert period.shift(-1) == DateRange(date(2024, 8, 2), date(2024, 8, 31))
+
+
+def test_range_check_bounds_the_span() -> None:
+    DateRange(date(2024, 9, 1), date(2024, 9, 1)).check(max_days=1)
+
+    with pytest.raises(InvalidDateRange):
+        DateRange(date(2024, 9, 2), date(2024, 9, 1)).check(max_days=42)
+    with pytest.raises(InvalidDateRange):
+        DateRange(date(2024, 9, 1), date(2024, 10, 12)).check(max_days=41)
+
+
+@pytest.mark.asyncio
+async def test_period_query_prefers_the_dates() -> None:
+    by_offset = await period_query(offset=2, from_=None, to=None)
+    by_dates = await period_query(offset=0, from_=date(2024, 9, 4), to=date(2024, 9, 20))
+    rest_of_week = await period_query(offset=0, from_=date(2024, 9, 4), to=None)
+
+    assert by_offset == PeriodQuery(DateRange.week(2), offset=2)
+    assert by_offset.page_urls("/s") == ("/s?offset=3", "/s?offset=1")
+    assert by_dates.period == DateRange(date(2024, 9, 4), date(2024, 9, 20))
+    assert by_dates.page_urls("/s") == (
+        "/s?from=2024-09-21&to=2024-10-07",
+        "/s?from=2024-08-18&to=2024-09-03",
+    )
+    assert rest_of_week.period == DateRange(date(2024, 9, 4), date(2024, 9, 8))
+
+
+def make_class(class_id: int, starts_at: datetime) -> Class:
+    return Class(
+        id=class_id,
+        starts_at=starts_at,
+        duration=timedelta(minutes=90),
+        group=Group(name="K0109"),
+        subject=Subject(name="Math"),
+        teacher=Teacher(identity=UserIdentity(name="Ivan", surname="Ivanov")),
+        classroom=Classroom(name="101"),
+    )
+
+
+def test_schedule_is_grouped_into_days() -> None:
+    classes = [
+        make_class(1, datetime(2024, 9, 2, 9, tzinfo=timezone.utc)),
+        make_class(2, datetime(2024, 9, 2, 11, tzinfo=timezone.utc)),
+        make_class(3, datetime(2024, 9, 9, 9, tzinfo=timezone.utc)),
+    ]
+
+    schedule = build_schedule_response(classes)
+
+    assert [(d.day, d.date, [c.id for c in d.classes]) for d in schedule] == [
+        (0, date(2024, 9, 2), [1, 2]),
+        (0, date(2024, 9, 9), [3]),
+    ]
+    assert schedule[0].classes[0].teacher == "Ivanov I."
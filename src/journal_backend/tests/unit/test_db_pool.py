@@ -0,0 +1,25 @@
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.util import greenlet_spawn
+
+from journal_backend.database.pool import InstrumentedPool
+
+
+@pytest.mark.asyncio
+async def test_instrumented_pool_records_checkouts_and_timeouts() -> None:
+    pool = InstrumentedPool(Mock, pool_size=1, max_overflow=0, timeout=0.01)
+
+    conn = await greenlet_spawn(pool.connect)
+    with pytest.raises(PoolTimeoutError):
+        await greenlet_spawn(pool.connect)
+    stats = pool.snapshot()
+    await greenlet_spawn(conn.close)
+
+    assert stats["in_use"] == 1
+    assert stats["idle"] == 0
+    assert stats["checkouts"] == 1
+    assert stats["timeouts"] == 1
+    assert sum(stats["wait_histogram"].values()) == 1
+    assert pool.snapshot()["idle"] == 1
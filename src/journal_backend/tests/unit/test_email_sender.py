@@ -0,0 +1,139 @@
+import socket
+from email.message import EmailMessage
+from typing import Any, Iterator
+
+import pytest
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult, Envelope
+
+from journal_backend.config import SMTPConfig
+from journal_backend.entity.common.email_sender import EmailSender
+from journal_backend.entity.common.exceptions import EmailDeliveryFailed
+
+
+class CollectingHandler:
+    def __init__(self) -> None:
+        self.envelopes: list[Envelope] = []
+
+    async def handle_DATA(self, server: Any, session: Any, envelope: Envelope) -> str:
+        self.envelopes.append(envelope)
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+@pytest.fixture
+def smtp_server() -> Iterator[tuple[Controller, CollectingHandler]]:
+    handler = CollectingHandler()
+    controller = Controller(
+        handler,
+        hostname="127.0.0.1",
+        port=free_port(),
+        authenticator=lambda *args: AuthResult(success=True),
+        auth_require_tls=False,
+    )
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+
+def make_message(i: int) -> EmailMessage:
+    em = EmailMessage()
+    em['From'] = "journal@gmail.com"
+    em['To'] = f"student{i}@gmail.com"
+    em['Subject'] = 'Mail confirmation'
+    em.set_content("body")
+    return em
+
+
+@pytest.mark.asyncio
+async def test_email_sender_delivers_queue_on_close(
+        smtp_server: tuple[Controller, CollectingHandler]
+) -> None:
+    controller, handler = smtp_server
+    sender = EmailSender(SMTPConfig(
+        host=controller.hostname,
+        port=controller.port,
+        email="journal@gmail.com",
+        password="password",
+        use_tls=False,
+        connections=2,
+    ))
+
+    for i in range(20):
+        await sender.send_email(make_message(i))
+    await sender.close()
+
+    assert sender.sent == 20
+    assert sender.failed == 0
+    assert sorted(e.rcpt_tos[0] for e in handler.envelopes) == sorted(
+        f"student{i}@gmail.com" for i in range(20)
+    )
+
+
+@pytest.mark.asyncio
+async def test_email_sender_gives_up_after_retries() -> None:
+    sender = EmailSender(SMTPConfig(
+        host="127.0.0.1",
+        port=free_port(),
+        email="journal@gmail.com",
+        password="password",
+        use_tls=False,
+        connections=1,
+        max_retries=2,
+        backoff_seconds=0.01,
+    ))
+
+    await sender.send_email(make_message(0))
+    await sender.close()
+
+    assert sender.sent == 0
+    assert sender.failed == 1
+
+
+@pytest.mark.asyncio
+async def test_email_sender_deliver_raises_when_not_delivered() -> None:
+    sender = EmailSender(SMTPConfig(
+        host="127.0.0.1",
+        port=free_port(),
+        email="journal@gmail.com",
+        password="password",
+        use_tls=False,
+        connections=1,
+        max_retries=1,
+        backoff_seconds=0.01,
+    ))
+
+    with pytest.raises(EmailDeliveryFailed):
+        await sender.deliver(make_message(0))
+    await sender.close()
+
+
+@pytest.mark.asyncio
+async def test_email_sender_survives_malformed_message(
+        smtp_server: tuple[Controller, CollectingHandler]
+) -> None:
+    controller, handler = smtp_server
+    sender = EmailSender(SMTPConfig(
+        host=controller.hostname,
+        port=controller.port,
+        email="journal@gmail.com",
+        password="password",
+        use_tls=False,
+        connections=1,
+    ))
+    malformed = EmailMessage()
+    malformed.set_content("no sender nor recipients")
+
+    with pytest.raises(EmailDeliveryFailed):
+        await sender.deliver(malformed)
+    await sender.deliver(make_message(0))
+    await sender.close()
+
+    assert sender.sent == 1
+    assert sender.failed == 1
+    assert [e.rcpt_tos for e in handler.envelopes] == [["student0@gmail.com"]]
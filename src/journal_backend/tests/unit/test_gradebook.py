@@ -0,0 +1,76 @@
+from datetime import date, datetime, timezone
+from typing import Any, Callable
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from journal_backend.entity.common.exceptions import InvalidDateRange
+from journal_backend.entity.models import *  # noqa
+from journal_backend.entity.students import exceptions
+from journal_backend.entity.students.dto import build_gradebook
+from journal_backend.entity.students.enums import Graduation
+from journal_backend.entity.students.repository import StudentRepository
+from journal_backend.entity.students.service import StudentService
+from journal_backend.entity.users.dto import Principal
+from journal_backend.entity.users.enums import Role
+
+TEACHER = Principal(id=1, role=Role.TEACHER, is_verified=True)
+MONDAY = datetime(2024, 9, 2, 9, tzinfo=timezone.utc)
+TUESDAY = datetime(2024, 9, 3, 9, tzinfo=timezone.utc)
+
+
+def test_rows_are_folded_into_a_matrix() -> None:
+    rows = [
+        (5, "Abramov", "Ivan", 11, TUESDAY, "Physics", None, None),
+        (5, "Abramov", "Ivan", 10, MONDAY, "Math", True, Graduation.GOOD),
+        (3, "Borisov", "Petr", 10, MONDAY, "Math", False, None),
+        (3, "Borisov", "Petr", 11, TUESDAY, "Physics", True, Graduation.EXCELLENT),
+        (4, "Petrov", "Oleg", None, None, None, None, None),
+    ]
+
+    gradebook = build_gradebook(rows)
+
+    assert [student.id for student in gradebook.students] == [5, 3, 4]
+    assert [class_.id for class_ in gradebook.classes] == [10, 11]
+    assert gradebook.grades == [[4, None], [None, 5], [None, None]]
+    assert gradebook.attendance == [[True, None], [False, True], [None, None]]
+
+
+@pytest.mark.asyncio
+async def test_gradebook_is_one_query(capturing_session: Any) -> None:
+    repo = StudentRepository(capturing_session)
+
+    await repo.get_gradebook_rows(1, date(2024, 9, 2), date(2024, 9, 8), subject_id=2)
+
+    [stmt] = capturing_session.statements
+    sql = str(stmt.compile(dialect=postgresql.dialect()))  # type:ignore[no-untyped-call]
+    assert sql.count("LEFT OUTER JOIN") == 3
+    assert "classes.subject_id = " in sql
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("d_left", "d_right"),
+    [(date(2024, 9, 8), date(2024, 9, 2)), (date(2024, 1, 1), date(2025, 1, 1))],
+)
+async def test_invalid_date_range(
+        d_left: date,
+        d_right: date,
+        make_student_service: Callable[..., StudentService],
+) -> None:
+    service = make_student_service(AsyncMock())
+
+    with pytest.raises(InvalidDateRange):
+        await service.get_group_gradebook(1, d_left, d_right, None, TEACHER)
+
+
+@pytest.mark.asyncio
+async def test_unknown_group(make_student_service: Callable[..., StudentService]) -> None:
+    repo = AsyncMock()
+    repo.get_gradebook_rows.return_value = []
+    repo.group_exists.return_value = False
+    service = make_student_service(repo)
+
+    with pytest.raises(exceptions.GroupNotFound):
+        await service.get_group_gradebook(1, date(2024, 9, 2), date(2024, 9, 8), None, TEACHER)
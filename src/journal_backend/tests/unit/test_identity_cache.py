@@ -0,0 +1,56 @@
+from unittest.mock import patch
+
+from journal_backend.entity.users.cache import IdentityCache
+from journal_backend.entity.users.enums import Role
+from journal_backend.entity.users.models import UserIdentity
+
+
+def make_identity(user_id: int) -> UserIdentity:
+    return UserIdentity(
+        id=user_id,
+        name='name',
+        surname='surname',
+        email=f"user{user_id}@gmail.com",
+        hashed_password='hash',
+        role=Role.STUDENT,
+        is_active=True,
+        is_verified=False
+    )
+
+
+def test_identity_cache_hits_and_misses() -> None:
+    cache = IdentityCache(max_size=2, ttl_seconds=60)
+
+    assert cache.get(1) is None
+    cache.put(make_identity(1))
+    cached = cache.get(1)
+
+    assert cached is not None
+    assert cached.email == "user1@gmail.com"
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 1}
+
+
+def test_identity_cache_evicts_least_recently_used() -> None:
+    cache = IdentityCache(max_size=2, ttl_seconds=60)
+    cache.put(make_identity(1))
+    cache.put(make_identity(2))
+
+    cache.get(1)
+    cache.put(make_identity(3))
+
+    assert cache.get(2) is None
+    assert cache.get(1) is not None
+    assert cache.get(3) is not None
+
+
+def test_identity_cache_expires_and_invalidates() -> None:
+    cache = IdentityCache(max_size=10, ttl_seconds=60)
+    cache.put(make_identity(1))
+    cache.put(make_identity(2))
+
+    cache.invalidate(2)
+    assert cache.get(2) is None
+
+    with patch("journal_backend.entity.users.cache.time.monotonic", return_value=10 ** 9):
+        assert cache.get(1) is None
+    assert len(cache) == 0
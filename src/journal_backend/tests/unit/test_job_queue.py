@@ -0,0 +1,104 @@
+import asyncio
+import json
+import time
+from typing import Any
+from unittest.mock import AsyncMock
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from journal_backend.config import JobsConfig
+from journal_backend.entity.common.job_queue import Job, JobQueue
+
+
+def make_queue() -> tuple[JobQueue, AsyncMock]:
+    redis_mock = AsyncMock()
+    return JobQueue(redis_mock, JobsConfig(max_attempts=3)), redis_mock
+
+
+@pytest.mark.asyncio
+async def test_job_queue_acks_processed_job() -> None:
+    queue, redis_mock = make_queue()
+    handler = AsyncMock()
+
+    await queue.process(Job(id="1-0", name="job", payload={"a": 1}), {"job": handler})
+
+    handler.assert_awaited_once_with({"a": 1})
+    redis_mock.xadd.assert_not_awaited()
+    redis_mock.xack.assert_awaited_once_with("journal:jobs", "journal-workers", "1-0")
+
+
+@pytest.mark.asyncio
+async def test_job_queue_retries_failed_job() -> None:
+    queue, redis_mock = make_queue()
+    handler = AsyncMock(side_effect=RuntimeError)
+
+    before_ms = time.time() * 1000
+    await queue.process(Job(id="1-0", name="job", payload={}, attempts=1), {"job": handler})
+
+    redis_mock.xadd.assert_not_awaited()
+    key, entries = redis_mock.zadd.await_args.args
+    assert key == "journal:jobs:delayed"
+    [(entry, due_ms)] = entries.items()
+    assert json.loads(entry)["attempts"] == 2
+    # The second failure in a row waits twice the base delay
+    assert before_ms + 2000 <= due_ms <= time.time() * 1000 + 2000
+    redis_mock.xack.assert_awaited_once()
+
+
+def test_job_queue_backoff_is_capped() -> None:
+    queue = JobQueue(AsyncMock(), JobsConfig(retry_backoff_ms=100, retry_backoff_max_ms=500))
+
+    assert [queue._backoff(failures) for failures in range(1, 6)] == [0.1, 0.2, 0.4, 0.5, 0.5]
+
+
+@pytest.mark.asyncio
+async def test_job_queue_survives_lost_connection() -> None:
+    queue = JobQueue(AsyncMock(), JobsConfig(retry_backoff_ms=1))
+    stop = asyncio.Event()
+    reads = 0
+
+    async def read(*args: Any, **kwargs: Any) -> list[Any]:
+        nonlocal reads
+        reads += 1
+        if reads == 1:
+            raise ConnectionError("Connection refused")
+        stop.set()
+        return []
+
+    queue.redis.xreadgroup.side_effect = read  # type:ignore[attr-defined]
+    queue.redis.xautoclaim.return_value = [b"0-0", [], []]  # type:ignore[attr-defined]
+
+    await queue.run("consumer", {}, stop)
+
+    assert reads == 2
+    # The group is recreated in case redis came back empty
+    assert queue.redis.xgroup_create.await_count == 2  # type:ignore[attr-defined]
+
+
+@pytest.mark.asyncio
+async def test_job_queue_dead_letters_exhausted_job() -> None:
+    queue, redis_mock = make_queue()
+    handler = AsyncMock(side_effect=RuntimeError("boom"))
+
+    await queue.process(Job(id="1-0", name="job", payload={}, attempts=2), {"job": handler})
+
+    stream, fields = redis_mock.xadd.await_args.args
+    assert stream == "journal:jobs:dead"
+    assert "boom" in fields["reason"]
+    redis_mock.xack.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_job_queue_counts_deliveries_of_claimed_jobs() -> None:
+    queue, redis_mock = make_queue()
+    redis_mock.xautoclaim.return_value = [
+        b"0-0",
+        [(b"1-0", {b"name": b"job", b"payload": json.dumps({}).encode(), b"attempts": b"0"})],
+        [],
+    ]
+    redis_mock.xpending_range.return_value = [{"times_delivered": 3}]
+
+    jobs = await queue._claim_stale("consumer")
+
+    assert jobs == [Job(id="1-0", name="job", payload={}, attempts=2)]
@@ -0,0 +1,92 @@
+from typing import Any
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session
+
+from journal_backend.admin.loading import ADMIN_SESSION
+from journal_backend.entity.classes.loading import SCHEDULE_VIEW
+from journal_backend.entity.classes.models import Class
+from journal_backend.entity.models import *  # noqa
+from journal_backend.entity.students.loading import REPORT_VIEW
+from journal_backend.entity.students.models import (
+    AcademicReport,
+    Group,
+    Student,
+)
+from journal_backend.entity.users.enums import Role
+from journal_backend.entity.users.models import UserIdentity
+
+
+def compiled_sql(stmt: Any) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))  # type:ignore[no-untyped-call]
+
+
+def test_schedule_view_joins_many_to_one_only() -> None:
+    sql = compiled_sql(select(Class).options(*SCHEDULE_VIEW))
+
+    assert sql.count("JOIN") == 5
+    assert "competencies" not in sql
+    assert "students" not in sql
+    assert "hashed_password" not in sql
+
+
+def test_report_view_reuses_the_classes_join() -> None:
+    stmt = (
+        select(AcademicReport).
+        join(Class, onclause=Class.id == AcademicReport.class_id).
+        options(*REPORT_VIEW)
+    )
+    sql = compiled_sql(stmt)
+
+    assert sql.count("JOIN classes") == 1
+    assert "groups_1.admission_year" not in sql
+
+
+def make_admin_engine() -> Engine:
+    engine = create_engine("sqlite://")
+    # The classes are PostgreSQL only, with their range column
+    Student.metadata.create_all(
+        engine, tables=[UserIdentity.__table__, Group.__table__, Student.__table__]
+    )
+    with Session(engine) as session:
+        identity = UserIdentity(
+            name="Ivan",
+            surname="Ivanov",
+            email="ivan@example.com",
+            hashed_password="hash",
+            role=Role.STUDENT,
+            is_verified=True,
+        )
+        group = Group(name="g", admission_year=2024)
+        session.add_all([identity, Student(identity=identity, group=group)])
+        session.commit()
+    return engine
+
+
+def test_admin_session_applies_admin_view() -> None:
+    engine = make_admin_engine()
+
+    with Session(engine) as session:
+        student = session.scalars(select(Student)).one()
+        with pytest.raises(InvalidRequestError):
+            student.identity
+
+    with Session(engine) as session:
+        session.info[ADMIN_SESSION] = True
+        student = session.scalars(select(Student)).one()
+        assert student.identity.name == "Ivan"
+        assert student.group.name == "g"
+
+
+def test_admin_session_selects_columns_without_admin_view() -> None:
+    engine = make_admin_engine()
+
+    with Session(engine) as session:
+        session.info[ADMIN_SESSION] = True
+        # The count of the list views and the columns of a model
+        assert session.scalar(select(func.count(Student.id))) == 1
+        assert session.scalars(select(Student.group_id)).all() == [1]
@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from journal_backend.entity.common.exceptions import InvalidCursor
+from journal_backend.entity.common.pagination import (
+    Cursor,
+    decode_cursor,
+    encode_cursor,
+    paginate,
+    seek,
+)
+from journal_backend.entity.models import *  # noqa
+from journal_backend.entity.students.models import Student
+
+
+def test_cursor_round_trip() -> None:
+    cursor = Cursor(key=(42, "2024-09-02"), backward=True)
+
+    assert decode_cursor(encode_cursor(cursor), (int, str)) == cursor
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "",
+        "not a cursor",
+        encode_cursor(Cursor(key=())),
+        encode_cursor(Cursor(key=(1, 2))),
+        encode_cursor(Cursor(key=("abc",))),
+        encode_cursor(Cursor(key=({},))),
+        encode_cursor(Cursor(key=(True,))),
+        encode_cursor(Cursor(key=(1.5,))),
+    ],
+)
+def test_invalid_cursor(token: str) -> None:
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token, (int,))
+
+
+def test_seek_compares_the_key_instead_of_counting_rows() -> None:
+    stmt = seek(select(Student.id), [Student.id], Cursor(key=(10,), backward=True), 25)
+    sql = str(stmt.compile(dialect=postgresql.dialect()))  # type:ignore[no-untyped-call]
+
+    assert "students.id < %(id_1)s" in sql
+    assert "ORDER BY students.id DESC" in sql
+    assert "OFFSET" not in sql
+    assert stmt.compile().params["param_1"] == 26
+
+
+def test_paginate_walks_both_ways() -> None:
+    rows = list(range(1, 8))
+
+    def key(row: int) -> tuple[int]:
+        return (row,)
+
+    first = paginate(rows[:4], key, None, 3)
+    assert first.items == [1, 2, 3]
+    assert first.prev_cursor is None
+    assert first.next_cursor == Cursor(key=(3,))
+
+    last = paginate(rows[6:], key, first.next_cursor, 3)
+    assert last.items == [7]
+    assert last.next_cursor is None
+    assert last.prev_cursor == Cursor(key=(7,), backward=True)
+
+    # Rows come in descending order when going backward
+    previous = paginate([6, 5, 4, 3], key, last.prev_cursor, 3)
+    assert previous.items == [4, 5, 6]
+    assert previous.next_cursor == Cursor(key=(6,))
+    assert previous.prev_cursor == Cursor(key=(4,), backward=True)
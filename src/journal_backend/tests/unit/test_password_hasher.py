@@ -0,0 +1,64 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from journal_backend.entity.common.exceptions import PasswordHasherOverloaded
+from journal_backend.entity.common.password_hasher import PasswordHasher
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_roundtrip() -> None:
+    hasher = PasswordHasher(workers=1, max_pending=4)
+    try:
+        hashed_password = await hasher.hash("password")
+        verified, updated_hash = await hasher.verify_and_update("password", hashed_password)
+        wrong, _ = await hasher.verify_and_update("wrong", hashed_password)
+    finally:
+        hasher.shutdown()
+
+    assert verified
+    assert updated_hash is None
+    assert not wrong
+    assert hasher.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_rejects_when_overloaded() -> None:
+    hasher = PasswordHasher(workers=1, max_pending=0)
+    try:
+        with pytest.raises(PasswordHasherOverloaded):
+            await hasher.hash("password")
+    finally:
+        hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_keeps_slot_of_cancelled_call() -> None:
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    hasher.shutdown()
+    hasher._executor = ThreadPoolExecutor(max_workers=1)  # type:ignore[assignment]
+    started, release = threading.Event(), threading.Event()
+
+    def job() -> None:
+        started.set()
+        release.wait()
+
+    try:
+        task = asyncio.create_task(hasher._submit(job))
+        await asyncio.to_thread(started.wait)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        # The pool is still running the job of the cancelled call
+        assert hasher.pending == 1
+        with pytest.raises(PasswordHasherOverloaded):
+            await hasher.hash("password")
+    finally:
+        release.set()
+        hasher.shutdown()
+    await asyncio.sleep(0)
+
+    assert hasher.pending == 0
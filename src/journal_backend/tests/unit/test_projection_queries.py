@@ -0,0 +1,33 @@
+from typing import Any
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from journal_backend.entity.classes.repository import ClassRepository
+from journal_backend.entity.models import *  # noqa
+from journal_backend.entity.students.repository import StudentRepository
+from journal_backend.entity.teachers.repository import TeacherRepository
+
+
+def compiled_sql(stmt: Any) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))  # type:ignore[no-untyped-call]
+
+
+@pytest.mark.asyncio
+async def test_lookups_select_no_object_graph(capturing_session: Any) -> None:
+    student_repo = StudentRepository(capturing_session)
+    class_repo = ClassRepository(capturing_session)
+    teacher_repo = TeacherRepository(capturing_session)
+
+    assert await student_repo.exists(1) is False
+    assert await student_repo.group_exists(1) is False
+    assert await class_repo.student_class_exists(1, 2) is False
+    assert await teacher_repo.exists(1) is False
+    assert await student_repo.get_group_id(1) is None
+
+    *exists_stmts, group_id_stmt = map(compiled_sql, capturing_session.statements)
+    for sql in exists_stmts:
+        assert sql.startswith("SELECT EXISTS")
+        assert "JOIN" not in sql
+    assert group_id_stmt.startswith("SELECT students.group_id \nFROM students")
+    assert "JOIN" not in group_id_stmt
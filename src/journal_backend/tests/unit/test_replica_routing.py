@@ -0,0 +1,48 @@
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from journal_backend.database.routing import (
+    READ_ONLY,
+    ReplicaRouter,
+    RoutingSession,
+)
+from journal_backend.entity.users.models import UserIdentity
+
+
+def make_engine(port: int) -> AsyncEngine:
+    return create_async_engine(f"postgresql+asyncpg://u:p@localhost:{port}/db")
+
+
+def make_session(router: ReplicaRouter, read_only: bool) -> RoutingSession:
+    session = RoutingSession(router=router)
+    session.info[READ_ONLY] = read_only
+    return session
+
+
+def test_routing_session_reads_from_replica() -> None:
+    primary, replica = make_engine(5432), make_engine(5433)
+    router = ReplicaRouter(primary, [replica])
+
+    assert make_session(router, True).get_bind(clause=select(1)) is replica.sync_engine
+    assert make_session(router, False).get_bind(clause=select(1)) is primary.sync_engine
+
+
+def test_routing_session_pins_to_primary_after_write() -> None:
+    primary, replica = make_engine(5432), make_engine(5433)
+    session = make_session(ReplicaRouter(primary, [replica]), True)
+
+    assert session.get_bind(clause=insert(UserIdentity)) is primary.sync_engine
+    assert session.get_bind(clause=select(1)) is primary.sync_engine
+    assert session.get_bind(clause=text("SELECT 1")) is primary.sync_engine
+
+
+def test_routing_session_falls_back_to_primary() -> None:
+    primary, replica = make_engine(5432), make_engine(5433)
+    router = ReplicaRouter(primary, [replica])
+    session = make_session(router, True)
+
+    router.mark_unhealthy(replica)
+    assert session.get_bind(clause=select(1)) is primary.sync_engine
+
+    router.mark_healthy(replica)
+    assert session.get_bind(clause=select(1)) is replica.sync_engine
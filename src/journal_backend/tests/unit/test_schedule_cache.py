@@ -0,0 +1,128 @@
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from redis.exceptions import ConnectionError
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.session import make_transient_to_detached
+from sqlalchemy.util import greenlet_spawn
+
+from journal_backend.entity.classes.cache import (
+    CHANGED_SCHEDULES,
+    ScheduleCache,
+    _collect_changed_schedules,
+    iso_week,
+)
+from journal_backend.entity.classes.dto import DailySchedule
+from journal_backend.entity.classes.enums import ScheduleOwner
+from journal_backend.entity.classes.models import Class
+from journal_backend.entity.common.date_range import DateRange
+from journal_backend.entity.models import *  # noqa
+
+MONDAY = date(2024, 9, 2)
+WEEK = DateRange(MONDAY, date(2024, 9, 8))
+
+
+def make_cache(ttl_seconds: int = 60) -> tuple[ScheduleCache, AsyncMock, MagicMock]:
+    redis_mock = AsyncMock()
+    pipe = MagicMock()
+    pipe.__aenter__.return_value = pipe
+    pipe.execute = AsyncMock()
+    redis_mock.pipeline = MagicMock(return_value=pipe)
+    redis_mock.mget.return_value = [b"2", b"5"]
+    return ScheduleCache(redis_mock, ttl_seconds), redis_mock, pipe
+
+
+def test_iso_week() -> None:
+    assert iso_week(MONDAY) == "2024-W36"
+    assert iso_week(date(2024, 12, 30)) == "2025-W01"
+
+
+@pytest.mark.asyncio
+async def test_schedule_cache_serves_hit_without_loading() -> None:
+    cache, redis_mock, _ = make_cache()
+    redis_mock.hget.return_value = b'[{"day":0,"classes":[]}]'
+    load = AsyncMock()
+
+    days = await cache.get_or_load(ScheduleOwner.GROUP, 7, WEEK, load)
+
+    assert days == b'[{"day":0,"classes":[]}]'
+    load.assert_not_awaited()
+    redis_mock.mget.assert_awaited_once_with("schedule:epoch", "schedule:group:7")
+    redis_mock.hget.assert_awaited_once_with("schedule:group:7:v2:2:5", "2024-W36")
+
+
+@pytest.mark.asyncio
+async def test_schedule_cache_stores_loaded_week_under_generation() -> None:
+    cache, redis_mock, pipe = make_cache()
+    redis_mock.hget.return_value = None
+    load = AsyncMock(return_value=[DailySchedule(day=1, date=date(2024, 9, 3), classes=[])])
+
+    days = await cache.get_or_load(ScheduleOwner.TEACHER, 3, WEEK, load)
+
+    assert days == b'[{"day":1,"date":"2024-09-03","classes":[]}]'
+    pipe.hset.assert_called_once_with("schedule:teacher:3:v2:2:5", "2024-W36", days)
+    pipe.expire.assert_called_once_with("schedule:teacher:3:v2:2:5", 60)
+
+
+@pytest.mark.asyncio
+async def test_schedule_cache_falls_back_to_database() -> None:
+    cache, redis_mock, _ = make_cache()
+    redis_mock.mget.side_effect = ConnectionError
+    load = AsyncMock(return_value=[])
+
+    assert await cache.get_or_load(ScheduleOwner.GROUP, 7, WEEK, load) == b"[]"
+    load.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_schedule_cache_loads_other_periods() -> None:
+    cache, redis_mock, _ = make_cache()
+    load = AsyncMock(return_value=[])
+    period = DateRange(MONDAY, date(2024, 9, 30))
+
+    assert await cache.get_or_load(ScheduleOwner.GROUP, 7, period, load) == b"[]"
+    redis_mock.mget.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_disabled_schedule_cache_always_loads() -> None:
+    cache, redis_mock, _ = make_cache(ttl_seconds=0)
+    load = AsyncMock(return_value=[])
+
+    assert await cache.get_or_load(ScheduleOwner.GROUP, 7, WEEK, load) == b"[]"
+    redis_mock.mget.assert_not_awaited()
+
+
+def test_flush_collects_old_and_new_owners() -> None:
+    session = Session()
+    moved = Class(id=1)
+    set_committed_value(moved, "group_id", 10)  # type:ignore[no-untyped-call]
+    set_committed_value(moved, "teacher_id", 20)  # type:ignore[no-untyped-call]
+    make_transient_to_detached(moved)
+    session.add(moved)
+    moved.group_id = 11
+    session.add(Class(group_id=12, teacher_id=20))
+
+    _collect_changed_schedules(session, None)
+
+    assert session.info[CHANGED_SCHEDULES] == {
+        (ScheduleOwner.GROUP, 10),
+        (ScheduleOwner.GROUP, 11),
+        (ScheduleOwner.GROUP, 12),
+        (ScheduleOwner.TEACHER, 20),
+    }
+
+
+@pytest.mark.asyncio
+async def test_commit_invalidates_changed_owners() -> None:
+    cache, _, pipe = make_cache()
+    session = Session()
+    session.info[CHANGED_SCHEDULES] = {(ScheduleOwner.GROUP, 10)}
+
+    # The async sessions run the commit hooks in a greenlet
+    await greenlet_spawn(cache._after_commit, session)
+
+    pipe.incr.assert_called_once_with("schedule:group:10")
+    assert CHANGED_SCHEDULES not in session.info
@@ -0,0 +1,91 @@
+from functools import partial
+from typing import Any
+from unittest.mock import Mock
+
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from journal_backend.database.dependencies import get_session, read_write
+from journal_backend.database.routes import SessionReleasingRoute
+from journal_backend.database.routing import (
+    PINNED_TO_PRIMARY,
+    READ_ONLY,
+    ReplicaRouter,
+    RoutingSession,
+)
+from journal_backend.depends_stub import Stub
+
+
+class RecordingSession:
+    def __init__(self, events: list[str]) -> None:
+        self.events = events
+        self.info: dict[str, Any] = {}
+
+    async def close(self) -> None:
+        self.events.append("close")
+
+    async def __aenter__(self) -> "RecordingSession":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        self.events.append("teardown")
+
+
+def make_client(events: list[str], sessions: list[RecordingSession]) -> TestClient:
+    def session_factory() -> RecordingSession:
+        session = RecordingSession(events)
+        sessions.append(session)
+        return session
+
+    router = APIRouter(route_class=SessionReleasingRoute)
+
+    @router.get("/read")
+    async def read(session: AsyncSession = Depends(Stub(AsyncSession))) -> str:
+        events.append("endpoint")
+        return "OK"
+
+    @router.get("/write")
+    @read_write  # type:ignore[misc]
+    async def write(session: AsyncSession = Depends(Stub(AsyncSession))) -> str:
+        return "OK"
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[Stub(AsyncSession)] = partial(get_session, session_factory)
+    return TestClient(app)
+
+
+def test_session_is_released_right_after_endpoint() -> None:
+    events: list[str] = []
+    sessions: list[RecordingSession] = []
+    client = make_client(events, sessions)
+
+    assert client.get("/read").status_code == 200
+
+    assert events[:2] == ["endpoint", "close"]
+    assert sessions[0].info[READ_ONLY] is True
+
+
+def test_read_write_endpoint_is_not_read_only() -> None:
+    events: list[str] = []
+    sessions: list[RecordingSession] = []
+    client = make_client(events, sessions)
+
+    assert client.get("/write").status_code == 200
+
+    assert sessions[0].info[READ_ONLY] is False
+
+
+def test_read_only_session_begins_read_only_transactions() -> None:
+    engine = create_async_engine("postgresql+asyncpg://u:p@localhost:5432/db")
+    session = RoutingSession(router=ReplicaRouter(engine))
+    connection = Mock()
+
+    session.info[READ_ONLY] = True
+    session.dispatch.after_begin(session, Mock(), connection)
+    connection.exec_driver_sql.assert_called_once_with("SET TRANSACTION READ ONLY")
+
+    session.info[PINNED_TO_PRIMARY] = True
+    session.dispatch.after_begin(session, Mock(), connection)
+    connection.exec_driver_sql.assert_called_once()
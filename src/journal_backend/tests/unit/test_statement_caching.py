@@ -0,0 +1,30 @@
+from datetime import date
+from typing import Any
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from journal_backend.entity.classes.repository import ClassRepository
+from journal_backend.entity.models import *  # noqa
+from journal_backend.entity.students.repository import StudentRepository
+
+
+def compiled_params(stmt: Any) -> dict[str, Any]:
+    return dict(stmt.compile(dialect=postgresql.dialect()).params)  # type:ignore[no-untyped-call]
+
+
+@pytest.mark.asyncio
+async def test_cached_statements_bind_call_arguments(capturing_session: Any) -> None:
+    class_repo = ClassRepository(capturing_session)
+    student_repo = StudentRepository(capturing_session)
+
+    await class_repo.get_schedule_by_group_id(1, date(2024, 9, 1), date(2024, 9, 7))
+    await class_repo.get_schedule_by_group_id(2, date(2024, 10, 1), date(2024, 10, 7))
+    await student_repo.get_by_id(3)
+    await student_repo.get_by_id(4)
+
+    first, second, third, fourth = map(compiled_params, capturing_session.statements)
+    assert set(first.values()) == {1, date(2024, 9, 1), date(2024, 9, 7)}
+    assert set(second.values()) == {2, date(2024, 10, 1), date(2024, 10, 7)}
+    assert list(third.values()) == [3]
+    assert list(fourth.values()) == [4]
@@ -0,0 +1,59 @@
+from datetime import date
+from typing import Callable
+from unittest.mock import AsyncMock
+
+import pytest
+
+from journal_backend.entity.common.date_range import DateRange
+from journal_backend.entity.students import exceptions
+from journal_backend.entity.students.service import StudentService
+from journal_backend.entity.users.dto import Principal
+from journal_backend.entity.users.enums import Role
+
+SIGNED_STUDENT = Principal(id=7, role=Role.STUDENT, is_verified=True, from_claims=True)
+WEEK = DateRange(date(2024, 9, 2), date(2024, 9, 8))
+
+
+@pytest.mark.asyncio
+async def test_claims_without_group_look_the_group_up(
+        make_student_service: Callable[..., StudentService],
+) -> None:
+    repo, schedule_cache = AsyncMock(), AsyncMock()
+    repo.get_group_id.return_value = 4
+
+    await make_student_service(repo, schedule_cache).get_schedule_by_id(
+        "me", WEEK, SIGNED_STUDENT
+    )
+
+    repo.get_group_id.assert_awaited_once_with(7)
+    assert schedule_cache.get_or_load.await_args.args[1] == 4
+
+
+@pytest.mark.asyncio
+async def test_student_without_group_has_no_classes(
+        make_student_service: Callable[..., StudentService],
+) -> None:
+    repo, schedule_cache = AsyncMock(), AsyncMock()
+    repo.get_group_id.return_value = None
+    repo.exists.return_value = True
+
+    days = await make_student_service(repo, schedule_cache).get_schedule_by_id(
+        "me", WEEK, SIGNED_STUDENT
+    )
+
+    assert days == b"[]"
+    schedule_cache.get_or_load.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_unknown_student_has_no_schedule(
+        make_student_service: Callable[..., StudentService],
+) -> None:
+    repo = AsyncMock()
+    repo.get_group_id.return_value = None
+    repo.exists.return_value = False
+    caller = Principal(id=1, role=Role.TEACHER, is_verified=True)
+
+    with pytest.raises(exceptions.StudentNotFound):
+        await make_student_service(repo).get_schedule_by_id(7, WEEK, caller)
+    repo.exists.assert_awaited_once_with(7)
@@ -0,0 +1,180 @@
+from datetime import datetime, time, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette import status
+
+from journal_backend.depends_stub import Stub
+from journal_backend.entity.classes.dto import ClassroomRead, FreeSlot
+from journal_backend.entity.classes.enums import ConflictKind
+from journal_backend.entity.classes.exceptions import (
+    OutsideTimetable,
+    TimetableUnavailable,
+)
+from journal_backend.entity.classes.timetable import (
+    CHANGED_CLASSES,
+    IndexedClass,
+    OwnerTimetable,
+    TimetableIndex,
+    to_seconds,
+)
+from journal_backend.entity.common.date_range import DateRange
+from journal_backend.entity.models import *  # noqa
+from journal_backend.entity.users.dependencies import current_user
+from journal_backend.entity.users.dto import Principal
+from journal_backend.entity.users.enums import Role
+
+MONDAY = datetime.combine(DateRange.week().start, time.min, timezone.utc)
+CLASS = timedelta(minutes=90)
+
+
+def at(hours: float) -> datetime:
+    return MONDAY + timedelta(hours=hours)
+
+
+def class_row(class_id: int, hours: float, **owners: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=class_id,
+        starts_at=at(hours),
+        duration=CLASS,
+        group_id=owners.get("group_id"),
+        teacher_id=owners.get("teacher_id"),
+        classroom_id=owners.get("classroom_id"),
+    )
+
+
+def result(rows: list[Any]) -> Mock:
+    return Mock(all=Mock(return_value=rows))
+
+
+async def loaded_index(rows: list[Any]) -> TimetableIndex:
+    session = AsyncMock(info={})
+    session.__aenter__.return_value = session
+    session.execute.side_effect = [
+        result(rows),
+        result([SimpleNamespace(id=3, name="301"), SimpleNamespace(id=4, name="204")]),
+    ]
+    index = TimetableIndex(Mock(return_value=session), weeks=2, refresh_seconds=60)
+    await index.load()
+    return index
+
+
+def test_owner_timetable_bisects_the_bounds() -> None:
+    timetable = OwnerTimetable()
+    timetable.add(2, 200, 300)
+    timetable.add(1, 0, 100)
+
+    assert list(timetable.starts) == [0, 200]
+    assert timetable.is_free(100, 200)
+    assert not timetable.is_free(50, 150)
+    assert not timetable.is_free(150, 250)
+    assert list(timetable.busy(50, 250)) == [(0, 100), (200, 300)]
+
+    timetable.remove(1, 0)
+    assert timetable.is_free(0, 200)
+    assert len(timetable) == 1
+
+
+@pytest.mark.asyncio
+async def test_free_classrooms() -> None:
+    index = await loaded_index([
+        class_row(1, 9, group_id=1, teacher_id=7, classroom_id=3),
+        class_row(2, 12, group_id=2, teacher_id=8, classroom_id=4),
+    ])
+
+    assert index.free_classrooms(at(10), at(11)) == [ClassroomRead(id=4, name="204")]
+    assert index.free_classrooms(at(10.5), at(12)) == [
+        ClassroomRead(id=4, name="204"),
+        ClassroomRead(id=3, name="301"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_free_slots_of_several_owners() -> None:
+    index = await loaded_index([
+        class_row(1, 9, group_id=1, teacher_id=7),
+        class_row(2, 11, group_id=1, teacher_id=8),
+        class_row(3, 13, group_id=2, teacher_id=7),
+    ])
+
+    slots = index.free_slots(
+        [(ConflictKind.GROUP, 1), (ConflictKind.TEACHER, 7)], at(6), at(16), CLASS
+    )
+
+    # The gaps at 10:30 and 12:30 are too short for a class
+    assert slots == [
+        FreeSlot(starts_at=at(6), ends_at=at(9)),
+        FreeSlot(starts_at=at(14.5), ends_at=at(16)),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_committed_changes_are_applied() -> None:
+    index = await loaded_index([class_row(1, 9, classroom_id=3)])
+    moved = IndexedClass(
+        starts_at=to_seconds(at(12)),
+        ends_at=to_seconds(at(13.5)),
+        owners=((ConflictKind.CLASSROOM, 3),),
+    )
+
+    index._after_commit(Mock(info={CHANGED_CLASSES: {1: moved}}))
+    assert [c.id for c in index.free_classrooms(at(9), at(10))] == [4, 3]
+    assert [c.id for c in index.free_classrooms(at(12), at(13))] == [4]
+
+    index.apply([(1, None)])
+    assert [c.id for c in index.free_classrooms(at(12), at(13))] == [4, 3]
+
+
+@pytest.mark.asyncio
+async def test_periods_outside_the_window_are_rejected() -> None:
+    index = TimetableIndex(Mock(), weeks=2, refresh_seconds=60)
+    with pytest.raises(TimetableUnavailable):
+        index.free_classrooms(at(9), at(10))
+
+    index = await loaded_index([])
+    with pytest.raises(OutsideTimetable):
+        index.free_classrooms(at(-1), at(1))
+    with pytest.raises(OutsideTimetable):
+        index.free_classrooms(at(10), at(9))
+    with pytest.raises(OutsideTimetable):
+        index.free_classrooms(at(24 * 14 - 1), at(24 * 14 + 1))
+
+
+def test_free_slots_endpoint(client: TestClient, app: FastAPI) -> None:
+    timetable_mock = Mock()
+    timetable_mock.free_slots.return_value = [FreeSlot(starts_at=at(9), ends_at=at(12))]
+    app.dependency_overrides[Stub(TimetableIndex)] = lambda: timetable_mock
+    app.dependency_overrides[current_user] = lambda: Principal(
+        id=1, role=Role.TEACHER, is_verified=True
+    )
+
+    resp = client.get("/classes/free-slots", params={
+        "starts_at": at(8).isoformat(),
+        "ends_at": at(16).isoformat(),
+        "group_id": [1, 2],
+        "teacher_id": 7,
+    })
+
+    assert resp.status_code == status.HTTP_200_OK
+    assert len(resp.json()) == 1
+    owners, starts_at, ends_at, duration = timetable_mock.free_slots.call_args.args
+    assert owners == [
+        (ConflictKind.GROUP, 1), (ConflictKind.GROUP, 2), (ConflictKind.TEACHER, 7)
+    ]
+    assert (starts_at, ends_at, duration) == (at(8), at(16), CLASS)
+
+
+def test_free_slots_endpoint_needs_an_owner(client: TestClient, app: FastAPI) -> None:
+    app.dependency_overrides[current_user] = lambda: Principal(
+        id=1, role=Role.ADMIN, is_verified=True
+    )
+
+    resp = client.get("/classes/free-slots", params={
+        "starts_at": at(8).isoformat(), "ends_at": at(16).isoformat(),
+    })
+
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,33 @@
+from journal_backend.config import AppConfig
+from journal_backend.entity.users.dto import Principal
+from journal_backend.entity.users.enums import Role
+from journal_backend.entity.users.tokens import (
+    decode_access_token,
+    generate_access_token,
+    principal_from_claims,
+)
+
+
+def test_claims_token_carries_principal() -> None:
+    app_cfg = AppConfig(jwt_secret="secret", jwt_claims=True)
+    principal = Principal(id=7, role=Role.STUDENT, is_verified=True, group_id=3)
+
+    payload = decode_access_token(app_cfg, generate_access_token(app_cfg, principal))
+
+    assert principal_from_claims(payload) == Principal(
+        id=7,
+        role=Role.STUDENT,
+        is_verified=True,
+        group_id=3,
+        from_claims=True,
+    )
+
+
+def test_plain_token_has_no_claims() -> None:
+    app_cfg = AppConfig(jwt_secret="secret")
+    principal = Principal(id=7, role=Role.STUDENT, is_verified=True, group_id=3)
+
+    payload = decode_access_token(app_cfg, generate_access_token(app_cfg, principal))
+
+    assert payload["sub"] == "7"
+    assert principal_from_claims(payload) is None
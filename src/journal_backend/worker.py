@@ -0,0 +1,75 @@
+"""Background jobs worker entry point.
+
+Run with `python -m journal_backend.worker`, as many processes as needed:
+every process joins the same consumer group and takes its own share of jobs.
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import socket
+import sys
+from functools import partial
+
+from redis.asyncio import ConnectionPool, Redis
+from redis.asyncio.connection import Connection
+
+from journal_backend.config import load_config
+from journal_backend.consts import CONFIG_PATH
+from journal_backend.database.sa_utils import (
+    create_engine,
+    create_session_maker,
+)
+from journal_backend.entity.common.email_sender import (
+    SEND_EMAIL_JOB,
+    EmailSender,
+    handle_send_email,
+)
+from journal_backend.entity.common.job_queue import JobHandler, JobQueue
+from journal_backend.entity.students.verification import (
+    VERIFY_AGGREGATES_JOB,
+    handle_verify_aggregates,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    """Consume the jobs until SIGINT or SIGTERM, then finish the running ones."""
+    config = load_config(CONFIG_PATH)
+    logging.basicConfig(level=config.http_server.log_level.upper())
+
+    redis_pool: ConnectionPool[Connection] = ConnectionPool.from_url(config.redis.uri)  # type:ignore
+    job_queue = JobQueue(Redis(connection_pool=redis_pool), config.jobs)
+    email_sender = EmailSender(config.smtp)
+    engine = create_engine(config.db)
+    handlers: dict[str, JobHandler] = {
+        SEND_EMAIL_JOB: partial(handle_send_email, email_sender),
+        VERIFY_AGGREGATES_JOB: partial(handle_verify_aggregates, create_session_maker(engine)),
+    }
+
+    stop = asyncio.Event()
+    if sys.platform != "win32":
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+
+    consumer = f"{socket.gethostname()}-{os.getpid()}"
+    logger.info("Worker %s is consuming %s", consumer, config.jobs.stream)
+    try:
+        await asyncio.gather(*(
+            job_queue.run(f"{consumer}-{i}", handlers, stop)
+            for i in range(config.jobs.concurrency)
+        ))
+    finally:
+        await email_sender.close()
+        await engine.dispose()
+        await redis_pool.aclose()  # type:ignore[attr-defined]
+
+
+if __name__ == "__main__":
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+    asyncio.run(main())